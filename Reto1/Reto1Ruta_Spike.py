@@ -0,0 +1,45 @@
+# Generado por herramientas/planificar_ruta.py desde Reto1Ruta.json: no editar a mano.
+import runloop
+import motor_pair
+from movimiento import (
+    motor_izquierda,
+    motor_derecha,
+    detener,
+)
+from trayecto import recorrer, recta, giro_derecha, giro_izquierda
+
+# --- FUNCIÓN PRINCIPAL Y EJECUCIÓN ---
+async def main():
+    # Inicialización del par de motores
+    motor_pair.pair(motor_pair.PAIR_1, motor_izquierda, motor_derecha)
+
+    # Bloque 1: hacia (0.300, 0.200)
+    await recorrer(
+        giro_derecha(42.1),
+        recta(-91.4),
+    )
+
+    # Bloque 2: hacia (0.700, 0.250) mirando a 0 grados
+    await recorrer(
+        giro_izquierda(126.7),
+        recta(94.7),
+        giro_izquierda(3.5),
+    )
+
+    # Bloque 3: hacia (0.900, 0.700)
+    await recorrer(
+        giro_derecha(47.4),
+        recta(69.8),
+    )
+
+    # Bloque 4: hacia (0.494, 0.495) mirando a 180 grados
+    await recorrer(
+        giro_derecha(146.3),
+        recta(98.7),
+        giro_izquierda(14),
+    )
+
+    await detener()
+
+# Ejecutar programa
+runloop.run(main())
@@ -1,170 +1,74 @@
-from hub import port
-import runloop
 import motor_pair
-import motor
-import color_sensor
 import color
-import distance_sensor
-from hub import light_matrix, sound
-
-# --- 1. DEFINICIÓN DE PUERTOS Y CONSTANTES ---
-motor_izquierda = port.F
-motor_derecha = port.B
-puerto_garra = port.E
-puerto_sensor_ultrasonico = port.A
-puerto_sensor_color = port.C # Asignado al C por defecto para el Reto 3
-
-# CONSTANTES FÍSICAS
-CIRCUNFERENCIA_RUEDA = 17.58 # float
-GRADOS_POR_ROTACION = 360 # int
-
-# --- 2. FUNCIÓN DE CONVERSIÓN ---
-def cm_a_grados(cm: float) -> int:
-    """Convierte centímetros a grados de motor usando la circunferencia de la rueda."""
-    grados_float = (cm * GRADOS_POR_ROTACION) / CIRCUNFERENCIA_RUEDA
-    return round(grados_float)
-
-# --- 3. FUNCIONES PARA GARRA ---
-async def subir_garra(grados: int = 90, velocidad: int = 365) -> None:
-    """Sube la garra. Usa grados positivos."""
-    await motor.run_for_degrees(puerto_garra, grados, velocidad)
-
-async def bajar_garra(grados: int = 90, velocidad: int = 365) -> None:
-    """Baja la garra. El valor de grados ingresado debe ser positivo."""
-    await motor.run_for_degrees(puerto_garra, -grados, velocidad)
-
-# --- 4. FUNCIONES PARA GIROS ---
-async def girar_derecha_fase(grados: int = 200, direccion: int = 90, velocidad: int = 1000) -> None:
-    """Gira en fase a la derecha según grados de motor."""
-    await motor_pair.move_for_degrees(motor_pair.PAIR_1, grados, direccion, velocity=velocidad)
-
-async def girar_izquierda_fase(grados: int = 200, direccion: int = 90, velocidad: int = 1000) -> None:
-    """Gira en fase según grados de motor."""
-    await motor_pair.move_for_degrees(motor_pair.PAIR_1, -grados, direccion, velocity=velocidad)
-
-async def girar_derecha_desfase(grados: int = 90, velocidad: int = 500) -> None:
-    """Gira a la derecha moviendo solo el motor izquierdo (desfase)."""
-    motor.run(motor_izquierda, -500)
-    await pausa(0.8)
-    motor.stop(motor_izquierda, stop=motor.BRAKE)
-
-async def girar_izquierda_desfase(grados: int = 90, velocidad: int = 500) -> None:
-    """Gira a la izquierda moviendo solo el motor derecho (desfase)."""
-    motor.run(motor_derecha, 500)
-    await pausa(0.8)
-    motor.stop(motor_derecha, stop=motor.BRAKE)
-
-# --- 5. FUNCIONES DE AVANCE ---
-async def avanzar_cm(cm: float, velocidad: int = 500) -> None:
-    """Avanza recto la cantidad de cm especificada."""
-    grados = cm_a_grados(cm)
-    await motor_pair.move_for_degrees(motor_pair.PAIR_1, grados, 0, velocity=velocidad)
-
-async def retroceder_cm(cm: float, velocidad: int = 500) -> None:
-    """Retrocede recto la cantidad de cm especificada."""
-    grados = cm_a_grados(cm)
-    await motor_pair.move_for_degrees(motor_pair.PAIR_1, -grados, 0, velocity=velocidad)
-
-async def avanzar_grados(grados: int, velocidad: int = 500) -> None:
-    """Avanza recto la cantidad de grados de motor especificada."""
-    await motor_pair.move_for_degrees(motor_pair.PAIR_1, grados, 0, velocity=velocidad)
-
-async def retroceder_grados(grados: int, velocidad: int = 500) -> None:
-    """Retrocede recto la cantidad de grados de motor especificada (valor negativo)."""
-    await motor_pair.move_for_degrees(motor_pair.PAIR_1, -grados, 0, velocity=velocidad)
-
-async def avanzar_rotaciones(rotaciones: int, velocidad: int = 500) -> None:
-    """Avanza recto la cantidad de rotaciones especificadas."""
-    grados = GRADOS_POR_ROTACION * rotaciones
-    await motor_pair.move_for_degrees(motor_pair.PAIR_1, grados, 0, velocity=velocidad)
-
-async def retroceder_rotaciones(rotaciones: int, velocidad: int = 500) -> None:
-    """Retrocede recto la cantidad de rotaciones especificadas."""
-    grados = GRADOS_POR_ROTACION * rotaciones
-    await motor_pair.move_for_degrees(motor_pair.PAIR_1, -grados, 0, velocity=velocidad)
-
-# Funciones de Avance/Retroceso Indefinido
-def avanzar_indefinidamente(velocidad: int = 500) -> None:
-    motor_pair.move(motor_pair.PAIR_1, 0, velocity=velocidad)
-
-def retroceder_indefinidamente(velocidad: int = 500) -> None:
-    motor_pair.move(motor_pair.PAIR_1, 0, velocity=-velocidad)
-
-# --- 6. FUNCIÓN PAUSA ---
-async def pausa(segundos: float = 2) -> None:
-    """Pausa asíncrona no bloqueante."""
-    await runloop.sleep_ms(int(segundos * 1000))
-
-async def emote():
-    motor.run(motor_derecha, 1000)
-    light_matrix.show_image(light_matrix.IMAGE_HAPPY)
-    sound.beep(440, 10000, 100)
-    await pausa(10)
-    motor.stop(motor_derecha)
-
-#--- 7. FUNCIÓN DETENER MOVIMIENTO ---
-async def detener() -> None:
-    """Detener movimiento."""
-    motor_pair.stop(motor_pair.PAIR_1)
-
-#--- 8. FUNCIÓN SENSOR ULTRASÓNICO ---
-async def avanzar_hasta_detectar_objeto(distancia_cm) -> None:
-    """Detiene el movimiento hasta que el sensor detecte un objeto."""
-    avanzar_indefinidamente()
-    while True:
-        distancia = distance_sensor.distance(puerto_sensor_ultrasonico)
-        if distancia <= distancia_cm*10:
-            motor_pair.stop(motor_pair.PAIR_1)
-            break
+from movimiento import (
+    motor_izquierda,
+    motor_derecha,
+    girar_derecha_fase,
+    girar_izquierda_fase,
+    avanzar_cm,
+    retroceder_cm,
+    detener,
+    modo_absoluto,
+    soltar_objetivo,
+    velocidad_de_potencia,
+)
+from eventos import esperar_color
+from telemetria import ENCODERS, YAW, COLOR, REFLEXION, ejecutar_con_telemetria, marcar_bloque
+
+# Ciclos NEGRO/BLANCO del seguidor en zig-zag del XML: es lo que marca el final del tramo.
+CICLOS_SEGUIDOR = 450
 
 # --- FUNCIÓN PRINCIPAL Y EJECUCIÓN ---
 async def main():
     # Inicialización del par de motores
     motor_pair.pair(motor_pair.PAIR_1, motor_izquierda, motor_derecha)
+    # Las rectas apuntan a objetivos acumulados del encoder: no arrastran redondeo ni excesos.
+    modo_absoluto()
 
     # Bloque 1: Seguidor de línea (Zig-Zag)
-    # Repite 450 ciclos de corrección
-    for _ in range(450):
-        # 1. Esperar a ver la línea (Gris/Negro)
-        # Nota: El XML usa #585858 (Gris oscuro). En Spike, esto suele leerse mejor como BLACK.
-        while color_sensor.color(puerto_sensor_color) != color.BLACK:
-            await runloop.sleep_ms(10) # Pequeña espera para no saturar CPU
-        
-        # Curva hacia la derecha (Izquierda > Derecha)
-        # Power Left 40 (400), Right 30 (300)
-        motor_pair.move_tank(motor_pair.PAIR_1, 400, 300)
-
-        # 2. Esperar a ver el blanco (Salirse de la línea)
-        while color_sensor.color(puerto_sensor_color) != color.WHITE:
-            await runloop.sleep_ms(10)
-        
-        # Curva hacia la izquierda (Derecha > Izquierda) para volver a la línea
-        # Power Left 30 (300), Right 40 (400)
-        motor_pair.move_tank(motor_pair.PAIR_1, 300, 400)
+    marcar_bloque(1)
+    # El tramo acaba tras CICLOS_SEGUIDOR ciclos, no a una distancia conocida, así
+    # que aún no se cambia por seguir_linea(): antes hay que medir en pista lo que
+    # recorre (los encoders del bloque 1 en la telemetría de una ejecución real).
+    # Nota: El XML usa #585858 (Gris oscuro). En Spike, esto suele leerse mejor como BLACK.
+    for _ in range(CICLOS_SEGUIDOR):
+        # Curva hacia la derecha al ver la línea (XML: Power 40 / 30)
+        await esperar_color(color.BLACK)
+        soltar_objetivo()
+        motor_pair.move_tank(motor_pair.PAIR_1, velocidad_de_potencia(40), velocidad_de_potencia(30))
+        # Curva hacia la izquierda al salirse al blanco (XML: Power 30 / 40)
+        await esperar_color(color.WHITE)
+        soltar_objetivo()
+        motor_pair.move_tank(motor_pair.PAIR_1, velocidad_de_potencia(30), velocidad_de_potencia(40))
 
     # Bloque 2: Movimientos largos post-seguidor
+    marcar_bloque(2)
     # Al terminar el bucle, avanza recto 40 cm rápido
-    # XML: Power 120 (Max Spike ~1000 o 1100). Usamos 1000.
-    await avanzar_cm(40, velocidad=1000)
+    # XML: Power 120; velocidad_de_potencia lo recorta a la máxima real del robot.
+    await avanzar_cm(40, velocidad=velocidad_de_potencia(120))
 
     # Bloque 3: Retroceso y primer giro
+    marcar_bloque(3)
     # Retrocede 67 cm rápido
-    await retroceder_cm(67, velocidad=1000)
+    await retroceder_cm(67, velocidad=velocidad_de_potencia(120))
     # Giro Izquierda 90 grados
-    await girar_izquierda_fase(90, velocidad=300)
+    await girar_izquierda_fase(90, velocidad=1000)
 
     # Bloque 4: Cruce largo del campo
-    # Avanza 145 cm a velocidad media-alta (Power 80 -> 800)
-    await avanzar_cm(145, velocidad=800)
+    marcar_bloque(4)
+    # Avanza 145 cm a velocidad media-alta (XML: Power 80)
+    await avanzar_cm(145, velocidad=velocidad_de_potencia(80))
     # Giro Derecha 90 grados
-    await girar_derecha_fase(90, velocidad=300)
+    await girar_derecha_fase(90, velocidad=1000)
 
     # Bloque 5: Aproximación final
+    marcar_bloque(5)
     # Avanza 70 cm rápido
-    await avanzar_cm(70, velocidad=1000)
+    await avanzar_cm(70, velocidad=velocidad_de_potencia(120))
 
     # Detener todo al final
     await detener()
 
-# Línea de código para correr el programa del robot
-runloop.run(main())
\ No newline at end of file
+# Línea de código para correr el programa del robot (con el color y la reflexión que ve el seguidor, cada 80 ms:
+# caben 240 s y los 450 ciclos del zig-zag llevan ~2 min, contando lo que recorre el bloque 1)
+ejecutar_con_telemetria(main(), "reto3", canales=ENCODERS | YAW | COLOR | REFLEXION, periodo_ms=80)
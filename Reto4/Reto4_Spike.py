@@ -1,267 +1,195 @@
-from hub import port
-import runloop
 import motor_pair
-import motor
-import color_sensor
 import color
-import distance_sensor
-from hub import light_matrix, sound
-
-# --- 1. DEFINICIÓN DE PUERTOS Y CONSTANTES ---
-motor_izquierda = port.F
-motor_derecha = port.B
-puerto_garra = port.E
-puerto_sensor_ultrasonico = port.A
-puerto_sensor_color = port.C # Asignado al Puerto C
-
-# CONSTANTES FÍSICAS
-CIRCUNFERENCIA_RUEDA = 17.58 # float
-GRADOS_POR_ROTACION = 360 # int
-
-# --- 2. FUNCIÓN DE CONVERSIÓN ---
-def cm_a_grados(cm: float) -> int:
-    """Convierte centímetros a grados de motor usando la circunferencia de la rueda."""
-    grados_float = (cm * GRADOS_POR_ROTACION) / CIRCUNFERENCIA_RUEDA
-    return round(grados_float)
-
-# --- 3. FUNCIONES PARA GARRA ---
-async def subir_garra(grados: int = 90, velocidad: int = 365) -> None:
-    """Sube la garra. Usa grados positivos."""
-    await motor.run_for_degrees(puerto_garra, grados, velocidad)
-
-async def bajar_garra(grados: int = 90, velocidad: int = 365) -> None:
-    """Baja la garra. El valor de grados ingresado debe ser positivo."""
-    await motor.run_for_degrees(puerto_garra, -grados, velocidad)
-
-# --- 4. FUNCIONES PARA GIROS ---
-async def girar_derecha_fase(grados: int = 200, direccion: int = 90, velocidad: int = 1000) -> None:
-    """Gira en fase a la derecha según grados de motor."""
-    await motor_pair.move_for_degrees(motor_pair.PAIR_1, grados, direccion, velocity=velocidad)
-
-async def girar_izquierda_fase(grados: int = 200, direccion: int = 90, velocidad: int = 1000) -> None:
-    """Gira en fase según grados de motor."""
-    await motor_pair.move_for_degrees(motor_pair.PAIR_1, -grados, direccion, velocity=velocidad)
-
-async def girar_derecha_desfase(grados: int = 90, velocidad: int = 500) -> None:
-    """Gira a la derecha moviendo solo el motor izquierdo (desfase)."""
-    motor.run(motor_izquierda, -500)
-    await pausa(0.8)
-    motor.stop(motor_izquierda, stop=motor.BRAKE)
-
-async def girar_izquierda_desfase(grados: int = 90, velocidad: int = 500) -> None:
-    """Gira a la izquierda moviendo solo el motor derecho (desfase)."""
-    motor.run(motor_derecha, 500)
-    await pausa(0.8)
-    motor.stop(motor_derecha, stop=motor.BRAKE)
-
-# --- 5. FUNCIONES DE AVANCE ---
-async def avanzar_cm(cm: float, velocidad: int = 500) -> None:
-    """Avanza recto la cantidad de cm especificada."""
-    grados = cm_a_grados(cm)
-    await motor_pair.move_for_degrees(motor_pair.PAIR_1, grados, 0, velocity=velocidad)
-
-async def retroceder_cm(cm: float, velocidad: int = 500) -> None:
-    """Retrocede recto la cantidad de cm especificada."""
-    grados = cm_a_grados(cm)
-    await motor_pair.move_for_degrees(motor_pair.PAIR_1, -grados, 0, velocity=velocidad)
-
-async def avanzar_grados(grados: int, velocidad: int = 500) -> None:
-    """Avanza recto la cantidad de grados de motor especificada."""
-    await motor_pair.move_for_degrees(motor_pair.PAIR_1, grados, 0, velocity=velocidad)
-
-async def retroceder_grados(grados: int, velocidad: int = 500) -> None:
-    """Retrocede recto la cantidad de grados de motor especificada (valor negativo)."""
-    await motor_pair.move_for_degrees(motor_pair.PAIR_1, -grados, 0, velocity=velocidad)
-
-async def avanzar_rotaciones(rotaciones: int, velocidad: int = 500) -> None:
-    """Avanza recto la cantidad de rotaciones especificadas."""
-    grados = GRADOS_POR_ROTACION * rotaciones
-    await motor_pair.move_for_degrees(motor_pair.PAIR_1, grados, 0, velocity=velocidad)
-
-async def retroceder_rotaciones(rotaciones: int, velocidad: int = 500) -> None:
-    """Retrocede recto la cantidad de rotaciones especificadas."""
-    grados = GRADOS_POR_ROTACION * rotaciones
-    await motor_pair.move_for_degrees(motor_pair.PAIR_1, -grados, 0, velocity=velocidad)
-
-# Funciones de Avance/Retroceso Indefinido
-def avanzar_indefinidamente(velocidad: int = 500) -> None:
-    motor_pair.move(motor_pair.PAIR_1, 0, velocity=velocidad)
-
-def retroceder_indefinidamente(velocidad: int = 500) -> None:
-    motor_pair.move(motor_pair.PAIR_1, 0, velocity=-velocidad)
-
-# --- 6. FUNCIÓN PAUSA ---
-async def pausa(segundos: float = 2) -> None:
-    """Pausa asíncrona no bloqueante."""
-    await runloop.sleep_ms(int(segundos * 1000))
-
-async def emote():
-    motor.run(motor_derecha, 1000)
-    light_matrix.show_image(light_matrix.IMAGE_HAPPY)
-    sound.beep(440, 10000, 100)
-    await pausa(10)
-    motor.stop(motor_derecha)
-
-#--- 7. FUNCIÓN DETENER MOVIMIENTO ---
-async def detener() -> None:
-    """Detener movimiento."""
-    motor_pair.stop(motor_pair.PAIR_1)
-
-#--- 8. FUNCIÓN SENSOR ULTRASÓNICO ---
-async def avanzar_hasta_detectar_objeto(distancia_cm) -> None:
-    """Detiene el movimiento hasta que el sensor detecte un objeto."""
-    avanzar_indefinidamente()
-    while True:
-        distancia = distance_sensor.distance(puerto_sensor_ultrasonico)
-        if distancia <= distancia_cm*10:
-            motor_pair.stop(motor_pair.PAIR_1)
-            break
+from movimiento import (
+    motor_izquierda,
+    motor_derecha,
+    girar_derecha_fase,
+    girar_izquierda_fase,
+    avanzar_cm,
+    retroceder_cm,
+    avanzar_indefinidamente,
+    pausa,
+    detener,
+    modo_absoluto,
+)
+from trayecto import recorrer, recta, giro_derecha, giro_izquierda, arco_derecha, arco_izquierda
+from eventos import esperar_color
+from telemetria import ENCODERS, YAW, COLOR, ejecutar_con_telemetria, marcar_bloque
 
 # --- FUNCIÓN PRINCIPAL Y EJECUCIÓN ---
 async def main():
     # Inicialización del par de motores
     motor_pair.pair(motor_pair.PAIR_1, motor_izquierda, motor_derecha)
+    # Las rectas apuntan a objetivos acumulados del encoder: no arrastran redondeo ni excesos.
+    modo_absoluto()
 
     # Bloque 1: Salida de la base
-    await avanzar_cm(52, velocidad=800)
-    await girar_izquierda_fase(90, velocidad=300)
-    await avanzar_cm(130, velocidad=1000)
-    await retroceder_cm(40, velocidad=1000)
-    await girar_izquierda_fase(90, velocidad=300)
+    marcar_bloque(1)
+    await recorrer(
+        recta(32, 800),
+        arco_izquierda(20, 90, 800),
+        recta(110, 1000),
+        recta(-40, 1000),
+        giro_izquierda(90),
+    )
 
     # Bloque 2: Maniobras en zona inicial
-    await avanzar_cm(55, velocidad=1000)
-    await girar_derecha_fase(90, velocidad=300)
-    await avanzar_cm(50, velocidad=1000)
-    await retroceder_cm(50, velocidad=1000)
-    await girar_derecha_fase(90, velocidad=300)
+    marcar_bloque(2)
+    await recorrer(
+        recta(35, 1000),
+        arco_derecha(20, 90, 1000),
+        recta(30, 1000),
+        recta(-50, 1000),
+        giro_derecha(90),
+    )
 
     # Bloque 3: Aproximación a zona Verde
-    await avanzar_cm(120, velocidad=1000)
-    await girar_izquierda_fase(90, velocidad=300)
-    await avanzar_cm(25, velocidad=1000)
-    await girar_derecha_fase(90, velocidad=300)
+    marcar_bloque(3)
+    await recorrer(
+        recta(100, 1000),
+        arco_izquierda(20, 90, 1000),
+        recta(5, 1000),
+        giro_derecha(90),
+    )
 
     # Bloque 4: DETECCIÓN VERDE
+    marcar_bloque(4)
     avanzar_indefinidamente(velocidad=1000)
-    while True:
-        # Busca color Verde (#00642e)
-        if color_sensor.color(puerto_sensor_color) == color.GREEN:
-            await detener()
-            break
-        await runloop.sleep_ms(10)
+    # Busca color Verde (#00642e)
+    await esperar_color(color.GREEN)
+    await detener()
     await pausa(0.5) # Espera XML
 
     # Bloque 5: Salida de zona Verde
-    await avanzar_cm(80, velocidad=1000)
-    await girar_izquierda_fase(90, velocidad=300)
-    await avanzar_cm(45, velocidad=1000)
-    await girar_derecha_fase(90, velocidad=300)
+    marcar_bloque(5)
+    await recorrer(
+        recta(60, 1000),
+        arco_izquierda(20, 90, 1000),
+        recta(25, 1000),
+        giro_derecha(90),
+    )
 
     # Bloque 6: Maniobra intermedia
-    await avanzar_cm(123, velocidad=1000)
-    await girar_derecha_fase(90, velocidad=300)
-    await avanzar_cm(35, velocidad=1000)
-    await retroceder_cm(35, velocidad=1000)
-    await girar_derecha_fase(90, velocidad=300)
+    marcar_bloque(6)
+    await recorrer(
+        recta(103, 1000),
+        arco_derecha(20, 90, 1000),
+        recta(15, 1000),
+        recta(-35, 1000),
+        giro_derecha(90),
+    )
 
     # Bloque 7: Aproximación a zona Blanca
-    await avanzar_cm(90, velocidad=1000)
-    await girar_izquierda_fase(90, velocidad=300)
-    await avanzar_cm(110, velocidad=1000)
-    await girar_derecha_fase(88, velocidad=300) # Angulo especifico XML
+    marcar_bloque(7)
+    await recorrer(
+        recta(70, 1000),
+        arco_izquierda(20, 90, 1000),
+        recta(90, 1000),
+        giro_derecha(90), # XML: 88 (corrección a mano del giro por encoder)
+    )
 
     # Bloque 8: DETECCIÓN BLANCA
+    marcar_bloque(8)
     avanzar_indefinidamente(velocidad=1000)
-    while True:
-        # Busca color Blanco
-        if color_sensor.color(puerto_sensor_color) == color.WHITE:
-            await detener()
-            break
-        await runloop.sleep_ms(10)
+    # Busca color Blanco
+    await esperar_color(color.WHITE)
+    await detener()
     await pausa(0.5)
 
     # Bloque 9: Salida de zona Blanca
+    marcar_bloque(9)
     await retroceder_cm(90, velocidad=1000)
-    await girar_derecha_fase(90, velocidad=300)
+    await girar_derecha_fase(90)
     await avanzar_cm(110, velocidad=1000)
-    await girar_derecha_fase(90, velocidad=300)
+    await girar_derecha_fase(90)
 
     # Bloque 10: Movimiento corto de ajuste
+    marcar_bloque(10)
     await avanzar_cm(90, velocidad=1000)
-    await girar_derecha_fase(90, velocidad=300)
+    await girar_derecha_fase(90)
     await avanzar_cm(5, velocidad=1000)
     await retroceder_cm(5, velocidad=1000)
 
     # Bloque 11: Ruta hacia zona Amarilla
-    await girar_derecha_fase(88, velocidad=300)
-    await avanzar_cm(90, velocidad=1000)
-    await girar_izquierda_fase(90, velocidad=300)
-    await avanzar_cm(130, velocidad=1000)
-    await girar_derecha_fase(90, velocidad=300)
+    marcar_bloque(11)
+    await recorrer(
+        giro_derecha(90),
+        recta(70, 1000),
+        arco_izquierda(20, 90, 1000),
+        recta(110, 1000),
+        giro_derecha(90),
+    )
 
     # Bloque 12: DETECCIÓN AMARILLA
+    marcar_bloque(12)
     avanzar_indefinidamente(velocidad=1000)
-    while True:
-        # Busca color Amarillo
-        if color_sensor.color(puerto_sensor_color) == color.YELLOW:
-            await detener()
-            break
-        await runloop.sleep_ms(10)
+    # Busca color Amarillo
+    await esperar_color(color.YELLOW)
+    await detener()
     await pausa(0.5)
 
     # Bloque 13: Salida de zona Amarilla
-    await retroceder_cm(90, velocidad=1000)
-    await girar_izquierda_fase(90, velocidad=300)
-    await avanzar_cm(10, velocidad=1000)
-    await girar_izquierda_fase(90, velocidad=300)
-    await avanzar_cm(95, velocidad=1000)
+    marcar_bloque(13)
+    await recorrer(
+        recta(-90, 1000),
+        giro_izquierda(90),
+        arco_izquierda(10, 90, 1000),
+        recta(85, 1000),
+    )
 
     # Bloque 14: Ajustes
-    await girar_derecha_fase(90, velocidad=300)
+    marcar_bloque(14)
+    await girar_derecha_fase(90)
     await avanzar_cm(40, velocidad=1000)
-    await girar_derecha_fase(88, velocidad=300)
+    await girar_derecha_fase(90)
 
     # Bloque 15: Tramo largo hacia zona Roja
-    await avanzar_cm(210, velocidad=1000)
-    await girar_derecha_fase(88, velocidad=300)
-    await avanzar_cm(105, velocidad=1000)
-    await girar_derecha_fase(90, velocidad=300)
+    marcar_bloque(15)
+    await recorrer(
+        recta(190, 1000),
+        arco_derecha(20, 90, 1000),
+        recta(85, 1000),
+        giro_derecha(90),
+    )
 
     # Bloque 16: DETECCIÓN ROJA
+    marcar_bloque(16)
     # Nota: XML usa velocidad lenta (30) para esta aproximación
     avanzar_indefinidamente(velocidad=300)
-    while True:
-        # Busca color Rojo
-        if color_sensor.color(puerto_sensor_color) == color.RED:
-            await detener()
-            break
-        await runloop.sleep_ms(10)
+    # Busca color Rojo
+    await esperar_color(color.RED)
+    await detener()
     await pausa(0.5)
 
     # Bloque 17: Salida de zona Roja
-    await girar_derecha_fase(90, velocidad=300)
+    marcar_bloque(17)
+    await girar_derecha_fase(90)
     await avanzar_cm(102, velocidad=1000)
-    await girar_izquierda_fase(90, velocidad=300)
+    await girar_izquierda_fase(90)
 
     # Bloque 18: Retorno a base
+    marcar_bloque(18)
     await avanzar_cm(210, velocidad=1000)
     await retroceder_cm(90, velocidad=1000)
-    await girar_izquierda_fase(90, velocidad=300)
+    await girar_izquierda_fase(90)
 
     # Bloque 19: Aproximación final
+    marcar_bloque(19)
     await avanzar_cm(85, velocidad=1000)
-    await girar_derecha_fase(90, velocidad=300)
+    await girar_derecha_fase(90)
 
     # Bloque 20: Maniobra final lenta (ZigZag)
-    await avanzar_cm(35, velocidad=300)
-    await girar_izquierda_fase(30, velocidad=300)
-    await avanzar_cm(15, velocidad=300)
-    await girar_derecha_fase(30, velocidad=300)
-    await avanzar_cm(60, velocidad=300)
+    marcar_bloque(20)
+    await recorrer(
+        recta(29.6, 300),
+        arco_izquierda(20, 30, 300),
+        recta(4.3, 300),
+        arco_derecha(20, 30, 300),
+        recta(54.6, 300),
+    )
 
     # Detener todo
     await detener()
 
-# Ejecutar programa
-runloop.run(main())
\ No newline at end of file
+# Ejecutar programa (con telemetría de encoders, yaw y color cada 50 ms: caben 150 s y la misión dura ~90 s)
+ejecutar_con_telemetria(main(), "reto4", canales=ENCODERS | YAW | COLOR, periodo_ms=50)
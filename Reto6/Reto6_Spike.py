@@ -1,285 +1,169 @@
-from hub import port
 import runloop
 import motor_pair
-import motor
-import color_sensor
 import color
-import distance_sensor
-from hub import light_matrix, sound
-
-# --- 1. DEFINICIÓN DE PUERTOS Y CONSTANTES ---
-motor_izquierda = port.F
-motor_derecha = port.B
-puerto_garra = port.E
-puerto_sensor_ultrasonico = port.A
-puerto_sensor_color = port.C # Asignado al puerto 3 del XML
-
-# CONSTANTES FÍSICAS
-CIRCUNFERENCIA_RUEDA = 17.58 # float
-GRADOS_POR_ROTACION = 360 # int
-
-# --- 2. FUNCIÓN DE CONVERSIÓN ---
-def cm_a_grados(cm: float) -> int:
-    """Convierte centímetros a grados de motor usando la circunferencia de la rueda."""
-    grados_float = (cm * GRADOS_POR_ROTACION) / CIRCUNFERENCIA_RUEDA
-    return round(grados_float)
-
-# --- 3. FUNCIONES PARA GARRA ---
-async def subir_garra(grados: int = 90, velocidad: int = 365) -> None:
-    """Sube la garra. Usa grados positivos."""
-    await motor.run_for_degrees(puerto_garra, grados, velocidad)
-
-async def bajar_garra(grados: int = 90, velocidad: int = 365) -> None:
-    """Baja la garra. El valor de grados ingresado debe ser positivo."""
-    await motor.run_for_degrees(puerto_garra, -grados, velocidad)
-
-# --- 4. FUNCIONES PARA GIROS ---
-async def girar_derecha_fase(grados: int = 200, direccion: int = 90, velocidad: int = 1000) -> None:
-    """Gira en fase a la derecha según grados de motor."""
-    await motor_pair.move_for_degrees(motor_pair.PAIR_1, grados, direccion, velocity=velocidad)
-
-async def girar_izquierda_fase(grados: int = 200, direccion: int = 90, velocidad: int = 1000) -> None:
-    """Gira en fase según grados de motor."""
-    await motor_pair.move_for_degrees(motor_pair.PAIR_1, -grados, direccion, velocity=velocidad)
-
-async def girar_derecha_desfase(grados: int = 90, velocidad: int = 500) -> None:
-    """Gira a la derecha moviendo solo el motor izquierdo (desfase)."""
-    motor.run(motor_izquierda, -500)
-    await pausa(0.8)
-    motor.stop(motor_izquierda, stop=motor.BRAKE)
-
-async def girar_izquierda_desfase(grados: int = 90, velocidad: int = 500) -> None:
-    """Gira a la izquierda moviendo solo el motor derecho (desfase)."""
-    motor.run(motor_derecha, 500)
-    await pausa(0.8)
-    motor.stop(motor_derecha, stop=motor.BRAKE)
-
-# --- 5. FUNCIONES DE AVANCE ---
-async def avanzar_cm(cm: float, velocidad: int = 500) -> None:
-    """Avanza recto la cantidad de cm especificada."""
-    grados = cm_a_grados(cm)
-    await motor_pair.move_for_degrees(motor_pair.PAIR_1, grados, 0, velocity=velocidad)
-
-async def retroceder_cm(cm: float, velocidad: int = 500) -> None:
-    """Retrocede recto la cantidad de cm especificada."""
-    grados = cm_a_grados(cm)
-    await motor_pair.move_for_degrees(motor_pair.PAIR_1, -grados, 0, velocity=velocidad)
-
-async def avanzar_grados(grados: int, velocidad: int = 500) -> None:
-    """Avanza recto la cantidad de grados de motor especificada."""
-    await motor_pair.move_for_degrees(motor_pair.PAIR_1, grados, 0, velocity=velocidad)
-
-async def retroceder_grados(grados: int, velocidad: int = 500) -> None:
-    """Retrocede recto la cantidad de grados de motor especificada (valor negativo)."""
-    await motor_pair.move_for_degrees(motor_pair.PAIR_1, -grados, 0, velocity=velocidad)
-
-async def avanzar_rotaciones(rotaciones: int, velocidad: int = 500) -> None:
-    """Avanza recto la cantidad de rotaciones especificadas."""
-    grados = GRADOS_POR_ROTACION * rotaciones
-    await motor_pair.move_for_degrees(motor_pair.PAIR_1, grados, 0, velocity=velocidad)
-
-async def retroceder_rotaciones(rotaciones: int, velocidad: int = 500) -> None:
-    """Retrocede recto la cantidad de rotaciones especificadas."""
-    grados = GRADOS_POR_ROTACION * rotaciones
-    await motor_pair.move_for_degrees(motor_pair.PAIR_1, -grados, 0, velocity=velocidad)
-
-# Funciones de Avance/Retroceso Indefinido
-def avanzar_indefinidamente(velocidad: int = 500) -> None:
-    motor_pair.move(motor_pair.PAIR_1, 0, velocity=velocidad)
-
-def retroceder_indefinidamente(velocidad: int = 500) -> None:
-    motor_pair.move(motor_pair.PAIR_1, 0, velocity=-velocidad)
-
-# --- 6. FUNCIÓN PAUSA ---
-async def pausa(segundos: float = 2) -> None:
-    """Pausa asíncrona no bloqueante."""
-    await runloop.sleep_ms(int(segundos * 1000))
-
-async def emote():
-    motor.run(motor_derecha, 1000)
-    light_matrix.show_image(light_matrix.IMAGE_HAPPY)
-    sound.beep(440, 10000, 100)
-    await pausa(10)
-    motor.stop(motor_derecha)
-
-#--- 7. FUNCIÓN DETENER MOVIMIENTO ---
-async def detener() -> None:
-    """Detener movimiento."""
-    motor_pair.stop(motor_pair.PAIR_1)
-
-#--- 8. FUNCIÓN SENSOR ULTRASÓNICO ---
-async def avanzar_hasta_detectar_objeto(distancia_cm) -> None:
-    """Detiene el movimiento hasta que el sensor detecte un objeto."""
-    avanzar_indefinidamente()
-    while True:
-        distancia = distance_sensor.distance(puerto_sensor_ultrasonico)
-        if distancia <= distancia_cm*10:
-            motor_pair.stop(motor_pair.PAIR_1)
-            break
+from movimiento import (
+    motor_izquierda,
+    motor_derecha,
+    girar_derecha_fase,
+    girar_izquierda_fase,
+    avanzar_cm,
+    avanzar_indefinidamente,
+    detener,
+    modo_absoluto,
+)
+from trayecto import recorrer, recta, giro_derecha, arco_derecha, arco_izquierda
+from seguidor import seguir_linea
+from eventos import esperar_color
+from odometria import fijar_pose, fijar_lineas, odometro
+from telemetria import ENCODERS, YAW, COLOR, REFLEXION, ejecutar_con_telemetria, marcar_bloque
+
+# Puertos en movimiento.py: color en C (puerto 3 del XML).
+
+# Generado con herramientas/exportar_campo.py desde Reto6Config.json.
+POSE_INICIAL = (0.0627, 0.7631, 4.7124)
+LINEAS = (
+    (0.0787, 0.7215, 0.0093, 0.0977),
+    (0.0371, 0.7218, 0.0093, 0.0970),
+    (0.0375, 0.8042, 0.0506, 0.0153),
+    (0.1978, 0.8203, 0.0659, 0.0650),
+)
 
 # --- FUNCIÓN PRINCIPAL Y EJECUCIÓN ---
 async def main():
     # Inicialización del par de motores
     motor_pair.pair(motor_pair.PAIR_1, motor_izquierda, motor_derecha)
+    # Las rectas apuntan a objetivos acumulados del encoder: no arrastran redondeo ni excesos.
+    modo_absoluto()
+    # Pose en el tapete en segundo plano, corregida al cruzar las líneas del puerto.
+    fijar_pose(*POSE_INICIAL)
+    fijar_lineas(LINEAS)
 
     # Bloque 1: Salida del puerto
+    marcar_bloque(1)
     await avanzar_cm(63, velocidad=1000)
-    await girar_derecha_fase(90, velocidad=300)
+    await girar_derecha_fase(90)
 
     # Bloque 2: Seguidor de línea LARGO hacia VERDE
-    # Reiniciar encoder del motor derecho (B) para medir distancia
-    motor.reset_relative_position(motor_derecha)
-    # Loop hasta superar 3450 grados (aprox 160cm)
-    while abs(motor.relative_position(motor_derecha)) < 3450:
-        color_detectado = color_sensor.color(puerto_sensor_color)
-        if color_detectado == color.BLACK: # XML dice Gris #585858
-            # Curva suave: Izq 1200 / Der 1100
-            motor_pair.move_tank(motor_pair.PAIR_1, 1000, 900)
-        else:
-            # Corrección: Izq 1100 / Der 1200
-            motor_pair.move_tank(motor_pair.PAIR_1, 900, 1000)
+    marcar_bloque(2)
+    # PID sobre el borde de la línea (XML dice Gris #585858) hasta 3450 grados
+    # del motor derecho (aprox 160cm). Antes: dos estados 1000/900.
+    await seguir_linea(3450, velocidad=1000)
     
     # Avanzar hasta detectar VERDE
     avanzar_indefinidamente(velocidad=900)
-    while color_sensor.color(puerto_sensor_color) != color.GREEN:
-        await runloop.sleep_ms(10)
+    await esperar_color(color.GREEN)
     await detener()
 
     # Bloque 3: Maniobra en zona Verde
-    await girar_izquierda_fase(90, velocidad=300)
+    marcar_bloque(3)
+    await girar_izquierda_fase(90)
     await avanzar_cm(5, velocidad=900)
-    await girar_izquierda_fase(90, velocidad=300)
+    await girar_izquierda_fase(90)
 
     # Bloque 4: Seguidor de línea hacia AMARILLO
-    motor.reset_relative_position(motor_derecha)
-    while abs(motor.relative_position(motor_derecha)) < 1200:
-        if color_sensor.color(puerto_sensor_color) == color.BLACK:
-            motor_pair.move_tank(motor_pair.PAIR_1, 900, 800)
-        else:
-            motor_pair.move_tank(motor_pair.PAIR_1, 800, 900)
+    marcar_bloque(4)
+    await seguir_linea(1200, velocidad=1000)
             
     # Avanzar hasta detectar AMARILLO (#f7d117)
     avanzar_indefinidamente(velocidad=900)
-    while color_sensor.color(puerto_sensor_color) != color.YELLOW:
-        await runloop.sleep_ms(10)
+    await esperar_color(color.YELLOW)
     await detener()
 
     # Bloque 5: Maniobra en zona Amarilla
-    await girar_izquierda_fase(90, velocidad=300)
+    marcar_bloque(5)
+    await girar_izquierda_fase(90)
     await avanzar_cm(5, velocidad=900)
-    await girar_izquierda_fase(90, velocidad=300)
+    await girar_izquierda_fase(90)
 
     # Bloque 6: Seguidor de línea hacia ROJO
-    motor.reset_relative_position(motor_derecha)
-    while abs(motor.relative_position(motor_derecha)) < 1600:
-        if color_sensor.color(puerto_sensor_color) == color.BLACK:
-            motor_pair.move_tank(motor_pair.PAIR_1, 900, 800)
-        else:
-            motor_pair.move_tank(motor_pair.PAIR_1, 800, 900)
+    marcar_bloque(6)
+    await seguir_linea(1600, velocidad=1000)
 
     # Avanzar hasta detectar ROJO (#dc143c)
     avanzar_indefinidamente(velocidad=900)
-    while color_sensor.color(puerto_sensor_color) != color.RED:
-        await runloop.sleep_ms(10)
+    await esperar_color(color.RED)
     await detener()
 
     # Bloque 7: Maniobra en zona Roja
-    await girar_izquierda_fase(90, velocidad=300)
+    marcar_bloque(7)
+    await girar_izquierda_fase(90)
     await avanzar_cm(15, velocidad=900)
-    await girar_izquierda_fase(90, velocidad=300)
+    await girar_izquierda_fase(90)
 
     # Bloque 8: Seguidor de línea hacia AZUL
-    motor.reset_relative_position(motor_derecha)
-    while abs(motor.relative_position(motor_derecha)) < 3800:
-        if color_sensor.color(puerto_sensor_color) == color.BLACK:
-            motor_pair.move_tank(motor_pair.PAIR_1, 900, 800)
-        else:
-            motor_pair.move_tank(motor_pair.PAIR_1, 800, 900)
+    marcar_bloque(8)
+    await seguir_linea(3800, velocidad=1000)
 
     # Avanzar hasta detectar AZUL (#0057a6)
     avanzar_indefinidamente(velocidad=900)
-    while color_sensor.color(puerto_sensor_color) != color.BLUE:
-        await runloop.sleep_ms(10)
+    await esperar_color(color.BLUE)
     await detener()
 
     # Bloque 9: Compleja maniobra en puerto Azul
-    await girar_derecha_fase(90, velocidad=300)
-    await avanzar_cm(35, velocidad=900)
-    await girar_derecha_fase(90, velocidad=300)
-    await avanzar_cm(25, velocidad=900)
-    await girar_derecha_fase(90, velocidad=300)
-    await avanzar_cm(20, velocidad=900)
-    await retroceder_cm(20, velocidad=900)
-    await girar_derecha_fase(90, velocidad=300)
-    await avanzar_cm(25, velocidad=900)
-    await girar_izquierda_fase(90, velocidad=300)
-    await avanzar_cm(30, velocidad=900)
-    await girar_derecha_fase(90, velocidad=300)
+    marcar_bloque(9)
+    await recorrer(
+        giro_derecha(90),
+        recta(15, 900),
+        arco_derecha(20, 90, 900),
+        recta(5, 900),
+        giro_derecha(90),
+        recta(20, 900),
+        recta(-20, 900),
+        giro_derecha(90),
+        recta(5, 900),
+        arco_izquierda(20, 90, 900),
+        recta(10, 900),
+        giro_derecha(90),
+    )
 
     # Bloque 10: Seguidor de línea hacia BLANCO
-    motor.reset_relative_position(motor_derecha)
-    while abs(motor.relative_position(motor_derecha)) < 4100:
-        if color_sensor.color(puerto_sensor_color) == color.BLACK:
-            motor_pair.move_tank(motor_pair.PAIR_1, 900, 800)
-        else:
-            motor_pair.move_tank(motor_pair.PAIR_1, 800, 900)
+    marcar_bloque(10)
+    await seguir_linea(4100, velocidad=1000)
 
     # Avanzar hasta detectar BLANCO
     avanzar_indefinidamente(velocidad=900)
-    while color_sensor.color(puerto_sensor_color) != color.WHITE:
-        await runloop.sleep_ms(10)
+    await esperar_color(color.WHITE)
     await detener()
 
     # Bloque 11: Maniobra intermedia
-    await girar_izquierda_fase(90, velocidad=300)
+    marcar_bloque(11)
+    await girar_izquierda_fase(90)
     await avanzar_cm(5, velocidad=900)
-    await girar_izquierda_fase(90, velocidad=300)
+    await girar_izquierda_fase(90)
 
     # Bloque 12: Seguidor de línea hacia NEGRO (Meta/Puerto)
-    motor.reset_relative_position(motor_derecha)
-    while abs(motor.relative_position(motor_derecha)) < 1700:
-        if color_sensor.color(puerto_sensor_color) == color.BLACK:
-            motor_pair.move_tank(motor_pair.PAIR_1, 900, 800)
-        else:
-            motor_pair.move_tank(motor_pair.PAIR_1, 800, 900)
+    marcar_bloque(12)
+    await seguir_linea(1700, velocidad=1000)
 
     # Avanzar hasta detectar NEGRO (#000000)
     avanzar_indefinidamente(velocidad=900)
-    while color_sensor.color(puerto_sensor_color) != color.BLACK:
-        await runloop.sleep_ms(10)
+    await esperar_color(color.BLACK)
     await detener()
 
     # Bloque 13: Salida del puerto
-    await girar_izquierda_fase(90, velocidad=300)
+    marcar_bloque(13)
+    await girar_izquierda_fase(90)
     await avanzar_cm(5, velocidad=900)
-    await girar_izquierda_fase(90, velocidad=300)
+    await girar_izquierda_fase(90)
 
     # Bloque 14: Retorno a zona central
-    motor.reset_relative_position(motor_derecha)
-    while abs(motor.relative_position(motor_derecha)) < 1600:
-        if color_sensor.color(puerto_sensor_color) == color.BLACK:
-            motor_pair.move_tank(motor_pair.PAIR_1, 900, 800)
-        else:
-            motor_pair.move_tank(motor_pair.PAIR_1, 800, 900)
+    marcar_bloque(14)
+    await seguir_linea(1600, velocidad=1000)
             
     # Avanzar hasta detectar AZUL nuevamente
     avanzar_indefinidamente(velocidad=900)
-    while color_sensor.color(puerto_sensor_color) != color.BLUE:
-        await runloop.sleep_ms(10)
+    await esperar_color(color.BLUE)
     await detener()
     
     # Bloque 15: Ajuste Azul
-    await girar_izquierda_fase(90, velocidad=300)
+    marcar_bloque(15)
+    await girar_izquierda_fase(90)
     await avanzar_cm(5, velocidad=900)
-    await girar_izquierda_fase(90, velocidad=300)
+    await girar_izquierda_fase(90)
 
     # Bloque 16: Seguidor de línea hacia Gris
-    motor.reset_relative_position(motor_derecha)
-    while abs(motor.relative_position(motor_derecha)) < 1500:
-        if color_sensor.color(puerto_sensor_color) == color.BLACK:
-            motor_pair.move_tank(motor_pair.PAIR_1, 900, 800)
-        else:
-            motor_pair.move_tank(motor_pair.PAIR_1, 800, 900)
+    marcar_bloque(16)
+    await seguir_linea(1500, velocidad=1000)
 
     # Detenerse en GRIS (simulado como detectar línea y parar)
     avanzar_indefinidamente(velocidad=900)
@@ -287,39 +171,35 @@ async def main():
     await detener()
 
     # Bloque 17: Giro
-    await girar_derecha_fase(90, velocidad=300)
+    marcar_bloque(17)
+    await girar_derecha_fase(90)
 
     # Bloque 18: Seguidor de línea hacia BLANCO
-    motor.reset_relative_position(motor_derecha)
-    while abs(motor.relative_position(motor_derecha)) < 1200:
-        if color_sensor.color(puerto_sensor_color) == color.BLACK:
-            motor_pair.move_tank(motor_pair.PAIR_1, 900, 800)
-        else:
-            motor_pair.move_tank(motor_pair.PAIR_1, 800, 900)
+    marcar_bloque(18)
+    await seguir_linea(1200, velocidad=1000)
 
     avanzar_indefinidamente(velocidad=900)
-    while color_sensor.color(puerto_sensor_color) != color.WHITE:
-        await runloop.sleep_ms(10)
+    await esperar_color(color.WHITE)
     await detener()
 
     # Bloque 19: Maniobra final
-    await girar_izquierda_fase(90, velocidad=300)
+    marcar_bloque(19)
+    await girar_izquierda_fase(90)
     await avanzar_cm(5, velocidad=900)
-    await girar_izquierda_fase(90, velocidad=300)
+    await girar_izquierda_fase(90)
 
     # Bloque 20: Tramo final a casa
-    motor.reset_relative_position(motor_derecha)
-    while abs(motor.relative_position(motor_derecha)) < 1700:
-        if color_sensor.color(puerto_sensor_color) == color.BLACK:
-            motor_pair.move_tank(motor_pair.PAIR_1, 900, 800)
-        else:
-            motor_pair.move_tank(motor_pair.PAIR_1, 800, 900)
+    marcar_bloque(20)
+    await seguir_linea(1700, velocidad=1000)
 
     # Bloque 21: Parking
-    await girar_izquierda_fase(90, velocidad=300)
+    marcar_bloque(21)
+    await girar_izquierda_fase(90)
     await avanzar_cm(90, velocidad=900)
 
     await detener()
 
-# Ejecutar programa
-runloop.run(main())
\ No newline at end of file
+# Ejecutar programa (el odómetro corre junto al registrador de telemetría, cada 40 ms: caben 120 s y la
+# misión dura ~60 s más lo que tarden el seguidor y las esperas de color)
+ejecutar_con_telemetria(main(), "reto6", canales=ENCODERS | YAW | COLOR | REFLEXION, periodo_ms=40,
+                        fondo=(odometro,))
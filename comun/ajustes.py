@@ -0,0 +1,28 @@
+# Parámetros ajustables de cada reto (velocidades por tramo). El reto nombra
+# cada valor con ajuste() y da el de por defecto; herramientas/ajustar_parametros.py
+# busca en simulación los más rápidos que mantienen la precisión y los guarda
+# en ajustes_retoN.py, que se sube al flash junto al programa.
+#
+# Uso en un reto:
+#     cargar_ajustes("reto2")              # lee /flash/ajustes_reto2.py si existe
+#     await avanzar_cm(118, velocidad=ajuste("recta_1", 900))
+
+# --- 1. TABLA ---
+_tabla = {}
+
+def usar_ajustes(tabla: dict) -> None:
+    """Sustituye la tabla actual (el ajustador prueba así cada candidata)."""
+    global _tabla
+    _tabla = tabla
+
+def cargar_ajustes(reto: str) -> None:
+    """Carga AJUSTES de ajustes_<reto>.py; sin archivo se usan los valores por defecto."""
+    try:
+        usar_ajustes(__import__("ajustes_" + reto).AJUSTES)
+    except ImportError:
+        usar_ajustes({})
+
+# --- 2. CONSULTA ---
+def ajuste(nombre: str, defecto):
+    """Valor ajustado de `nombre`, o `defecto` si la tabla no lo tiene."""
+    return _tabla.get(nombre, defecto)
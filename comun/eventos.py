@@ -0,0 +1,139 @@
+# Esperas por eventos de sensores, servidas por una única tarea de muestreo.
+# Sustituye a los bucles `while color_sensor.color(...) != color.X:
+# await runloop.sleep_ms(10)` repartidos por los retos.
+#
+# Uso en un reto:
+#     evento = await esperar_color(color.BLACK)
+#     evento = await esperar(Color(color.RED), DistanciaMenor(20), periodo_ms=5, timeout_ms=3000)
+#     ...
+#     ejecutar_con_muestreador(main())   # en lugar de runloop.run(main())
+import runloop
+import motor
+import color_sensor
+import distance_sensor
+
+from movimiento import motor_derecha, puerto_sensor_color, puerto_sensor_ultrasonico, SIN_ECO_MM
+
+# --- 1. CONSTANTES ---
+# Periodo de muestreo por defecto (ms). A 1000 grados/s son ~0.5 cm por muestra.
+PERIODO_MS = 10 # int
+# Sensores que necesita cada condición (máscara de bits): solo se leen los pedidos.
+SENSOR_COLOR = 1
+SENSOR_DISTANCIA = 2
+
+# --- 2. CONDICIONES ---
+class Color:
+    """Se cumple cuando el sensor de color ve `objetivo`."""
+    sensores = SENSOR_COLOR
+
+    def __init__(self, objetivo: int) -> None:
+        self.objetivo = objetivo
+
+    def cumple(self, muestreador) -> bool:
+        return muestreador.color == self.objetivo
+
+class DistanciaMenor:
+    """Se cumple cuando el ultrasonido mide menos de `distancia_cm` (sin eco nunca cumple)."""
+    sensores = SENSOR_DISTANCIA
+
+    def __init__(self, distancia_cm: float) -> None:
+        self.limite_mm = distancia_cm * 10
+
+    def cumple(self, muestreador) -> bool:
+        return muestreador.distancia < self.limite_mm
+
+class Evento:
+    """Resultado de una espera.
+
+    `ocurrido` es False si venció el timeout; `indice` es la condición que se
+    cumplió y `posicion` los grados del motor derecho en esa muestra.
+    """
+
+    def __init__(self, condiciones, periodo_ms: int) -> None:
+        self.condiciones = condiciones
+        self.periodo_ms = periodo_ms
+        self.sensores = 0
+        for condicion in condiciones:
+            self.sensores |= condicion.sensores
+        self.ocurrido = False
+        self.indice = None
+        self.posicion = None
+
+# --- 3. MUESTREADOR ---
+class Muestreador:
+    """Tarea de fondo que lee los sensores al ritmo de la espera activa más exigente."""
+
+    def __init__(self) -> None:
+        self.esperas = []
+        self.en_marcha = False
+        self.color = None
+        self.distancia = SIN_ECO_MM
+        self.posicion = 0
+
+    def muestrear(self) -> None:
+        sensores = 0
+        for evento in self.esperas:
+            sensores |= evento.sensores
+        if sensores & SENSOR_COLOR:
+            self.color = color_sensor.color(puerto_sensor_color)
+        if sensores & SENSOR_DISTANCIA:
+            lectura = distance_sensor.distance(puerto_sensor_ultrasonico)
+            self.distancia = SIN_ECO_MM if lectura is None or lectura < 0 else lectura
+        self.posicion = motor.relative_position(motor_derecha)
+        for evento in self.esperas[:]:
+            for indice, condicion in enumerate(evento.condiciones):
+                if condicion.cumple(self):
+                    evento.ocurrido = True
+                    evento.indice = indice
+                    evento.posicion = self.posicion
+                    self.esperas.remove(evento)
+                    break
+
+    async def ejecutar(self) -> None:
+        # en_marcha lo pone quien la arranca: si main() ya terminó, no empieza.
+        while self.en_marcha:
+            if not self.esperas:
+                # Sin esperas no se lee nada: solo se vigila si llega alguna.
+                await runloop.until(lambda: self.esperas or not self.en_marcha)
+                continue
+            await runloop.sleep_ms(min(evento.periodo_ms for evento in self.esperas))
+            self.muestrear()
+
+    def parar(self) -> None:
+        self.en_marcha = False
+
+    async def esperar(self, *condiciones, periodo_ms: int = PERIODO_MS, timeout_ms: int = 0) -> Evento:
+        """Espera a que se cumpla cualquiera de las condiciones (timeout_ms=0: sin límite)."""
+        if not self.en_marcha:
+            raise RuntimeError("El muestreador no está en marcha: usa ejecutar_con_muestreador(main())")
+        evento = Evento(condiciones, periodo_ms)
+        self.esperas.append(evento)
+        # Primera muestra inmediata: la condición puede cumplirse ya.
+        self.muestrear()
+        if not evento.ocurrido and not await runloop.until(lambda: evento.ocurrido, timeout_ms):
+            self.esperas.remove(evento)
+        return evento
+
+muestreador = Muestreador()
+
+# --- 4. FUNCIONES DE ESPERA ---
+async def esperar(*condiciones, periodo_ms: int = PERIODO_MS, timeout_ms: int = 0) -> Evento:
+    return await muestreador.esperar(*condiciones, periodo_ms=periodo_ms, timeout_ms=timeout_ms)
+
+async def esperar_color(objetivo: int, periodo_ms: int = PERIODO_MS, timeout_ms: int = 0) -> Evento:
+    return await muestreador.esperar(Color(objetivo), periodo_ms=periodo_ms, timeout_ms=timeout_ms)
+
+async def esperar_distancia_menor(distancia_cm: float, periodo_ms: int = PERIODO_MS, timeout_ms: int = 0) -> Evento:
+    return await muestreador.esperar(DistanciaMenor(distancia_cm), periodo_ms=periodo_ms, timeout_ms=timeout_ms)
+
+# --- 5. EJECUCIÓN ---
+async def _principal(programa) -> None:
+    try:
+        await programa
+    finally:
+        muestreador.parar()
+
+def ejecutar_con_muestreador(programa) -> None:
+    """Como runloop.run(programa), pero con el muestreador corriendo en paralelo."""
+    muestreador.en_marcha = True
+    runloop.run(_principal(programa), muestreador.ejecutar())
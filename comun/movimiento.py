@@ -0,0 +1,341 @@
+# Librería de movimiento compartida por todos los programas RetoN_Spike.py.
+# Se sube al hub una sola vez (idealmente precompilada a .mpy con
+# herramientas/compilar_mpy.py) y cada reto solo contiene su main().
+from hub import port
+import math
+import runloop
+import motor_pair
+import motor
+import distance_sensor
+from hub import light_matrix, motion_sensor, sound
+
+# --- 1. DEFINICIÓN DE PUERTOS Y CONSTANTES ---
+motor_izquierda = port.F
+motor_derecha = port.B
+puerto_garra = port.E
+puerto_sensor_ultrasonico = port.A
+puerto_sensor_color = port.C
+
+# CONSTANTES FÍSICAS
+# Valores por defecto del robot; si en el flash del hub existe perfil_robot.py
+# (lo genera herramientas/calibrar_hub.py) se usan los medidos.
+CIRCUNFERENCIA_RUEDA = 17.58 # float
+ANCHO_EJE = 11.2 # float, distancia entre ruedas en cm
+INERCIA_GIRO = 0.0 # float, grados que sigue girando el robot tras cortar un giro
+try:
+    from perfil_robot import CIRCUNFERENCIA_RUEDA, ANCHO_EJE, INERCIA_GIRO
+except ImportError:
+    pass
+GRADOS_POR_ROTACION = 360 # int
+
+# --- 2. FUNCIÓN DE CONVERSIÓN ---
+def cm_a_grados(cm: float) -> int:
+    """Convierte centímetros a grados de motor usando la circunferencia de la rueda."""
+    # Fórmula: (Distancia * 360) / Circunferencia
+    grados_float = (cm * GRADOS_POR_ROTACION) / CIRCUNFERENCIA_RUEDA
+    return round(grados_float)
+
+# Velocidad real de las ruedas con carga (grados/s) para cada velocidad
+# ordenada, de menor a mayor: (ordenada, real). La última fila es la mayor
+# velocidad que se ordena; el motor grande acepta hasta 1110 pero no siempre
+# la alcanza. Sin perfil medido se supone que el motor obedece hasta 1000.
+TABLA_VELOCIDAD = ((0, 0.0), (1000, 1000.0))
+try:
+    from perfil_robot import TABLA_VELOCIDAD
+except ImportError:
+    pass
+VELOCIDAD_MAXIMA = TABLA_VELOCIDAD[-1][0] # int
+
+def _interpolar(tabla, valor: float, entrada: int, salida: int) -> float:
+    """Interpola linealmente `valor` de la columna `entrada` a la `salida`, con tope en los extremos."""
+    valor = min(max(valor, tabla[0][entrada]), tabla[-1][entrada])
+    for anterior, siguiente in zip(tabla, tabla[1:]):
+        if valor <= siguiente[entrada]:
+            tramo = siguiente[entrada] - anterior[entrada]
+            fraccion = (valor - anterior[entrada]) / tramo if tramo else 1.0
+            return anterior[salida] + (siguiente[salida] - anterior[salida]) * fraccion
+    return tabla[-1][salida]
+
+def velocidad_real(velocidad: float) -> float:
+    """Grados/s que alcanza la rueda al ordenar `velocidad` (con signo)."""
+    signo = -1 if velocidad < 0 else 1
+    return signo * _interpolar(TABLA_VELOCIDAD, abs(velocidad), 0, 1)
+
+def velocidad_para(real: float) -> int:
+    """Velocidad a ordenar para que la rueda gire a `real` grados/s (con signo)."""
+    signo = -1 if real < 0 else 1
+    return signo * round(_interpolar(TABLA_VELOCIDAD, abs(real), 1, 0))
+
+def velocidad_de_potencia(potencia: float) -> int:
+    """Velocidad a ordenar para una potencia de Open Roberta (%): 100 es la máxima real del robot."""
+    return velocidad_para(TABLA_VELOCIDAD[-1][1] * max(-1.0, min(1.0, potencia / 100)))
+
+def cm_por_segundo(velocidad: float) -> float:
+    """Avance real en cm/s al ordenar `velocidad`."""
+    return velocidad_real(velocidad) * CIRCUNFERENCIA_RUEDA / GRADOS_POR_ROTACION
+
+# --- 3. FUNCIONES PARA GARRA ---
+async def subir_garra(grados: int = 90, velocidad: int = 365) -> None:
+    """Sube la garra. Usa grados positivos."""
+    await motor.run_for_degrees(puerto_garra, grados, velocidad)
+
+async def bajar_garra(grados: int = 90, velocidad: int = 365) -> None:
+    """Baja la garra. El valor de grados ingresado debe ser positivo."""
+    await motor.run_for_degrees(puerto_garra, -grados, velocidad)
+
+# --- 4. FUNCIONES PARA GIROS ---
+# Giros con el giroscopio: rápido al principio y más lento al acercarse al
+# rumbo objetivo, así que ya no hace falta compensar a mano (88, 89...).
+TOLERANCIA_GIRO = 1 # grados
+FRENADO_GIRO = 45 # grados antes del objetivo en que empieza a frenar
+VELOCIDAD_GIRO_MINIMA = 150 # int
+ACELERACION_GIRO = 6000 # int
+
+def rumbo() -> float:
+    """Yaw del hub en grados (girar a la izquierda lo aumenta)."""
+    return motion_sensor.tilt_angles()[0] / 10
+
+def _diferencia_angular(a: float, b: float) -> float:
+    return (a - b + 180) % 360 - 180
+
+async def _girar_giroscopio(grados: float, direccion: int, velocidad: int, signo: int) -> None:
+    """Gira `grados` de robot (signo 1: derecha, -1: izquierda) hasta que el yaw llegue al objetivo."""
+    soltar_objetivo()
+    # Se acumula lo girado en vez de comparar con un rumbo objetivo: con 180 o más
+    # la diferencia angular daría la vuelta y el giro acabaría nada más empezar.
+    girado = 0.0
+    anterior = rumbo()
+    while True:
+        actual = rumbo()
+        girado += signo * _diferencia_angular(anterior, actual)
+        anterior = actual
+        restante = grados - girado
+        if restante <= TOLERANCIA_GIRO + INERCIA_GIRO:
+            break
+        fraccion = min(1, restante / FRENADO_GIRO)
+        motor_pair.move(motor_pair.PAIR_1, signo * direccion,
+                        velocity=int(VELOCIDAD_GIRO_MINIMA + (velocidad - VELOCIDAD_GIRO_MINIMA) * fraccion),
+                        acceleration=ACELERACION_GIRO)
+        await runloop.sleep_ms(5)
+    motor_pair.stop(motor_pair.PAIR_1)
+
+async def girar_derecha_fase(grados: float = 90, direccion: int = 90, velocidad: int = 1000) -> None:
+    """Gira en fase a la derecha `grados` de robot medidos con el giroscopio."""
+    await _girar_giroscopio(grados, direccion, velocidad, 1)
+
+async def girar_izquierda_fase(grados: float = 90, direccion: int = 90, velocidad: int = 1000) -> None:
+    """Gira en fase a la izquierda `grados` de robot medidos con el giroscopio."""
+    await _girar_giroscopio(grados, direccion, velocidad, -1)
+
+def grados_pivote(grados: float) -> int:
+    """Grados de motor que debe girar una rueda para pivotar `grados` sobre la otra."""
+    # La rueda recorre un arco de radio ANCHO_EJE alrededor de la rueda quieta.
+    arco_cm = grados * math.pi / 180 * ANCHO_EJE
+    return cm_a_grados(arco_cm)
+
+async def girar_derecha_desfase(grados: float = 90, velocidad: int = 500) -> None:
+    """Gira a la derecha `grados` de robot moviendo solo el motor izquierdo (desfase)."""
+    soltar_objetivo()
+    # El motor izquierdo está montado en espejo: adelante es negativo.
+    await motor.run_for_degrees(motor_izquierda, -grados_pivote(grados), velocidad)
+
+async def girar_izquierda_desfase(grados: float = 90, velocidad: int = 500) -> None:
+    """Gira a la izquierda `grados` de robot moviendo solo el motor derecho (desfase)."""
+    soltar_objetivo()
+    await motor.run_for_degrees(motor_derecha, grados_pivote(grados), velocidad)
+
+# --- 5. FUNCIONES DE AVANCE ---
+# Perfiles trapezoidales de las rectas según su largo: (hasta cm, velocidad de
+# crucero, aceleración, deceleración), en grados/s y grados/s². Arrancar o
+# frenar más fuerte de lo que agarran las ruedas las hace patinar y se pierde
+# posición; los tramos largos van a VELOCIDAD_MAXIMA (la de la tabla medida)
+# y frenan con más margen. perfil_robot.py puede traer su propia tabla.
+ACELERACION_DEFECTO = 1000 # int, la de move_for_degrees sin parámetros
+PERFILES_RECTA = (
+    (30, 600, 2000, 2000),
+    (80, 800, 2000, 2000),
+    (150, VELOCIDAD_MAXIMA, 2000, 1500),
+    (float("inf"), VELOCIDAD_MAXIMA, 1500, 1500),
+)
+try:
+    from perfil_robot import PERFILES_RECTA
+except ImportError:
+    pass
+
+def perfil_recta(cm: float) -> tuple:
+    """(velocidad, aceleración, deceleración) por defecto para una recta de `cm`."""
+    for hasta_cm, velocidad, aceleracion, deceleracion in PERFILES_RECTA:
+        if abs(cm) <= hasta_cm:
+            return velocidad, aceleracion, deceleracion
+    return PERFILES_RECTA[-1][1:]
+
+# Modo absoluto: las rectas apuntan a un objetivo acumulado en el espacio del
+# encoder en vez de mover N grados relativos, así el redondeo de cada tramo y
+# lo que se pasó el anterior se corrigen solos. Los movimientos que no son
+# rectas (giros, avance indefinido, seguidor, cola de movimientos) sueltan el
+# objetivo y la recta siguiente parte de donde quedó el robot. Quien mueva los
+# motores directamente debe llamar a soltar_objetivo().
+def posicion_media() -> float:
+    """Grados recorridos hacia adelante, promedio de ambas ruedas."""
+    # El motor izquierdo está montado en espejo: adelante es negativo.
+    return (motor.relative_position(motor_derecha) - motor.relative_position(motor_izquierda)) / 2
+
+class ObjetivoEncoder:
+    """Objetivo acumulado de las rectas en grados de encoder (modo absoluto)."""
+
+    def __init__(self) -> None:
+        self.activo = False
+        self.base = None
+        self.grados = 0.0
+
+    def soltar(self) -> None:
+        self.base = None
+
+    def avanzar(self, grados: float) -> int:
+        """Suma `grados` al objetivo y devuelve los grados relativos que faltan para llegar."""
+        actual = posicion_media()
+        if self.base is None:
+            self.base = actual
+            self.grados = 0.0
+        self.grados += grados
+        return round(self.base + self.grados - actual)
+
+objetivo_encoder = ObjetivoEncoder()
+
+def modo_absoluto(activo: bool = True) -> None:
+    """Activa o desactiva el modo absoluto de las rectas."""
+    objetivo_encoder.activo = activo
+    objetivo_encoder.soltar()
+
+def soltar_objetivo() -> None:
+    """La próxima recta en modo absoluto parte de la posición actual."""
+    objetivo_encoder.soltar()
+
+async def _mover_grados(grados: float, velocidad: int, aceleracion: int, deceleracion: int) -> None:
+    if objetivo_encoder.activo:
+        relativos = objetivo_encoder.avanzar(grados)
+    else:
+        relativos = round(grados)
+    if relativos:
+        await motor_pair.move_for_degrees(motor_pair.PAIR_1, relativos, 0, velocity=velocidad,
+                                          acceleration=aceleracion, deceleration=deceleracion)
+
+async def _mover_recto(cm: float, signo: int, velocidad, aceleracion, deceleracion) -> None:
+    perfil = perfil_recta(cm)
+    # Sin redondear: en modo absoluto el objetivo acumula los cm exactos.
+    grados = signo * cm * GRADOS_POR_ROTACION / CIRCUNFERENCIA_RUEDA
+    await _mover_grados(grados, velocidad or perfil[0], aceleracion or perfil[1], deceleracion or perfil[2])
+
+async def avanzar_cm(cm: float, velocidad: int = None, aceleracion: int = None, deceleracion: int = None) -> None:
+    """Avanza recto `cm`; lo que no se indique sale de PERFILES_RECTA."""
+    await _mover_recto(cm, 1, velocidad, aceleracion, deceleracion)
+
+async def retroceder_cm(cm: float, velocidad: int = None, aceleracion: int = None, deceleracion: int = None) -> None:
+    """Retrocede recto `cm`; lo que no se indique sale de PERFILES_RECTA."""
+    await _mover_recto(cm, -1, velocidad, aceleracion, deceleracion)
+
+async def avanzar_grados(grados: int, velocidad: int = 500) -> None:
+    """Avanza recto la cantidad de grados de motor especificada."""
+    await _mover_grados(grados, velocidad, ACELERACION_DEFECTO, ACELERACION_DEFECTO)
+
+async def retroceder_grados(grados: int, velocidad: int = 500) -> None:
+    """Retrocede recto la cantidad de grados de motor especificada (valor negativo)."""
+    await _mover_grados(-grados, velocidad, ACELERACION_DEFECTO, ACELERACION_DEFECTO)
+
+async def avanzar_rotaciones(rotaciones: int, velocidad: int = 500) -> None:
+    """Avanza recto la cantidad de rotaciones especificadas."""
+    grados = GRADOS_POR_ROTACION * rotaciones
+    await _mover_grados(grados, velocidad, ACELERACION_DEFECTO, ACELERACION_DEFECTO)
+
+async def retroceder_rotaciones(rotaciones: int, velocidad: int = 500) -> None:
+    """Retrocede recto la cantidad de rotaciones especificadas."""
+    grados = GRADOS_POR_ROTACION * rotaciones
+    await _mover_grados(-grados, velocidad, ACELERACION_DEFECTO, ACELERACION_DEFECTO)
+
+# Funciones de Avance/Retroceso Indefinido
+def avanzar_indefinidamente(velocidad: int = 500) -> None:
+    soltar_objetivo()
+    motor_pair.move(motor_pair.PAIR_1, 0, velocity=velocidad)
+
+def retroceder_indefinidamente(velocidad: int = 500) -> None:
+    soltar_objetivo()
+    motor_pair.move(motor_pair.PAIR_1, 0, velocity=-velocidad)
+
+# --- 6. FUNCIÓN PAUSA ---
+async def pausa(segundos: float = 2) -> None:
+    """Pausa asíncrona no bloqueante."""
+    await runloop.sleep_ms(int(segundos * 1000))
+
+async def emote():
+    soltar_objetivo()
+    motor.run(motor_derecha, 1000)
+    light_matrix.show_image(light_matrix.IMAGE_HAPPY)
+    sound.beep(440, 10000, 100)
+    await pausa(10)
+    motor.stop(motor_derecha)
+
+#--- 7. FUNCIÓN DETENER MOVIMIENTO ---
+async def detener() -> None:
+    """Detener movimiento."""
+    motor_pair.stop(motor_pair.PAIR_1)
+
+#--- 8. FUNCIÓN SENSOR ULTRASÓNICO ---
+# Lecturas sin eco (None o -1) se tratan como "objeto muy lejos".
+SIN_ECO_MM = 2000 # int
+MUESTRAS_FILTRO = 5 # int
+
+def distancia_mm() -> int:
+    """Lectura del ultrasonido en mm, con SIN_ECO_MM si no hay eco."""
+    lectura = distance_sensor.distance(puerto_sensor_ultrasonico)
+    return SIN_ECO_MM if lectura is None or lectura < 0 else lectura
+
+class FiltroDistancia:
+    """Mediana de las últimas lecturas del ultrasonido en un búfer circular fijo.
+
+    Junto al búfer se guarda una copia ordenada de la ventana, reservada al
+    crear el filtro: cada lectura sustituye a la más antigua y se coloca en su
+    sitio desplazando a las vecinas, sin crear listas en el bucle de control.
+    """
+
+    def __init__(self, muestras: int = MUESTRAS_FILTRO) -> None:
+        self.lecturas = [SIN_ECO_MM] * muestras
+        self.ordenadas = [SIN_ECO_MM] * muestras
+        self.indice = 0
+
+    def agregar(self, lectura) -> int:
+        """Guarda una lectura en mm y devuelve la mediana actual."""
+        if lectura is None or lectura < 0:
+            lectura = SIN_ECO_MM
+        ordenadas = self.ordenadas
+        i = ordenadas.index(self.lecturas[self.indice])
+        self.lecturas[self.indice] = lectura
+        self.indice = (self.indice + 1) % len(self.lecturas)
+        while i > 0 and ordenadas[i - 1] > lectura:
+            ordenadas[i] = ordenadas[i - 1]
+            i -= 1
+        while i < len(ordenadas) - 1 and ordenadas[i + 1] < lectura:
+            ordenadas[i] = ordenadas[i + 1]
+            i += 1
+        ordenadas[i] = lectura
+        return ordenadas[len(ordenadas) // 2]
+
+async def avanzar_hasta_detectar_objeto(distancia_cm: float, velocidad: int = 500, frenar_desde_cm: float = 0,
+                                        velocidad_minima: int = 150, periodo_ms: int = 10) -> None:
+    """Avanza hasta que la distancia filtrada baje de `distancia_cm` y se detiene.
+
+    Con `frenar_desde_cm` la velocidad baja linealmente desde esa distancia
+    hasta `velocidad_minima` al llegar al objetivo.
+    """
+    filtro = FiltroDistancia()
+    objetivo = distancia_cm * 10
+    inicio_frenado = frenar_desde_cm * 10
+    avanzar_indefinidamente(velocidad)
+    while True:
+        distancia = filtro.agregar(distance_sensor.distance(puerto_sensor_ultrasonico))
+        if distancia <= objetivo:
+            break
+        if distancia < inicio_frenado:
+            fraccion = (distancia - objetivo) / (inicio_frenado - objetivo)
+            avanzar_indefinidamente(int(velocidad_minima + (velocidad - velocidad_minima) * fraccion))
+        await runloop.sleep_ms(periodo_ms)
+    motor_pair.stop(motor_pair.PAIR_1)
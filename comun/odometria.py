@@ -0,0 +1,189 @@
+# Pose del robot en el tapete estimada en segundo plano: encoders de las dos
+# ruedas para el avance, giroscopio para el rumbo y, al entrar en una línea
+# negra conocida, corrección contra su borde.
+#
+# Coordenadas como robotPoses del config JSON: x e y normalizadas (0..1)
+# respecto al tapete, y hacia abajo, theta en radianes creciendo al girar a
+# la derecha. herramientas/exportar_campo.py genera POSE_INICIAL y LINEAS.
+#
+# Uso en un reto:
+#     fijar_pose(*POSE_INICIAL)
+#     fijar_lineas(LINEAS)
+#     ...
+#     x, y, theta = pose()
+#     await ir_a(0.5, 0.4, theta=0.0)
+#     ...
+#     ejecutar_con_odometria(main())   # en lugar de runloop.run(main())
+import math
+import runloop
+import motor
+import color_sensor
+import color
+
+from movimiento import motor_izquierda, motor_derecha, puerto_sensor_color, CIRCUNFERENCIA_RUEDA, rumbo
+from eventos import muestreador
+from tareas import trabajadores, TRABAJADORES
+from trayecto import recorrer, recta, giro_derecha, giro_izquierda
+
+# --- 1. CONSTANTES ---
+PERIODO_MS = 10 # int
+# Tapete WRO estándar, el mismo que usa el config JSON.
+ANCHO_CAMPO_CM = 236.2 # float
+ALTO_CAMPO_CM = 114.3 # float
+# Distancia del eje de las ruedas al sensor de color, hacia delante.
+ADELANTO_SENSOR_CM = 6.0 # float
+# Solo se corrige contra un borde si la estimación está a menos de esto:
+# más lejos, lo más probable es que la línea vista sea otra.
+CAPTURA_CM = 4.0 # float
+# Por debajo de esto ir_a no gira.
+GIRO_MINIMO_GRADOS = 0.5 # float
+
+# --- 2. ODÓMETRO ---
+def _diferencia(a: float, b: float) -> float:
+    return (a - b + 180) % 360 - 180
+
+class Odometro:
+    """Tarea de fondo que integra la pose y la corrige al cruzar líneas."""
+
+    def __init__(self) -> None:
+        self.en_marcha = False
+        self.x = ANCHO_CAMPO_CM / 2
+        self.y = ALTO_CAMPO_CM / 2
+        self.theta = 0.0
+        # Rectángulos de las líneas como (x0, y0, x1, y1) en cm.
+        self.lineas = []
+        self.correcciones = 0
+        self.anteriores = None
+        self.color = None
+        self.sentido = 0
+
+    def _leer(self) -> tuple:
+        # absolute_position no cambia con reset_relative_position (seguidor, cola de
+        # movimientos); entre dos lecturas la rueda gira mucho menos de media vuelta.
+        return motor.absolute_position(motor_izquierda), motor.absolute_position(motor_derecha), rumbo()
+
+    def fijar_pose(self, x: float, y: float, theta: float) -> None:
+        self.x = x * ANCHO_CAMPO_CM
+        self.y = y * ALTO_CAMPO_CM
+        self.theta = theta
+        self.anteriores = self._leer()
+
+    def fijar_lineas(self, lineas) -> None:
+        self.lineas = [(x * ANCHO_CAMPO_CM, y * ALTO_CAMPO_CM, (x + w) * ANCHO_CAMPO_CM, (y + h) * ALTO_CAMPO_CM)
+                       for x, y, w, h in lineas]
+
+    def pose(self) -> tuple:
+        return self.x / ANCHO_CAMPO_CM, self.y / ALTO_CAMPO_CM, self.theta
+
+    def actualizar(self) -> None:
+        lectura = self._leer()
+        if self.anteriores is None:
+            self.anteriores = lectura
+            return
+        izquierda, derecha, yaw = lectura
+        # El motor izquierdo está montado en espejo: adelante es negativo.
+        grados = (_diferencia(derecha, self.anteriores[1]) - _diferencia(izquierda, self.anteriores[0])) / 2
+        avance = grados * CIRCUNFERENCIA_RUEDA / 360
+        # El yaw crece a la izquierda y theta a la derecha.
+        giro = -math.radians(_diferencia(yaw, self.anteriores[2]))
+        medio = self.theta + giro / 2
+        self.x += avance * math.cos(medio)
+        self.y += avance * math.sin(medio)
+        self.theta = (self.theta + giro) % (2 * math.pi)
+        self.anteriores = lectura
+        if avance:
+            self.sentido = 1 if avance > 0 else -1
+        if self.lineas:
+            anterior, self.color = self.color, color_sensor.color(puerto_sensor_color)
+            # Girando sobre sí mismo el sensor barre la línea de lado: ese cruce no sirve.
+            cruce = self.color == color.BLACK and anterior != color.BLACK
+            if cruce and abs(avance) > abs(giro) * ADELANTO_SENSOR_CM:
+                self.corregir()
+
+    def corregir(self) -> None:
+        """Mueve la pose para que el sensor quede sobre el borde de línea más cercano."""
+        sensor_x = self.x + ADELANTO_SENSOR_CM * math.cos(self.theta)
+        sensor_y = self.y + ADELANTO_SENSOR_CM * math.sin(self.theta)
+        # Hacia dónde se mueve el sensor: solo se puede entrar por el borde que mira hacia él.
+        avance_x = self.sentido * math.cos(self.theta)
+        avance_y = self.sentido * math.sin(self.theta)
+        mejor = None
+        for x0, y0, x1, y1 in self.lineas:
+            candidatos = []
+            if y0 - CAPTURA_CM <= sensor_y <= y1 + CAPTURA_CM:
+                candidatos += [(x0 - sensor_x, 0.0, avance_x > 0), (x1 - sensor_x, 0.0, avance_x < 0)]
+            if x0 - CAPTURA_CM <= sensor_x <= x1 + CAPTURA_CM:
+                candidatos += [(0.0, y0 - sensor_y, avance_y > 0), (0.0, y1 - sensor_y, avance_y < 0)]
+            for dx, dy, entrando in candidatos:
+                distancia = abs(dx) + abs(dy)
+                if entrando and distancia <= CAPTURA_CM and (mejor is None or distancia < mejor[0]):
+                    mejor = (distancia, dx, dy)
+        if mejor is not None:
+            # Solo se corrige la coordenada perpendicular al borde: a lo largo no se sabe nada.
+            self.x += mejor[1]
+            self.y += mejor[2]
+            self.correcciones += 1
+
+    async def ejecutar(self) -> None:
+        # en_marcha lo pone quien la arranca: si main() ya terminó, no empieza.
+        while self.en_marcha:
+            self.actualizar()
+            await runloop.sleep_ms(PERIODO_MS)
+
+    def parar(self) -> None:
+        self.en_marcha = False
+
+odometro = Odometro()
+
+# --- 3. FUNCIONES ---
+def pose() -> tuple:
+    """(x, y, theta) estimada, en las coordenadas de robotPoses."""
+    return odometro.pose()
+
+def fijar_pose(x: float, y: float, theta: float) -> None:
+    """Fija la pose actual (p. ej. la de salida del config JSON)."""
+    odometro.fijar_pose(x, y, theta)
+
+def fijar_lineas(lineas) -> None:
+    """Líneas negras conocidas como (x, y, w, h) normalizados, igual que colorAreas."""
+    odometro.fijar_lineas(lineas)
+
+def _giro(radianes: float):
+    """Segmento que gira `radianes` (positivo a la derecha) por el lado más corto, o None."""
+    grados = math.degrees(radianes) % 360
+    if grados > 180:
+        grados -= 360
+    if abs(grados) < GIRO_MINIMO_GRADOS:
+        return None
+    return giro_derecha(grados) if grados > 0 else giro_izquierda(-grados)
+
+async def ir_a(x: float, y: float, theta: float = None, velocidad: int = None) -> None:
+    """Gira hacia (x, y), va en línea recta hasta allí y, si se indica, gira a `theta`.
+
+    Parte de la pose estimada, así que corrige lo que se haya desviado el
+    robot. Para rutas con obstáculos usar herramientas/planificar_ruta.py.
+    """
+    dx = x * ANCHO_CAMPO_CM - odometro.x
+    dy = y * ALTO_CAMPO_CM - odometro.y
+    rumbo_destino = math.atan2(dy, dx)
+    segmentos = [_giro(rumbo_destino - odometro.theta), recta(math.hypot(dx, dy), velocidad)]
+    if theta is not None:
+        segmentos.append(_giro(theta - rumbo_destino))
+    await recorrer(*[segmento for segmento in segmentos if segmento is not None])
+
+# --- 4. EJECUCIÓN ---
+async def _principal(programa) -> None:
+    try:
+        await programa
+    finally:
+        odometro.parar()
+        trabajadores.parar()
+        muestreador.parar()
+
+def ejecutar_con_odometria(programa) -> None:
+    """Como ejecutar_con_tareas(programa), además con el odómetro en segundo plano."""
+    odometro.en_marcha = True
+    trabajadores.en_marcha = True
+    muestreador.en_marcha = True
+    runloop.run(_principal(programa), odometro.ejecutar(), muestreador.ejecutar(),
+                *[trabajadores.trabajar() for _ in range(TRABAJADORES)])
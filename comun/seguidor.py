@@ -0,0 +1,45 @@
+# Seguidor de línea PID sobre la reflexión del sensor de color.
+# Sustituye a los bucles de dos estados (NEGRO -> move_tank(1000, 900),
+# si no -> move_tank(900, 1000)) que hacen oscilar al robot sobre la línea.
+import runloop
+import motor_pair
+import motor
+import color_sensor
+
+from movimiento import motor_derecha, puerto_sensor_color, soltar_objetivo, VELOCIDAD_MAXIMA
+
+# --- 1. CONSTANTES DEL SEGUIDOR ---
+# Reflexión (%) en el borde de la línea: mitad entre negro (~8) y blanco (~98).
+REFLEXION_BORDE = 50
+# Aceleración de las correcciones: con la de defecto (1000) la rueda tarda
+# demasiado en responder y el PID oscila.
+ACELERACION_SEGUIDOR = 10000 # int
+# Borde que se sigue. DERECHO equivale a los bucles antiguos: en negro gira a la derecha.
+BORDE_DERECHO = 1
+BORDE_IZQUIERDO = -1
+
+# Ganancias por defecto (ajustadas con herramientas/comparar_seguidores.py).
+KP = 4.0
+KI = 0.01
+KD = 40.0
+LIMITE_INTEGRAL = 2000
+
+# --- 2. FUNCIÓN SEGUIDOR PID ---
+def _limitar(velocidad: float) -> int:
+    return int(max(-VELOCIDAD_MAXIMA, min(VELOCIDAD_MAXIMA, velocidad)))
+
+async def seguir_linea(grados: int, velocidad: int = 900, kp: float = KP, ki: float = KI, kd: float = KD,
+                       borde: int = BORDE_DERECHO, objetivo: int = REFLEXION_BORDE, periodo_ms: int = 10) -> None:
+    """Sigue el borde de la línea hasta que el motor derecho recorra `grados`."""
+    soltar_objetivo()
+    motor.reset_relative_position(motor_derecha, 0)
+    integral = 0
+    error_anterior = 0
+    while abs(motor.relative_position(motor_derecha)) < grados:
+        error = color_sensor.reflection(puerto_sensor_color) - objetivo
+        integral = max(-LIMITE_INTEGRAL, min(LIMITE_INTEGRAL, integral + error))
+        correccion = borde * (kp * error + ki * integral + kd * (error - error_anterior))
+        error_anterior = error
+        motor_pair.move_tank(motor_pair.PAIR_1, _limitar(velocidad - correccion), _limitar(velocidad + correccion),
+                             acceleration=ACELERACION_SEGUIDOR)
+        await runloop.sleep_ms(periodo_ms)
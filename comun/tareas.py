@@ -0,0 +1,112 @@
+# Movimientos en paralelo (garra mientras el robot avanza o gira) sobre
+# runloop: un grupo fijo de trabajadores de fondo ejecuta las corrutinas que
+# main() les pasa con iniciar().
+#
+# Uso en un reto:
+#     garra = iniciar(bajar_garra())
+#     await avanzar_cm(30)                 # la garra baja durante el avance
+#     await garra.esperar()                # o: await todas(garra, ...)
+#     indice = await primera(iniciar(subir_garra()), iniciar(retroceder_cm(10)))
+#     ...
+#     ejecutar_con_tareas(main())          # en lugar de runloop.run(main())
+import runloop
+
+from eventos import muestreador
+
+# --- 1. CONSTANTES ---
+# Tareas que pueden correr a la vez además de main().
+TRABAJADORES = 2 # int
+
+# --- 2. TAREAS ---
+class Tarea:
+    """Corrutina entregada a los trabajadores; `terminada` pasa a True al acabar.
+
+    Si la corrutina lanza una excepción, la tarea termina igual y la guarda en
+    `error` para que esperar() la vuelva a lanzar en quien la espera.
+    """
+
+    def __init__(self, corrutina) -> None:
+        self.corrutina = corrutina
+        self.terminada = False
+        self.resultado = None
+        self.error = None
+
+    async def esperar(self):
+        await runloop.until(lambda: self.terminada)
+        if self.error is not None:
+            raise self.error
+        return self.resultado
+
+class Trabajadores:
+    """Cola de tareas pendientes y los trabajadores que la vacían."""
+
+    def __init__(self) -> None:
+        self.pendientes = []
+        self.en_marcha = False
+
+    def iniciar(self, corrutina) -> Tarea:
+        if not self.en_marcha:
+            raise RuntimeError("Los trabajadores no están en marcha: usa ejecutar_con_tareas(main())")
+        tarea = Tarea(corrutina)
+        self.pendientes.append(tarea)
+        return tarea
+
+    async def trabajar(self) -> None:
+        # Al terminar main() se acaban las tareas ya entregadas antes de salir.
+        while True:
+            await runloop.until(lambda: self.pendientes or not self.en_marcha)
+            if not self.pendientes:
+                return
+            tarea = self.pendientes.pop(0)
+            # Un fallo en la tarea no debe matar al trabajador ni dejar colgado a quien la espera.
+            try:
+                tarea.resultado = await tarea.corrutina
+            except Exception as error:
+                tarea.error = error
+            finally:
+                tarea.terminada = True
+
+    def parar(self) -> None:
+        self.en_marcha = False
+
+trabajadores = Trabajadores()
+
+# --- 3. FUNCIONES ---
+def iniciar(corrutina) -> Tarea:
+    """Empieza `corrutina` en segundo plano y devuelve su Tarea sin esperar."""
+    return trabajadores.iniciar(corrutina)
+
+async def todas(*tareas) -> list:
+    """Espera a que terminen todas las tareas y devuelve sus resultados.
+
+    Si alguna falló, relanza su excepción.
+    """
+    return [await tarea.esperar() for tarea in tareas]
+
+async def primera(*tareas) -> int:
+    """Espera a la primera tarea que termine y devuelve su índice.
+
+    Las demás siguen en marcha; si hay que cortarlas, detener sus motores.
+    Si la primera en terminar falló, relanza su excepción.
+    """
+    await runloop.until(lambda: any(tarea.terminada for tarea in tareas))
+    for indice, tarea in enumerate(tareas):
+        if tarea.terminada:
+            if tarea.error is not None:
+                raise tarea.error
+            return indice
+
+# --- 4. EJECUCIÓN ---
+async def _principal(programa) -> None:
+    try:
+        await programa
+    finally:
+        trabajadores.parar()
+        muestreador.parar()
+
+def ejecutar_con_tareas(programa) -> None:
+    """Como runloop.run(programa), con los trabajadores y el muestreador de eventos en paralelo."""
+    trabajadores.en_marcha = True
+    muestreador.en_marcha = True
+    runloop.run(_principal(programa), *[trabajadores.trabajar() for _ in range(TRABAJADORES)],
+                muestreador.ejecutar())
@@ -0,0 +1,251 @@
+# Telemetría de la misión: una tarea de fondo muestrea encoders, yaw y
+# sensores en un búfer circular que se reserva entero al arrancar. Una muestra
+# escribe enteros en columnas ya reservadas, sin hacerlas crecer; lo único
+# que crea es la tupla de tilt_angles() si se pide el yaw, así que el
+# registrador apenas da trabajo al recolector de basura en medio de los bucles
+# de control. Al terminar main() el búfer se vuelca al flash en registros
+# binarios de ancho fijo, que herramientas/telemetria.py decodifica y analiza
+# en el ordenador.
+#
+# Solo se muestrea cuando main() cede el control (await): un bucle sin await,
+# como los antiguos seguidores de dos estados, no deja registrar nada.
+#
+# Uso en un reto:
+#     marcar_bloque(3)                     # al empezar el "# Bloque 3: ..."
+#     ...
+#     ejecutar_con_telemetria(main(), "reto2", canales=ENCODERS | YAW, periodo_ms=20)
+#
+# Formato de /flash/telemetria_<reto>_NNN.bin (little endian, un archivo por
+# ejecución): la cabecera CABECERA y después un registro por muestra, de la más
+# antigua a la más reciente. Cada registro empieza por el tiempo en ms desde el
+# arranque (I) y el bloque (B), y sigue solo con los canales pedidos, en este orden:
+#     ENCODERS   izquierda, derecha (i, i): grados acumulados de cada motor; el
+#                izquierdo está en espejo, así que al avanzar decrece
+#     YAW        décimas de grado (h), como tilt_angles(); crece a la izquierda
+#     COLOR      color.* (b); -1 si no reconoce ninguno
+#     REFLEXION  0..100 (B)
+#     DISTANCIA  mm (h); -1 sin eco
+import os
+import struct
+import time
+import runloop
+import motor
+import color_sensor
+import distance_sensor
+from array import array
+from hub import motion_sensor
+
+from movimiento import motor_izquierda, motor_derecha, puerto_sensor_color, puerto_sensor_ultrasonico
+from eventos import muestreador
+from tareas import trabajadores, TRABAJADORES
+
+# --- 1. CONSTANTES ---
+PERIODO_MS = 20 # int
+# Muestras que caben en el búfer; al llenarse se pisan las más antiguas.
+# Tiene que cubrir la misión entera: herramientas/reproducir.py rechaza los
+# registros con muestras pisadas.
+CAPACIDAD = 3000 # int
+# Carpeta de los registros. El hub emulado la cambia por una del ordenador
+# (o por None para no guardar nada).
+CARPETA = "/flash" # str
+# Canales (máscara de bits).
+ENCODERS = 1
+YAW = 2
+COLOR = 4
+REFLEXION = 8
+DISTANCIA = 16
+# Cabecera: firma, versión, canales, periodo_ms, muestras guardadas y muestras
+# pisadas por el búfer circular.
+FIRMA = b"TLMT"
+VERSION = 1
+CABECERA = "<4sBBHII"
+# Campos de cada canal dentro del registro, en el orden en que se escriben.
+CAMPOS = ((ENCODERS, "ii"), (YAW, "h"), (COLOR, "b"), (REFLEXION, "B"), (DISTANCIA, "h"))
+# Registros que se empaquetan antes de cada escritura en el flash.
+REGISTROS_ESCRITURA = 64 # int
+
+def formato_registro(canales: int) -> str:
+    """Formato de struct de un registro con `canales`."""
+    formato = "<IB"
+    for canal, campos in CAMPOS:
+        if canales & canal:
+            formato += campos
+    return formato
+
+# --- 2. REGISTRADOR ---
+def _diferencia(a: int, b: int) -> int:
+    return (a - b + 180) % 360 - 180
+
+class Registrador:
+    """Tarea de fondo que guarda una muestra cada `periodo_ms` en columnas preasignadas."""
+
+    def __init__(self) -> None:
+        self.en_marcha = False
+        self.configurar("", 0, PERIODO_MS, 0)
+
+    def configurar(self, reto: str, canales: int, periodo_ms: int, capacidad: int) -> None:
+        """Reserva el búfer: una columna por campo, vacía si su canal no se muestrea."""
+        self.reto = reto
+        self.canales = canales
+        self.periodo_ms = periodo_ms
+        self.capacidad = capacidad
+        self.bloque = 0
+
+        def columna(tipo: str, canal: int = 0) -> array:
+            # array() copia los bytes tal cual: `capacidad` ceros del tipo.
+            muestras = capacidad if canal == 0 or canales & canal else 0
+            return array(tipo, bytes(muestras * struct.calcsize(tipo)))
+
+        self.tiempo = columna("I")
+        self.bloques = columna("B")
+        self.izquierda = columna("i", ENCODERS)
+        self.derecha = columna("i", ENCODERS)
+        self.yaw = columna("h", YAW)
+        self.color = columna("b", COLOR)
+        self.reflexion = columna("B", REFLEXION)
+        self.distancia = columna("h", DISTANCIA)
+        self.siguiente = 0
+        self.total = 0
+        self.grados_izquierda = 0
+        self.grados_derecha = 0
+        self.anterior_izquierda = None
+        self.anterior_derecha = None
+        self.inicio = None
+
+    def muestrear(self) -> None:
+        # Se lee todo antes de escribir: si una lectura falla, el búfer no queda a medias.
+        canales = self.canales
+        ahora = time.ticks_ms()
+        if self.inicio is None:
+            self.inicio = ahora
+        if canales & ENCODERS:
+            # absolute_position no cambia con reset_relative_position (seguidor, cola
+            # de movimientos); entre dos muestras la rueda gira menos de media vuelta.
+            izquierda = motor.absolute_position(motor_izquierda)
+            derecha = motor.absolute_position(motor_derecha)
+        if canales & YAW:
+            yaw = motion_sensor.tilt_angles()[0]
+        if canales & COLOR:
+            lectura_color = color_sensor.color(puerto_sensor_color)
+        if canales & REFLEXION:
+            reflexion = color_sensor.reflection(puerto_sensor_color)
+        if canales & DISTANCIA:
+            distancia = distance_sensor.distance(puerto_sensor_ultrasonico)
+
+        i = self.siguiente
+        self.tiempo[i] = time.ticks_diff(ahora, self.inicio)
+        self.bloques[i] = self.bloque
+        if canales & ENCODERS:
+            if self.anterior_izquierda is not None:
+                self.grados_izquierda += _diferencia(izquierda, self.anterior_izquierda)
+                self.grados_derecha += _diferencia(derecha, self.anterior_derecha)
+            self.anterior_izquierda = izquierda
+            self.anterior_derecha = derecha
+            self.izquierda[i] = self.grados_izquierda
+            self.derecha[i] = self.grados_derecha
+        if canales & YAW:
+            self.yaw[i] = yaw
+        if canales & COLOR:
+            self.color[i] = lectura_color
+        if canales & REFLEXION:
+            self.reflexion[i] = reflexion
+        if canales & DISTANCIA:
+            self.distancia[i] = -1 if distancia is None else distancia
+        self.siguiente = i + 1 if i + 1 < self.capacidad else 0
+        self.total += 1
+
+    async def ejecutar(self) -> None:
+        # en_marcha lo pone quien la arranca: si main() ya terminó, no empieza.
+        while self.en_marcha:
+            self.muestrear()
+            await runloop.sleep_ms(self.periodo_ms)
+
+    def parar(self) -> None:
+        self.en_marcha = False
+
+    def _valores(self, i: int) -> list:
+        valores = [self.tiempo[i], self.bloques[i]]
+        if self.canales & ENCODERS:
+            valores += [self.izquierda[i], self.derecha[i]]
+        if self.canales & YAW:
+            valores.append(self.yaw[i])
+        if self.canales & COLOR:
+            valores.append(self.color[i])
+        if self.canales & REFLEXION:
+            valores.append(self.reflexion[i])
+        if self.canales & DISTANCIA:
+            valores.append(self.distancia[i])
+        return valores
+
+    def _ruta(self) -> str:
+        """Primer telemetria_<reto>_NNN.bin libre: cada ejecución va a su archivo."""
+        prefijo = "telemetria_" + self.reto + "_"
+        ultimo = 0
+        for nombre in os.listdir(CARPETA):
+            numero = nombre[len(prefijo):-len(".bin")]
+            if nombre.startswith(prefijo) and nombre.endswith(".bin") and numero.isdigit():
+                ultimo = max(ultimo, int(numero))
+        return "%s/%s%03d.bin" % (CARPETA, prefijo, ultimo + 1)
+
+    def guardar(self) -> str:
+        """Vuelca el búfer al flash y devuelve la ruta (None si CARPETA es None)."""
+        if CARPETA is None:
+            return None
+        muestras = min(self.total, self.capacidad)
+        primera = self.siguiente if self.total > self.capacidad else 0
+        formato = formato_registro(self.canales)
+        tamano = struct.calcsize(formato)
+        paquete = bytearray(tamano * REGISTROS_ESCRITURA)
+        ruta = self._ruta()
+        with open(ruta, "wb") as archivo:
+            archivo.write(struct.pack(CABECERA, FIRMA, VERSION, self.canales, self.periodo_ms, muestras,
+                                      self.total - muestras))
+            llenos = 0
+            for k in range(muestras):
+                struct.pack_into(formato, paquete, llenos * tamano, *self._valores((primera + k) % self.capacidad))
+                llenos += 1
+                if llenos == REGISTROS_ESCRITURA:
+                    archivo.write(paquete)
+                    llenos = 0
+            archivo.write(memoryview(paquete)[:llenos * tamano])
+        return ruta
+
+registrador = Registrador()
+
+# --- 3. FUNCIONES ---
+def marcar_bloque(numero: int) -> None:
+    """Las muestras siguientes se guardan como del bloque `numero` (0..255)."""
+    registrador.bloque = numero
+
+# --- 4. EJECUCIÓN ---
+async def _principal(programa, fondo) -> None:
+    try:
+        await programa
+    finally:
+        for tarea in fondo:
+            tarea.parar()
+        trabajadores.parar()
+        muestreador.parar()
+
+def ejecutar_con_telemetria(programa, reto: str, canales: int = ENCODERS | YAW, periodo_ms: int = PERIODO_MS,
+                            capacidad: int = CAPACIDAD, fondo=()) -> str:
+    """Como ejecutar_con_tareas(programa), con el registrador en segundo plano.
+
+    `fondo` son otras tareas con ejecutar() y parar(), como el odómetro de
+    odometria.py. Al terminar (también si main() falla) guarda la telemetría y
+    devuelve la ruta.
+    """
+    registrador.configurar(reto, canales, periodo_ms, capacidad)
+    fondo = (registrador,) + tuple(fondo)
+    for tarea in fondo:
+        tarea.en_marcha = True
+    trabajadores.en_marcha = True
+    muestreador.en_marcha = True
+    corrutinas = [tarea.ejecutar() for tarea in fondo] + [trabajadores.trabajar() for _ in range(TRABAJADORES)]
+    try:
+        runloop.run(_principal(programa, fondo), muestreador.ejecutar(), *corrutinas)
+        # Última muestra con el robot ya parado.
+        registrador.muestrear()
+    finally:
+        ruta = registrador.guardar()
+    return ruta
@@ -0,0 +1,165 @@
+# Cola de movimientos: ejecuta una secuencia de rectas, arcos y giros sin
+# frenar a cero entre segmentos salvo donde el siguiente lo exige (cambio de
+# sentido o giro sobre el eje). Las rectas se guían por objetivos de encoder acumulados,
+# así lo que se pasa un tramo se descuenta del siguiente.
+#
+# Uso en un reto:
+#     await recorrer(
+#         recta(89, 600),
+#         giro_derecha(90),
+#         recta(250, 900),
+#         arco_izquierda(20, 90, 600),   # radio 20 cm, sin detenerse
+#         recta(60, 600),
+#     )
+import math
+import runloop
+import motor_pair
+import motor
+
+import movimiento
+from movimiento import (
+    motor_izquierda,
+    motor_derecha,
+    cm_a_grados,
+    perfil_recta,
+    posicion_media,
+    soltar_objetivo,
+    girar_derecha_fase,
+    girar_izquierda_fase,
+    rumbo,
+    VELOCIDAD_MAXIMA,
+)
+
+# --- 1. CONSTANTES ---
+ACELERACION_COLA = 2000 # int, grados/s² de subida y bajada en los arcos
+VELOCIDAD_MINIMA_COLA = 100 # int, para no quedarse parado justo antes del objetivo
+PERIODO_MS = 5 # int
+# Corrección de dirección por cada grado de diferencia entre ruedas: mantiene
+# la recta aunque una rueda arranque con retraso (p. ej. justo tras un giro).
+KP_SINCRONIA = 2.0 # float
+
+RECTA = 0
+GIRO = 1
+ARCO = 2
+
+# --- 2. SEGMENTOS ---
+def recta(cm: float, velocidad: int = None, aceleracion: int = None, deceleracion: int = None) -> tuple:
+    """Tramo recto de `cm` (negativo: hacia atrás); lo que no se indique sale de PERFILES_RECTA."""
+    perfil = perfil_recta(cm)
+    # Sin redondear: recorrer() solo redondea el objetivo acumulado, como el modo absoluto.
+    grados = cm * movimiento.GRADOS_POR_ROTACION / movimiento.CIRCUNFERENCIA_RUEDA
+    return RECTA, grados, abs(velocidad or perfil[0]), aceleracion or perfil[1], deceleracion or perfil[2]
+
+def giro_derecha(grados: float = 90, velocidad: int = 1000) -> tuple:
+    return GIRO, grados, velocidad
+
+def giro_izquierda(grados: float = 90, velocidad: int = 1000) -> tuple:
+    return GIRO, -grados, velocidad
+
+def arco_derecha(radio_cm: float, grados: float = 90, velocidad: int = 500) -> tuple:
+    """Curva hacia adelante de `radio_cm` (al centro del eje); `velocidad` es la del centro."""
+    return ARCO, grados, velocidad, radio_cm
+
+def arco_izquierda(radio_cm: float, grados: float = 90, velocidad: int = 500) -> tuple:
+    return ARCO, -grados, velocidad, radio_cm
+
+# --- 3. EJECUCIÓN ---
+def _avances():
+    """Grados recorridos hacia adelante por (rueda izquierda, rueda derecha)."""
+    # El motor izquierdo está montado en espejo: adelante es negativo.
+    return -motor.relative_position(motor_izquierda), motor.relative_position(motor_derecha)
+
+def _sentido(segmento) -> int:
+    """1 si el segmento avanza, -1 si retrocede y 0 si gira sobre el eje."""
+    if segmento is None or segmento[0] == GIRO:
+        return 0
+    if segmento[0] == ARCO:
+        return 1
+    return 1 if segmento[1] > 0 else -1
+
+def _velocidad_final(segmento: tuple, siguiente) -> int:
+    """Velocidad a la que puede acabar un tramo para enlazar con el siguiente segmento."""
+    if _sentido(siguiente) != _sentido(segmento):
+        return 0
+    return min(segmento[2], siguiente[2])
+
+async def _recorrer_recta(objetivo: float, segmento: tuple, velocidad_inicial: int, velocidad_final: int) -> None:
+    velocidad, aceleracion, deceleracion = segmento[2], segmento[3], segmento[4]
+    inicio = posicion_media()
+    signo = 1 if objetivo > inicio else -1
+    while True:
+        izquierda, derecha = _avances()
+        media = (izquierda + derecha) / 2
+        restante = (objetivo - media) * signo
+        if restante <= 0:
+            break
+        # Trapecio: rampa de subida desde velocidad_inicial y de bajada hasta velocidad_final.
+        subida = math.sqrt(velocidad_inicial * velocidad_inicial + 2 * aceleracion * max(0, (media - inicio) * signo))
+        bajada = math.sqrt(velocidad_final * velocidad_final + 2 * deceleracion * restante)
+        v = max(VELOCIDAD_MINIMA_COLA, min(velocidad, subida, bajada))
+        # Si la izquierda va adelantada se gira a la izquierda (dirección negativa), y al revés.
+        direccion = max(-100, min(100, int(-KP_SINCRONIA * (izquierda - derecha) * signo)))
+        motor_pair.move(motor_pair.PAIR_1, direccion, velocity=int(signo * v),
+                        acceleration=max(aceleracion, deceleracion))
+        await runloop.sleep_ms(PERIODO_MS)
+    if not velocidad_final:
+        motor_pair.stop(motor_pair.PAIR_1)
+
+async def _recorrer_arco(grados: float, radio_cm: float, velocidad: int, velocidad_final: int) -> None:
+    signo = 1 if grados > 0 else -1
+    medio_eje = movimiento.ANCHO_EJE / 2
+    exterior = (radio_cm + medio_eje) / radio_cm
+    interior = (radio_cm - medio_eje) / radio_cm
+    # La rueda exterior va más rápida que el centro: no puede pasar del tope.
+    velocidad = min(velocidad, VELOCIDAD_MAXIMA / exterior)
+    restante = abs(grados)
+    anterior = rumbo()
+    while True:
+        actual = rumbo()
+        restante -= signo * ((anterior - actual + 180) % 360 - 180)
+        anterior = actual
+        if restante <= movimiento.TOLERANCIA_GIRO + movimiento.INERCIA_GIRO:
+            break
+        # Lo que falta del arco, en grados de motor del centro del eje.
+        restante_grados = cm_a_grados(math.radians(restante) * radio_cm)
+        limite = math.sqrt(velocidad_final * velocidad_final + 2 * ACELERACION_COLA * restante_grados)
+        v = max(VELOCIDAD_MINIMA_COLA, min(velocidad, limite))
+        if signo > 0:
+            izquierda, derecha = v * exterior, v * interior
+        else:
+            izquierda, derecha = v * interior, v * exterior
+        motor_pair.move_tank(motor_pair.PAIR_1, int(izquierda), int(derecha), acceleration=ACELERACION_COLA)
+        await runloop.sleep_ms(PERIODO_MS)
+    if not velocidad_final:
+        motor_pair.stop(motor_pair.PAIR_1)
+
+async def recorrer(*segmentos) -> None:
+    """Ejecuta los segmentos en orden, enlazando rectas y arcos sin detenerse."""
+    # La cola lleva su propio objetivo acumulado y pone los encoders a cero.
+    soltar_objetivo()
+    objetivo = None
+    velocidad_inicial = 0
+    for indice, segmento in enumerate(segmentos):
+        tipo, cantidad, velocidad = segmento[0], segmento[1], segmento[2]
+        siguiente = segmentos[indice + 1] if indice + 1 < len(segmentos) else None
+        if tipo == GIRO:
+            velocidad_inicial = 0
+            if cantidad > 0:
+                await girar_derecha_fase(cantidad, velocidad=velocidad)
+            else:
+                await girar_izquierda_fase(-cantidad, velocidad=velocidad)
+        elif tipo == ARCO:
+            velocidad_inicial = _velocidad_final(segmento, siguiente)
+            await _recorrer_arco(cantidad, segmento[3], velocidad, velocidad_inicial)
+        else:
+            if objetivo is None:
+                motor.reset_relative_position(motor_izquierda, 0)
+                motor.reset_relative_position(motor_derecha, 0)
+                objetivo = 0
+            objetivo += cantidad
+            velocidad_final = _velocidad_final(segmento, siguiente)
+            await _recorrer_recta(round(objetivo), segmento, velocidad_inicial, velocidad_final)
+            velocidad_inicial = velocidad_final
+            continue
+        # Giros y arcos mueven las ruedas distinto: la recta siguiente parte de donde quedó el robot.
+        objetivo = None
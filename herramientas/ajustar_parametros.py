@@ -0,0 +1,187 @@
+"""Ajusta las velocidades de un reto en simulación: el menor tiempo dentro de un presupuesto de precisión.
+
+Uso:
+    python -m herramientas.ajustar_parametros Reto2/Reto2_Spike.py [--ejecuciones 200] [--procesos 4]
+        [--exito-minimo 0.9] [--error-cm 8] [--pasadas 2] [--solo-mostrar]
+
+Los parámetros son los que el reto consulta con ajuste("nombre", defecto)
+(comun/ajustes.py): velocidad de cada recta, giro y tramo de seguidor. El
+ajuste va parámetro a parámetro (descenso por coordenadas). Para cada uno
+prueba varias velocidades alrededor de la actual: graba la secuencia del reto
+con esa tabla en el hub emulado y la replica con ruido en un lote de robots
+(herramientas/montecarlo.py). Las candidatas de un parámetro se evalúan en
+paralelo con un pool de procesos, y todas usan la misma semilla para que
+compitan con el mismo ruido.
+
+Se queda con la más rápida (tiempo p50 de las ejecuciones sin fallos) que
+cumple el presupuesto:
+- tasa de éxito de al menos --exito-minimo;
+- error de pose p95 de como mucho --error-cm respecto a la pose final del reto
+  sin ajustar en el hub emulado.
+
+Por defecto el presupuesto es el del reto sin ajustar, con 2 puntos de éxito
+y 1 cm de margen. No se ajusta un reto que sin ajustar acierta menos del
+EXITO_INICIAL_MINIMO (con un 0% cualquier candidata cumple el presupuesto) ni
+uno con órdenes de sensor que no tienen nada que leer en su campo (esperar un
+color que no está, seguir una línea que no hay). La tabla se escribe en RetoN/ajustes_retoN.py, que el reto
+carga con cargar_ajustes("retoN") y que se sube al flash junto al programa.
+"""
+import argparse
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from herramientas.montecarlo import ModeloRuido, TOLERANCIA_CM, TOLERANCIA_GRADOS, resultados_lote, resumir
+from simulador import mundo_para_programa
+from simulador.lote import Secuencia, grabar_secuencia, replicar
+
+EJECUCIONES = 200
+PASADAS = 2
+# Velocidades candidatas, relativas a la actual del parámetro.
+FACTORES = (0.7, 0.85, 1.15, 1.3)
+VELOCIDAD_MINIMA = 100
+# Margen por defecto sobre el reto sin ajustar.
+MARGEN_EXITO = 0.02
+MARGEN_ERROR_CM = 1.0
+# Por debajo de este éxito sin ajustar no hay precisión que proteger.
+EXITO_INICIAL_MINIMO = 0.25
+# Mejoras menores que esto (s) no cambian la tabla.
+MEJORA_MINIMA = 0.01
+
+
+def archivo_ajustes(ruta) -> Path:
+    """RetoN/ajustes_retoN.py para RetoN/RetoN_Spike.py."""
+    ruta = Path(ruta)
+    return ruta.parent / ("ajustes_%s.py" % ruta.stem.split("_")[0].lower())
+
+
+def falta_en_campo(secuencia, campo) -> str:
+    """Primera orden de sensor que no tiene nada que leer en el campo, descrita; None si no hay."""
+    for indice, orden in enumerate(secuencia.ordenes):
+        if orden.tipo == "esperar_color":
+            colores = {campo.color_fondo} | {area.color for area in campo.areas} if campo else set()
+            if orden.valores["objetivo"] not in colores:
+                return "la orden %d espera el color %s y el campo no lo tiene" % (indice, orden.valores["objetivo"])
+        elif orden.tipo == "seguir_linea":
+            if campo is None or not campo.areas:
+                return "la orden %d sigue una línea y el campo no tiene ninguna" % indice
+        elif orden.tipo in ("esperar_distancia", "acercarse"):
+            if campo is None or not (campo.paredes or campo.obstaculos):
+                return "la orden %d mide distancias y el campo no tiene paredes ni obstáculos" % indice
+    return None
+
+
+def evaluar(ruta, tabla: dict, referencia: Secuencia, modelo: ModeloRuido, ejecuciones: int, semilla: int,
+            tolerancia_cm: float = TOLERANCIA_CM, tolerancia_grados: float = TOLERANCIA_GRADOS) -> dict:
+    """Resumen de montecarlo.resumir() para el reto con la tabla `tabla` (None si no termina)."""
+    secuencia = grabar_secuencia(ruta, ajustes=tabla)
+    if not secuencia.completa:
+        return None
+    lote = replicar(modelo.lote(ejecuciones, mundo_para_programa(ruta).campo, semilla), secuencia)
+    return resumir(referencia, resultados_lote(lote), secuencia, tolerancia_cm, tolerancia_grados)
+
+
+def candidatas(valor: float, maxima: int) -> list:
+    valores = {max(VELOCIDAD_MINIMA, min(maxima, round(valor * factor))) for factor in FACTORES}
+    return sorted(valores - {valor})
+
+
+def ajustar(ruta, ejecuciones: int = EJECUCIONES, modelo: ModeloRuido = None, procesos: int = None,
+            exito_minimo: float = None, error_cm: float = None, pasadas: int = PASADAS, semilla: int = 0,
+            informar=print) -> tuple:
+    """Devuelve (tabla ajustada, resumen inicial, resumen final)."""
+    modelo = modelo or ModeloRuido()
+    base = grabar_secuencia(ruta)
+    if not base.completa:
+        raise ValueError("%s no termina en el hub emulado: no hay tiempo que mejorar" % ruta)
+    if not base.ajustes:
+        raise ValueError("%s no consulta ningún ajuste(): no hay parámetros que ajustar" % ruta)
+    campo = mundo_para_programa(ruta).campo
+    falta = falta_en_campo(base, campo)
+    if falta:
+        raise ValueError("%s: %s, así que el lote no evalúa lo que hará en la pista" % (ruta, falta))
+    tabla = dict(base.ajustes)
+    inicial = actual = evaluar(ruta, tabla, base, modelo, ejecuciones, semilla)
+    if inicial["exito"] < EXITO_INICIAL_MINIMO:
+        raise ValueError("%s acierta un %.1f%% sin ajustar (mínimo %.0f%%): no hay precisión que proteger" % (
+            ruta, inicial["exito"] * 100, EXITO_INICIAL_MINIMO * 100))
+    if exito_minimo is None:
+        exito_minimo = inicial["exito"] - MARGEN_EXITO
+    if error_cm is None:
+        error_cm = inicial["error_cm_p95"] + MARGEN_ERROR_CM
+    informar("inicial: %.2f s, éxito %.1f%%, error p95 %.1f cm (presupuesto: éxito >= %.1f%%, error <= %.1f cm)" % (
+        inicial["tiempo_terminadas_p50"], inicial["exito"] * 100, inicial["error_cm_p95"], exito_minimo * 100, error_cm))
+
+    def cumple(resumen) -> bool:
+        return (resumen is not None and resumen["tiempo_terminadas_p50"] is not None
+                and resumen["exito"] >= exito_minimo and resumen["error_cm_p95"] <= error_cm)
+
+    maxima = base.constantes["VELOCIDAD_MAXIMA"]
+    with ProcessPoolExecutor(procesos) as pool:
+        for _ in range(pasadas):
+            mejoro = False
+            for nombre in tabla:
+                valores = candidatas(tabla[nombre], maxima)
+                tablas = [dict(tabla, **{nombre: valor}) for valor in valores]
+                n = len(tablas)
+                resumenes = list(pool.map(evaluar, [ruta] * n, tablas, [base] * n, [modelo] * n,
+                                          [ejecuciones] * n, [semilla] * n))
+                validas = [(resumen["tiempo_terminadas_p50"], valor, resumen)
+                           for valor, resumen in zip(valores, resumenes) if cumple(resumen)]
+                if not validas:
+                    continue
+                tiempo, valor, resumen = min(validas, key=lambda candidata: candidata[0])
+                if tiempo < actual["tiempo_terminadas_p50"] - MEJORA_MINIMA:
+                    informar("  %-12s %5s -> %-5s %.2f s, éxito %.1f%%, error p95 %.1f cm" % (
+                        nombre, tabla[nombre], valor, tiempo, resumen["exito"] * 100, resumen["error_cm_p95"]))
+                    tabla[nombre] = valor
+                    actual = resumen
+                    mejoro = True
+            if not mejoro:
+                break
+    return tabla, inicial, actual
+
+
+def escribir_tabla(destino: Path, tabla: dict, programa: str, inicial: dict, final: dict) -> None:
+    lineas = [
+        "# Generado por herramientas/ajustar_parametros.py para %s: no editar a mano." % programa,
+        "# Tiempo p50 %.2f s -> %.2f s; éxito %.1f%% -> %.1f%%; error p95 %.1f cm -> %.1f cm." % (
+            inicial["tiempo_terminadas_p50"], final["tiempo_terminadas_p50"], inicial["exito"] * 100,
+            final["exito"] * 100, inicial["error_cm_p95"], final["error_cm_p95"]),
+        "AJUSTES = {",
+    ]
+    lineas += ['    "%s": %r,' % (nombre, valor) for nombre, valor in tabla.items()]
+    lineas.append("}")
+    destino.write_text("\n".join(lineas) + "\n", encoding="utf-8")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("programa", type=Path)
+    parser.add_argument("--ejecuciones", type=int, default=EJECUCIONES, help="robots con ruido por candidata")
+    parser.add_argument("--procesos", type=int)
+    parser.add_argument("--exito-minimo", type=float, help="fracción (por defecto, la del reto sin ajustar - 0.02)")
+    parser.add_argument("--error-cm", type=float, help="error de pose p95 (por defecto, el sin ajustar + 1 cm)")
+    parser.add_argument("--pasadas", type=int, default=PASADAS)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--solo-mostrar", action="store_true", help="no escribir ajustes_retoN.py")
+    args = parser.parse_args(argv)
+
+    try:
+        tabla, inicial, final = ajustar(args.programa, args.ejecuciones, procesos=args.procesos,
+                                        exito_minimo=args.exito_minimo, error_cm=args.error_cm,
+                                        pasadas=args.pasadas, semilla=args.semilla)
+    except ValueError as error:
+        print(error)
+        return 1
+    print("final:   %.2f s, éxito %.1f%%, error p95 %.1f cm" % (
+        final["tiempo_terminadas_p50"], final["exito"] * 100, final["error_cm_p95"]))
+    if not args.solo_mostrar:
+        destino = archivo_ajustes(args.programa)
+        escribir_tabla(destino, tabla, args.programa.name, inicial, final)
+        print("tabla guardada en %s" % destino)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""Mide el tiempo de misión de cada RetoN_Spike.py en el hub emulado.
+
+Uso:
+    python -m herramientas.benchmark [PROGRAMAS...] [--salida build/benchmark.json]
+                                     [--base base.json] [--umbral 5]
+
+Para cada programa informa el tiempo virtual total y el desglose por bloque
+(los comentarios "# Bloque N: ..." de main()). Los resultados se guardan en
+JSON; con --base se comparan contra una ejecución anterior y se marca como
+regresión todo lo que empeore más del umbral (en %) y cualquier cambio de
+estado (p. ej. de "ok" a "tiempo agotado").
+"""
+import argparse
+import json
+import re
+import sys
+from pathlib import Path
+
+from simulador import TiempoAgotado, ejecutar_programa, mundo_para_programa
+
+RAIZ = Path(__file__).resolve().parent.parent
+SALIDA = RAIZ / "build" / "benchmark.json"
+UMBRAL_PORCENTAJE = 5.0
+INICIO = "Inicio"
+
+_MARCA_BLOQUE = re.compile(r"^\s*#\s*(bloque\s+\d+.*)$", re.IGNORECASE)
+# RetoN_Spike.py escritos a mano; los RetoNRuta_Spike.py los genera planificar_ruta.
+_PROGRAMA_RETO = re.compile(r"^Reto\d+_[Ss]pike\.py$")
+
+
+def programas_por_defecto() -> list:
+    return sorted(ruta for ruta in RAIZ.glob("Reto*/Reto*_[Ss]pike.py") if _PROGRAMA_RETO.match(ruta.name))
+
+
+def instrumentar(fuente: str, marcador: str = "__marcar_bloque__") -> str:
+    """Convierte cada comentario de bloque en una llamada `marcador(nombre)`.
+
+    Se conserva la sangría y el número de línea, así que las trazas de error
+    siguen apuntando al archivo original.
+    """
+    lineas = fuente.splitlines(keepends=True)
+    for indice, linea in enumerate(lineas):
+        coincidencia = _MARCA_BLOQUE.match(linea)
+        if coincidencia:
+            sangria = linea[:len(linea) - len(linea.lstrip())]
+            lineas[indice] = "%s%s(%r)\n" % (sangria, marcador, coincidencia.group(1).strip())
+    return "".join(lineas)
+
+
+class CronometroBloques:
+    """Reparte el tiempo virtual entre los bloques según se van marcando."""
+
+    def __init__(self, mundo) -> None:
+        self.mundo = mundo
+        self.actual = INICIO
+        self.inicio_actual = 0.0
+        self.tiempos = {}
+
+    def marcar(self, bloque: str) -> None:
+        self._cerrar(bloque)
+
+    def terminar(self) -> dict:
+        self._cerrar(None)
+        return self.tiempos
+
+    def _cerrar(self, siguiente) -> None:
+        duracion = self.mundo.tiempo - self.inicio_actual
+        self.tiempos[self.actual] = self.tiempos.get(self.actual, 0.0) + duracion
+        self.actual = siguiente
+        self.inicio_actual = self.mundo.tiempo
+
+
+def medir_programa(ruta, tiempo_maximo: float = 600.0, fuente: str = None) -> dict:
+    """Ejecuta un programa y devuelve su estado, tiempo total y tiempos por bloque.
+
+    Con `fuente` se mide ese código en lugar del archivo (con el config de `ruta`).
+    """
+    mundo = mundo_para_programa(ruta, tiempo_maximo=tiempo_maximo)
+    cronometro = CronometroBloques(mundo)
+    if fuente is None:
+        fuente = Path(ruta).read_text(encoding="utf-8")
+    fuente = instrumentar(fuente)
+    estado = "ok"
+    try:
+        ejecutar_programa(ruta, mundo, fuente, {"__marcar_bloque__": cronometro.marcar})
+    except TiempoAgotado:
+        estado = "tiempo agotado"
+    bloques = cronometro.terminar()
+    return {
+        "estado": estado,
+        "tiempo": round(mundo.tiempo, 3),
+        "bloques": {nombre: round(tiempo, 3) for nombre, tiempo in bloques.items()},
+    }
+
+
+def comparar(actual: dict, base: dict, umbral: float = UMBRAL_PORCENTAJE) -> list:
+    """Lista de (programa, parte, tiempo base, tiempo actual, % de cambio) que empeoraron más del umbral.
+
+    Los programas que cambiaron de estado no se comparan: ver cambios_estado().
+    """
+    regresiones = []
+    for programa, resultado in actual.items():
+        anterior = base.get(programa)
+        if anterior is None or anterior["estado"] != resultado["estado"]:
+            continue
+        partes = [("total", anterior["tiempo"], resultado["tiempo"])]
+        partes += [(nombre, anterior["bloques"][nombre], tiempo)
+                   for nombre, tiempo in resultado["bloques"].items() if nombre in anterior["bloques"]]
+        for parte, antes, ahora in partes:
+            if antes > 0 and (ahora - antes) / antes * 100 > umbral:
+                regresiones.append((programa, parte, antes, ahora, (ahora - antes) / antes * 100))
+    return regresiones
+
+
+def cambios_estado(actual: dict, base: dict) -> list:
+    """Lista de (programa, estado base, estado actual) de los programas cuyo estado cambió."""
+    return [(programa, base[programa]["estado"], resultado["estado"])
+            for programa, resultado in actual.items()
+            if programa in base and base[programa]["estado"] != resultado["estado"]]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("programas", nargs="*", type=Path)
+    parser.add_argument("--salida", type=Path, default=SALIDA)
+    parser.add_argument("--base", type=Path, help="resultados anteriores con los que comparar")
+    parser.add_argument("--umbral", type=float, default=UMBRAL_PORCENTAJE, help="%% de empeoramiento tolerado")
+    parser.add_argument("--tiempo-maximo", type=float, default=600.0)
+    args = parser.parse_args(argv)
+
+    resultados = {}
+    for ruta in args.programas or programas_por_defecto():
+        resultado = medir_programa(ruta, args.tiempo_maximo)
+        resultados[ruta.stem] = resultado
+        print("%-14s %-15s %8.2f s" % (ruta.stem, resultado["estado"], resultado["tiempo"]))
+        for nombre, tiempo in resultado["bloques"].items():
+            print("    %-60.60s %8.2f s" % (nombre, tiempo))
+
+    args.salida.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.salida, "w", encoding="utf-8") as archivo:
+        json.dump(resultados, archivo, indent=2, ensure_ascii=False)
+
+    if args.base is None:
+        return 0
+    with open(args.base, encoding="utf-8") as archivo:
+        base = json.load(archivo)
+    cambios = cambios_estado(resultados, base)
+    for programa, antes, ahora in cambios:
+        print("CAMBIO DE ESTADO %s: %s -> %s" % (programa, antes, ahora))
+    regresiones = comparar(resultados, base, args.umbral)
+    for programa, parte, antes, ahora, cambio in regresiones:
+        print("REGRESIÓN %s / %s: %.2f s -> %.2f s (+%.1f%%)" % (programa, parte, antes, ahora, cambio))
+    return 1 if cambios or regresiones else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+# Programa para ejecutar EN EL HUB: mide el perfil del robot y lo guarda en
+# /flash/perfil_robot.py, que movimiento.py importa al arrancar. Un mismo
+# perfil sirve para los siete RetoN_Spike.py.
+#
+# Preparación en el flash del hub: movimiento.mpy y eventos.mpy (ver
+# herramientas/compilar_mpy.py).
+#
+# Pista: dos líneas negras paralelas separadas DISTANCIA_LINEAS_CM (de borde
+# delantero a borde delantero), con espacio libre alrededor para girar. El
+# robot sale en blanco, perpendicular a las líneas y antes de la primera.
+#
+# 1. Circunferencia de rueda: avanza despacio y cuenta los grados de motor
+#    entre los dos bordes (el retraso de detección es el mismo en ambos).
+# 2. Ancho de eje: gira sobre sí mismo un número fijo de grados de motor y
+#    compara con lo que giró el giroscopio.
+# 3. Inercia de giro: hace giros de 90 con girar_*_fase y mide cuánto se
+#    pasa o se queda corto el robot.
+# 4. Tabla de velocidad: para cada velocidad de VELOCIDADES_PRUEBA avanza en
+#    línea recta y mide la velocidad real de las ruedas una vez estabilizada.
+#    Alterna adelante y atrás; necesita ~60 cm libres delante del robot.
+import math
+import runloop
+import motor
+import motor_pair
+import color
+from hub import motion_sensor, sound
+
+import movimiento
+from movimiento import (
+    motor_izquierda,
+    motor_derecha,
+    girar_derecha_fase,
+    girar_izquierda_fase,
+    rumbo,
+    pausa,
+    posicion_media,
+)
+from eventos import esperar_color, ejecutar_con_muestreador
+
+ARCHIVO_PERFIL = "/flash/perfil_robot.py"
+DISTANCIA_LINEAS_CM = 30.0 # float ¡Medir en la pista!
+VELOCIDAD_MEDIDA = 300 # int
+# Giro sobre sí mismo en tramos cortos para poder desenvolver el yaw (±180).
+TRAMOS_GIRO = 8 # int
+GRADOS_MOTOR_TRAMO = 180 # int
+GIROS_PRUEBA = 4 # int
+# 1110 es el tope que acepta el motor grande; la tabla recoge hasta dónde llega de verdad.
+VELOCIDADES_PRUEBA = (200, 400, 600, 800, 1000, 1110)
+ESTABILIZAR_MS = 600 # int
+MEDIR_MS = 500 # int
+
+
+async def medir_circunferencia() -> float:
+    motor.reset_relative_position(motor_izquierda, 0)
+    motor.reset_relative_position(motor_derecha, 0)
+    motor_pair.move(motor_pair.PAIR_1, 0, velocity=VELOCIDAD_MEDIDA)
+    await esperar_color(color.BLACK, periodo_ms=5)
+    primera = posicion_media()
+    await esperar_color(color.WHITE, periodo_ms=5)
+    await esperar_color(color.BLACK, periodo_ms=5)
+    segunda = posicion_media()
+    motor_pair.stop(motor_pair.PAIR_1)
+    return DISTANCIA_LINEAS_CM * 360 / (segunda - primera)
+
+
+async def medir_ancho_eje(circunferencia: float) -> float:
+    girado = 0.0
+    anterior = rumbo()
+    for _ in range(TRAMOS_GIRO):
+        await motor_pair.move_for_degrees(motor_pair.PAIR_1, GRADOS_MOTOR_TRAMO, 100, velocity=VELOCIDAD_MEDIDA)
+        await pausa(0.3)
+        actual = rumbo()
+        girado += (anterior - actual + 180) % 360 - 180
+        anterior = actual
+    arco_cm = TRAMOS_GIRO * GRADOS_MOTOR_TRAMO / 360 * circunferencia
+    # Cada rueda recorre `arco_cm` en sentido contrario: giro = 2 * arco / ancho.
+    return 2 * arco_cm / math.radians(girado)
+
+
+async def medir_inercia_giro() -> float:
+    error = 0.0
+    for vuelta in range(GIROS_PRUEBA):
+        girar = girar_derecha_fase if vuelta % 2 == 0 else girar_izquierda_fase
+        inicio = rumbo()
+        await girar(90)
+        await pausa(0.5)
+        error += abs((rumbo() - inicio + 180) % 360 - 180) - 90
+    # Si se pasa, hay que cortar antes; si se queda corto, después.
+    return movimiento.INERCIA_GIRO + error / GIROS_PRUEBA
+
+
+async def medir_tabla_velocidad() -> tuple:
+    tabla = [(0, 0.0)]
+    for prueba, velocidad in enumerate(VELOCIDADES_PRUEBA):
+        signo = 1 if prueba % 2 == 0 else -1
+        motor_pair.move(motor_pair.PAIR_1, 0, velocity=signo * velocidad)
+        await runloop.sleep_ms(ESTABILIZAR_MS)
+        inicio = posicion_media()
+        await runloop.sleep_ms(MEDIR_MS)
+        real = abs(posicion_media() - inicio) * 1000 / MEDIR_MS
+        motor_pair.stop(motor_pair.PAIR_1)
+        await pausa(0.3)
+        # Por encima de la saturación la velocidad real ya no sube: esas filas sobran.
+        if real <= tabla[-1][1]:
+            break
+        tabla.append((velocidad, real))
+    return tuple(tabla)
+
+
+def guardar_perfil(circunferencia: float, ancho_eje: float, inercia_giro: float, tabla_velocidad: tuple) -> None:
+    with open(ARCHIVO_PERFIL, "w") as archivo:
+        archivo.write("# Generado por herramientas/calibrar_hub.py\n")
+        archivo.write("CIRCUNFERENCIA_RUEDA = %.3f\n" % circunferencia)
+        archivo.write("ANCHO_EJE = %.3f\n" % ancho_eje)
+        archivo.write("INERCIA_GIRO = %.2f\n" % inercia_giro)
+        archivo.write("TABLA_VELOCIDAD = (%s)\n" % ", ".join("(%d, %.1f)" % fila for fila in tabla_velocidad))
+
+
+async def main():
+    motor_pair.pair(motor_pair.PAIR_1, motor_izquierda, motor_derecha)
+    motion_sensor.reset_yaw(0)
+
+    circunferencia = await medir_circunferencia()
+    ancho_eje = await medir_ancho_eje(circunferencia)
+    inercia_giro = await medir_inercia_giro()
+    tabla_velocidad = await medir_tabla_velocidad()
+
+    guardar_perfil(circunferencia, ancho_eje, inercia_giro, tabla_velocidad)
+    print("Circunferencia de rueda: %.3f cm (antes %.3f)" % (circunferencia, movimiento.CIRCUNFERENCIA_RUEDA))
+    print("Ancho de eje:            %.3f cm (antes %.3f)" % (ancho_eje, movimiento.ANCHO_EJE))
+    print("Inercia de giro:         %.2f grados (antes %.2f)" % (inercia_giro, movimiento.INERCIA_GIRO))
+    for velocidad, real in tabla_velocidad[1:]:
+        print("Velocidad %4d:          %.0f grados/s, %.1f cm/s" % (velocidad, real, real * circunferencia / 360))
+    await sound.beep(880, 300)
+
+
+ejecutar_con_muestreador(main())
@@ -0,0 +1,122 @@
+"""Compara el seguidor de línea de dos estados con el PID en una recta simulada.
+
+Uso:
+    python -m herramientas.comparar_seguidores [--grados 3450]
+
+Para cada controlador informa el tiempo del tramo y la oscilación lateral del
+sensor respecto al borde de la línea (RMS y máxima, descontando los primeros
+centímetros de enganche).
+"""
+import argparse
+import math
+import sys
+
+from simulador import Campo, Mundo, hub_emulado
+from simulador.campo import Rectangulo
+from simulador.spike import color
+
+ANCHO_LINEA_CM = 2.0
+Y_LINEA_CM = 60.0
+# Borde derecho de la línea según avanza el robot (+x): el que siguen ambos controladores.
+Y_BORDE_CM = Y_LINEA_CM + ANCHO_LINEA_CM
+# Tramo inicial que no cuenta para la oscilación (el robot se engancha a la línea).
+ENGANCHE_CM = 20.0
+
+
+class MundoRegistrado(Mundo):
+    """Mundo que registra la desviación lateral del sensor tras cada paso."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.muestras = []
+
+    def _integrar(self, dt: float) -> None:
+        super()._integrar(dt)
+        robot = self.robot
+        x, y = robot.punto_adelante(robot.geometria.adelanto_sensor_color)
+        self.muestras.append((dt, x, y - Y_BORDE_CM))
+
+
+def campo_recto(largo: float) -> Campo:
+    linea = Rectangulo(0, Y_LINEA_CM, largo + 50, ANCHO_LINEA_CM, color=color.BLACK)
+    return Campo([linea], ancho=largo + 60, alto=2 * Y_LINEA_CM)
+
+
+def oscilacion(mundo: MundoRegistrado, desde_x: float):
+    """(RMS, máxima) de la desviación lateral en cm a partir de `desde_x`."""
+    tramo = [(dt, desvio) for dt, x, desvio in mundo.muestras if x >= desde_x]
+    duracion = sum(dt for dt, _ in tramo)
+    if not duracion:
+        return 0.0, 0.0
+    rms = math.sqrt(sum(dt * desvio ** 2 for dt, desvio in tramo) / duracion)
+    return rms, max(abs(desvio) for _, desvio in tramo)
+
+
+def ejecutar(nombre: str, fabrica, grados: int):
+    campo = campo_recto(grados / 360 * 17.58)
+    x0 = 0.0
+    mundo = MundoRegistrado(campo=campo, x=x0, y=Y_BORDE_CM, theta=math.radians(2))
+    with hub_emulado(mundo):
+        import motor_pair
+        import runloop
+        from movimiento import motor_derecha, motor_izquierda
+
+        async def main():
+            motor_pair.pair(motor_pair.PAIR_1, motor_izquierda, motor_derecha)
+            await fabrica()(grados)
+            motor_pair.stop(motor_pair.PAIR_1)
+
+        runloop.run(main())
+    rms, maxima = oscilacion(mundo, x0 + mundo.robot.geometria.adelanto_sensor_color + ENGANCHE_CM)
+    return nombre, mundo.tiempo, rms, maxima
+
+
+def dos_estados(rapida: int, lenta: int):
+    """Bucle de Reto6: move_tank(rapida, lenta) en negro, (lenta, rapida) en blanco."""
+    def fabrica():
+        import color_sensor
+        import motor
+        import motor_pair
+        from movimiento import motor_derecha, puerto_sensor_color
+
+        async def seguir(grados):
+            motor.reset_relative_position(motor_derecha)
+            while abs(motor.relative_position(motor_derecha)) < grados:
+                if color_sensor.color(puerto_sensor_color) == color.BLACK:
+                    motor_pair.move_tank(motor_pair.PAIR_1, rapida, lenta)
+                else:
+                    motor_pair.move_tank(motor_pair.PAIR_1, lenta, rapida)
+        return seguir
+    return fabrica
+
+
+def pid(velocidad: int):
+    def fabrica():
+        from seguidor import seguir_linea
+
+        async def seguir(grados):
+            await seguir_linea(grados, velocidad=velocidad)
+        return seguir
+    return fabrica
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--grados", type=int, default=3450, help="longitud del tramo en grados de motor")
+    args = parser.parse_args(argv)
+
+    controladores = [
+        ("Dos estados 1000/900", dos_estados(1000, 900)),
+        ("Dos estados 900/800", dos_estados(900, 800)),
+        ("PID 900", pid(900)),
+        ("PID 1000", pid(1000)),
+    ]
+    print("%-22s %9s %14s %14s" % ("Controlador", "tiempo", "RMS lateral", "máx lateral"))
+    for nombre, fabrica in controladores:
+        nombre, tiempo, rms, maxima = ejecutar(nombre, fabrica, args.grados)
+        print("%-22s %7.2f s %11.2f cm %11.2f cm" % (nombre, tiempo, rms, maxima))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
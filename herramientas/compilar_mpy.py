@@ -0,0 +1,55 @@
+"""Precompila la librería compartida de comun/ a bytecode .mpy para el hub.
+
+Uso:
+    python -m herramientas.compilar_mpy [--mpy-cross RUTA] [-- OPCIONES_MPY_CROSS]
+
+La versión de mpy-cross debe coincidir con la de MicroPython del firmware del
+hub; si no coincide, el hub rechaza el .mpy con "incompatible .mpy file".
+"""
+import argparse
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+ORIGEN = RAIZ / "comun"
+DESTINO = RAIZ / "build" / "hub"
+
+
+def compilar(mpy_cross: str = "mpy-cross", destino: Path = DESTINO, opciones: list = ()) -> list:
+    """Compila cada módulo de comun/ y devuelve la lista de (fuente, salida)."""
+    if shutil.which(mpy_cross) is None and not Path(mpy_cross).exists():
+        raise FileNotFoundError(
+            "No se encontró mpy-cross (%s). Instálalo con 'pip install mpy-cross'." % mpy_cross
+        )
+    destino.mkdir(parents=True, exist_ok=True)
+    generados = []
+    for fuente in sorted(ORIGEN.glob("*.py")):
+        salida = destino / (fuente.stem + ".mpy")
+        subprocess.run([mpy_cross, *opciones, "-o", str(salida), str(fuente)], check=True)
+        generados.append((fuente, salida))
+    return generados
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mpy-cross", default="mpy-cross", help="ejecutable de mpy-cross")
+    parser.add_argument("--destino", type=Path, default=DESTINO)
+    parser.add_argument("opciones", nargs="*", help="opciones extra para mpy-cross (ej. -march=armv7emsp)")
+    args = parser.parse_args(argv)
+
+    try:
+        generados = compilar(args.mpy_cross, args.destino, args.opciones)
+    except FileNotFoundError as error:
+        print(error, file=sys.stderr)
+        return 1
+
+    for fuente, salida in generados:
+        print("%-24s %6d B -> %-24s %6d B" % (
+            fuente.name, fuente.stat().st_size, salida.name, salida.stat().st_size))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
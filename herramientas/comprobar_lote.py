@@ -0,0 +1,74 @@
+"""Comprueba que simulador/lote.py repite lo que hace el hub emulado en cada reto que termina.
+
+Uso:
+    python -m herramientas.comprobar_lote [PROGRAMAS...] [--tolerancia-cm 1]
+
+Graba la secuencia de órdenes de cada RetoN_Spike.py y repite cada orden sola
+en un Lote(1) que parte del estado del hub al empezarla (ruedas, pose,
+objetivo del modo absoluto, telemetría). La pose al acabar debe quedar a
+menos de la tolerancia de la que grabó el hub; si no, el lote no modela bien
+esa orden y montecarlo.py o ajustar_parametros.py darían resultados de otra
+misión. Los retos que agotan el tiempo en el hub no se comprueban.
+
+La misión entera replicada desde la salida también tiene que acabar a menos
+de la tolerancia de la pose final del hub. Un encoder que cae justo en medio
+grado puede redondearse distinto en los dos simuladores y separarlos al
+final; montecarlo.py mide el éxito frente a la pose del hub, así que en ese
+caso sus ejecuciones seguirían otra misión y el reto falla la comprobación.
+"""
+import argparse
+import math
+import sys
+from pathlib import Path
+
+from herramientas.benchmark import programas_por_defecto
+from simulador import mundo_para_programa
+from simulador.lote import Lote, grabar_secuencia, repetir_orden, replicar
+
+TOLERANCIA_CM = 1.0
+
+
+def separacion(pose, lote: Lote) -> float:
+    """cm entre una pose (x, y, theta) y el primer robot del lote."""
+    return math.hypot(pose[0] - lote.x[0], pose[1] - lote.y[0])
+
+
+def comprobar(ruta):
+    """(peor separación por orden en cm, índice de esa orden, separación final desde la salida), o None si no termina."""
+    secuencia = grabar_secuencia(ruta)
+    if not secuencia.completa:
+        return None
+    campo = mundo_para_programa(ruta).campo
+    peor, indice_peor = 0.0, None
+    for indice, orden in enumerate(secuencia.ordenes):
+        if orden.hub is None:
+            continue
+        cm = separacion(orden.pose, repetir_orden(secuencia, indice, campo))
+        if cm > peor:
+            peor, indice_peor = cm, indice
+    final = separacion(secuencia.pose_final, replicar(Lote(1, campo), secuencia))
+    return peor, indice_peor, final
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("programas", nargs="*", type=Path)
+    parser.add_argument("--tolerancia-cm", type=float, default=TOLERANCIA_CM)
+    args = parser.parse_args(argv)
+
+    codigo = 0
+    for ruta in args.programas or programas_por_defecto():
+        resultado = comprobar(ruta)
+        if resultado is None:
+            print("%-14s tiempo agotado en el hub emulado: no se comprueba" % ruta.stem)
+            continue
+        peor, indice, final = resultado
+        estado = "ok" if max(peor, final) <= args.tolerancia_cm else "FALLO"
+        codigo = codigo or int(estado != "ok")
+        print("%-14s %-5s peor orden %6.3f cm%s  misión entera %6.2f cm" % (
+            ruta.stem, estado, peor, " (%d)" % indice if indice is not None else "", final))
+    return codigo
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""Escribe POSE_INICIAL y LINEAS de un config JSON para pegarlos en un reto.
+
+Uso:
+    python -m herramientas.exportar_campo RetoN/RetoNConfig.json [--robot 0]
+
+POSE_INICIAL es la primera pose del robot en robotPoses y LINEAS las áreas
+negras de colorAreas como (x, y, w, h), todo en las coordenadas normalizadas
+del JSON que usa comun/odometria.py. Las áreas giradas no se exportan: el
+odómetro solo corrige contra bordes alineados con el tapete.
+"""
+import argparse
+import json
+import sys
+
+COLORES_LINEA = ("#000", "#000000")
+
+
+def leer_campo(ruta, robot: int = 0):
+    """(pose inicial o None, lista de líneas, número de líneas giradas descartadas)."""
+    with open(ruta, encoding="utf-8") as archivo:
+        datos = json.load(archivo)
+    poses = datos.get("robotPoses", [])
+    pose = None
+    if robot < len(poses) and poses[robot]:
+        inicial = poses[robot][0]
+        pose = (inicial["x"], inicial["y"], inicial["theta"])
+    lineas, giradas = [], 0
+    for area in datos.get("colorAreas", []):
+        if area.get("color", "").lower() not in COLORES_LINEA:
+            continue
+        if area.get("theta", 0.0):
+            giradas += 1
+            continue
+        lineas.append((area["x"], area["y"], area["w"], area["h"]))
+    return pose, lineas, giradas
+
+
+def formatear(pose, lineas) -> str:
+    texto = []
+    if pose is not None:
+        texto.append("POSE_INICIAL = (%.4f, %.4f, %.4f)" % pose)
+    texto.append("LINEAS = (")
+    texto += ["    (%.4f, %.4f, %.4f, %.4f)," % linea for linea in lineas]
+    texto.append(")")
+    return "\n".join(texto)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("config")
+    parser.add_argument("--robot", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    pose, lineas, giradas = leer_campo(args.config, args.robot)
+    print(formatear(pose, lineas))
+    if giradas:
+        print("# %d líneas giradas sin exportar" % giradas, file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
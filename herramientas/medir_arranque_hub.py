@@ -0,0 +1,55 @@
+# Programa para ejecutar EN EL HUB: compara el coste de arranque de la librería
+# de movimiento compilada desde fuente (lo que ocurría con el bloque copiado en
+# cada RetoN_Spike.py) frente a importarla ya precompilada como movimiento.mpy.
+#
+# Preparación en el flash del hub:
+#   - build/hub/movimiento.mpy    -> /flash/movimiento.mpy
+#   - comun/movimiento.py         -> /flash/movimiento_fuente.py
+# (con otro nombre para que "import movimiento" resuelva al .mpy).
+import gc
+import time
+
+# Los módulos del firmware se importan antes para no contarlos en la medida.
+from hub import port, light_matrix, sound
+import runloop
+import motor_pair
+import motor
+import distance_sensor
+
+FUENTE = "movimiento_fuente.py"
+
+
+def medir(cargar):
+    """Devuelve (microsegundos, bytes de heap consumidos) al ejecutar cargar()."""
+    gc.collect()
+    libre_antes = gc.mem_free()
+    inicio = time.ticks_us()
+    modulo = cargar()
+    duracion = time.ticks_diff(time.ticks_us(), inicio)
+    gc.collect()
+    consumido = libre_antes - gc.mem_free()
+    del modulo
+    return duracion, consumido
+
+
+def cargar_desde_fuente():
+    """Compila y ejecuta el código fuente, igual que el bloque en línea."""
+    with open(FUENTE) as archivo:
+        codigo = archivo.read()
+    espacio = {}
+    exec(compile(codigo, FUENTE, "exec"), espacio)
+    return espacio
+
+
+def cargar_mpy():
+    """Importa el bytecode precompilado."""
+    import movimiento
+    return movimiento
+
+
+en_linea = medir(cargar_desde_fuente)
+precompilado = medir(cargar_mpy)
+
+print("Disposición         tiempo (us)   heap (B)")
+print("En línea (fuente)   %11d   %8d" % en_linea)
+print("movimiento.mpy      %11d   %8d" % precompilado)
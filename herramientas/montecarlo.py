@@ -0,0 +1,173 @@
+"""Robustez de cada misión con ruido aleatorio: tasa de éxito y tiempos p50/p95.
+
+Uso:
+    python -m herramientas.montecarlo [PROGRAMAS...] [--ejecuciones 5000] [--procesos 4]
+                                      [--tolerancia-cm 5] [--tolerancia-grados 5]
+
+Graba la secuencia de órdenes de cada RetoN_Spike.py en el hub emulado y la
+replica con simulador/lote.py en miles de robots, cada uno con su propio
+ruido: colocación a mano en la salida, circunferencia de rueda y ancho de eje
+(error de giro), deriva del giroscopio, deslizamiento de las ruedas y ruido en
+los sensores. Los robots se reparten en bloques entre los núcleos con un pool
+de procesos.
+
+Una ejecución tiene éxito si no falla ninguna espera y termina a menos de las
+tolerancias de la pose final del hub emulado (la de Secuencia.pose_final, no
+la del lote sin ruido: herramientas/comprobar_lote.py vigila que coincidan). Los resultados se guardan en
+build/montecarlo.json; si una orden concentra los fallos, ese es el tramo donde
+no conviene subir la velocidad.
+
+La secuencia grabada es fija: una rama del main() que depende de un sensor
+(p. ej. `if color == YELLOW` en Reto5) se decide una vez en el hub emulado y
+el ruido no puede llevar a ningún robot por la otra; solo cambia cuándo
+termina cada espera. Un reto que agota el tiempo en el hub tiene la secuencia
+a medias y no se evalúa: queda en el JSON con "evaluable": false.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import numpy as np
+
+from herramientas.benchmark import programas_por_defecto
+from simulador import Geometria, mundo_para_programa
+from simulador.lote import Lote, Secuencia, grabar_secuencia, replicar
+
+RAIZ = Path(__file__).resolve().parent.parent
+SALIDA = RAIZ / "build" / "montecarlo.json"
+EJECUCIONES = 5000
+TOLERANCIA_CM = 5.0
+TOLERANCIA_GRADOS = 5.0
+# Robots por bloque: bastantes para aprovechar NumPy, pocos para repartir bien entre procesos.
+ROBOTS_BLOQUE = 500
+
+
+@dataclass
+class ModeloRuido:
+    """Desviaciones típicas del ruido de cada ejecución (0 lo desactiva)."""
+
+    # Colocación en la salida (cm y grados).
+    salida_cm: float = 0.5
+    salida_grados: float = 1.0
+    # Error relativo de las medidas reales frente a las nominales de movimiento.py.
+    circunferencia: float = 0.005
+    ancho_eje: float = 0.01
+    giroscopio: float = 0.003
+    # Fracción del avance de cada rueda que se pierde en cada paso.
+    deslizamiento: float = 0.01
+    reflexion: float = 1.0
+    distancia_mm: float = 10.0
+
+    def lote(self, n: int, campo, semilla) -> Lote:
+        """Lote de `n` robots con medidas y pose de salida sorteadas."""
+        aleatorio = np.random.default_rng(semilla)
+        geometria = Geometria()
+        x, y, theta = campo.pose_inicial() if campo is not None else (0.0, 0.0, 0.0)
+        normal = lambda media, desviacion: media + aleatorio.normal(0.0, desviacion, n)
+        pose = (normal(x, self.salida_cm), normal(y, self.salida_cm),
+                normal(theta, math.radians(self.salida_grados)))
+        return Lote(n, campo, geometria, pose,
+                    circunferencia=normal(1.0, self.circunferencia) * geometria.circunferencia_rueda,
+                    ancho_eje=normal(1.0, self.ancho_eje) * geometria.ancho_eje,
+                    factor_giroscopio=normal(1.0, self.giroscopio), deslizamiento=self.deslizamiento,
+                    ruido_reflexion=self.reflexion, ruido_distancia=self.distancia_mm, semilla=aleatorio)
+
+
+def resultados_lote(lote: Lote) -> dict:
+    """Arrays de cada ejecución que usa resumir()."""
+    return {"tiempo": lote.tiempo, "x": lote.x, "y": lote.y, "theta": lote.theta, "fallo": lote.fallo,
+            "orden_fallo": lote.orden_fallo}
+
+
+def _simular_bloque(ruta, secuencia, modelo: ModeloRuido, n: int, semilla) -> dict:
+    """Replica la secuencia en un bloque de robots (se ejecuta en un proceso del pool)."""
+    return resultados_lote(replicar(modelo.lote(n, mundo_para_programa(ruta).campo, semilla), secuencia))
+
+
+def simular(ruta, ejecuciones: int = EJECUCIONES, modelo: ModeloRuido = None, procesos: int = None,
+            semilla: int = 0, secuencia=None) -> dict:
+    """Devuelve los arrays de todas las ejecuciones."""
+    modelo = modelo or ModeloRuido()
+    secuencia = secuencia or grabar_secuencia(ruta)
+    tamanos = [min(ROBOTS_BLOQUE, ejecuciones - inicio) for inicio in range(0, ejecuciones, ROBOTS_BLOQUE)]
+    semillas = np.random.SeedSequence(semilla).spawn(len(tamanos))
+    with ProcessPoolExecutor(procesos) as pool:
+        bloques = list(pool.map(_simular_bloque, [ruta] * len(tamanos), [secuencia] * len(tamanos),
+                                [modelo] * len(tamanos), tamanos, semillas))
+    resultados = {clave: np.concatenate([bloque[clave] for bloque in bloques]) for clave in bloques[0]}
+    return resultados
+
+
+def resumir(referencia: Secuencia, resultados: dict, secuencia: Secuencia, tolerancia_cm: float = TOLERANCIA_CM,
+            tolerancia_grados: float = TOLERANCIA_GRADOS) -> dict:
+    """Tasa de éxito, percentiles de tiempo y error de pose, y fallos por orden.
+
+    El error se mide frente a la pose final y el tiempo de `referencia` en el
+    hub emulado; `secuencia` es la que se replicó (da nombre a las órdenes).
+    """
+    x, y, theta = referencia.pose_final
+    error_cm = np.hypot(resultados["x"] - x, resultados["y"] - y)
+    error_grados = np.abs(np.degrees((resultados["theta"] - theta + math.pi) % (2 * math.pi) - math.pi))
+    exito = ~resultados["fallo"] & (error_cm <= tolerancia_cm) & (error_grados <= tolerancia_grados)
+    tiempos = resultados["tiempo"][exito]
+    fallos = {}
+    for indice, cantidad in zip(*np.unique(resultados["orden_fallo"][resultados["fallo"]], return_counts=True)):
+        fallos["%d %s" % (indice, secuencia.ordenes[indice].tipo)] = int(cantidad)
+    percentil = lambda valores, p: round(float(np.percentile(valores, p)), 3) if len(valores) else None
+    return {
+        "ejecuciones": len(exito),
+        "exito": round(float(exito.mean()), 4),
+        "tiempo_referencia": round(float(referencia.tiempo), 3),
+        "tiempo_p50": percentil(tiempos, 50),
+        "tiempo_p95": percentil(tiempos, 95),
+        # Incluye las que acaban fuera de tolerancia: es el tiempo que optimiza ajustar_parametros.py.
+        "tiempo_terminadas_p50": percentil(resultados["tiempo"][~resultados["fallo"]], 50),
+        "error_cm_p50": percentil(error_cm, 50),
+        "error_cm_p95": percentil(error_cm, 95),
+        "error_grados_p95": percentil(error_grados, 95),
+        "fallos_por_orden": fallos,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("programas", nargs="*", type=Path)
+    parser.add_argument("--ejecuciones", type=int, default=EJECUCIONES)
+    parser.add_argument("--procesos", type=int, default=os.cpu_count())
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--tolerancia-cm", type=float, default=TOLERANCIA_CM)
+    parser.add_argument("--tolerancia-grados", type=float, default=TOLERANCIA_GRADOS)
+    parser.add_argument("--salida", type=Path, default=SALIDA)
+    for nombre, valor in asdict(ModeloRuido()).items():
+        parser.add_argument("--ruido-" + nombre.replace("_", "-"), dest=nombre, type=float, default=valor)
+    args = parser.parse_args(argv)
+    modelo = ModeloRuido(**{nombre: getattr(args, nombre) for nombre in asdict(ModeloRuido())})
+
+    informe = {"ruido": asdict(modelo)}
+    for ruta in args.programas or programas_por_defecto():
+        secuencia = grabar_secuencia(ruta)
+        if not secuencia.completa:
+            informe[ruta.stem] = {"evaluable": False, "motivo": "tiempo agotado en el hub emulado"}
+            print("%-14s tiempo agotado en el hub emulado: no evaluable" % ruta.stem)
+            continue
+        resultados = simular(ruta, args.ejecuciones, modelo, args.procesos, args.semilla, secuencia)
+        resumen = resumir(secuencia, resultados, secuencia, args.tolerancia_cm, args.tolerancia_grados)
+        informe[ruta.stem] = dict(evaluable=True, **resumen)
+        print("%-14s éxito %5.1f%%  tiempo p50 %s s  p95 %s s  error p95 %s cm" % (
+            ruta.stem, resumen["exito"] * 100, resumen["tiempo_p50"], resumen["tiempo_p95"], resumen["error_cm_p95"]))
+        for orden, cantidad in resumen["fallos_por_orden"].items():
+            print("    fallos en la orden %-20s %d" % (orden, cantidad))
+
+    args.salida.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.salida, "w", encoding="utf-8") as archivo:
+        json.dump(informe, archivo, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,368 @@
+"""Fusiona los giros sobre el eje de main() con las rectas vecinas en arcos.
+
+Uso:
+    python -m herramientas.optimizar_arcos [PROGRAMAS...] [--escribir] [--medir] [--sin-campo]
+
+Busca en main() secuencias recta hacia adelante + giro + recta hacia adelante,
+escritas como `await avanzar_cm(...)` / `await girar_*_fase(...)` o como
+segmentos de recorrer(), y las cambia por recta acortada + arco + recta
+acortada, que terminan en la misma pose sin detenerse. El arco recorta la
+esquina por dentro (nunca sale de la envolvente de la trayectoria original,
+así que no puede chocar con paredes nuevas); solo se acepta si ningún
+obstáculo del config JSON queda a menos de RADIO_ROBOT_CM del recorrido.
+Para comprobarlo se sigue la pose a estima desde la pose inicial del config;
+tras una línea que no sea un movimiento conocido (sensores, seguidor...) la
+pose se desconoce y, si el campo tiene obstáculos, no se fusiona nada más.
+Los comentarios entre los pasos no cortan la secuencia; marcar_bloque(),
+pausa() y detener() sí, para no sacarlos de su sitio al reescribir.
+
+Sin config JSON junto al programa no hay obstáculos con los que comprobar la
+holgura, así que no se fusiona nada; --sin-campo fusiona igualmente sin
+ningún campo.
+
+--medir compara el tiempo de misión en el hub emulado antes y después;
+--escribir guarda el programa optimizado.
+"""
+import argparse
+import math
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+from simulador import Campo
+from simulador.campo import buscar_config
+
+from .benchmark import medir_programa, programas_por_defecto
+
+RADIO_MAXIMO_CM = 20.0
+# Por debajo de medio eje la rueda interior iría hacia atrás.
+RADIO_MINIMO_CM = 8.0
+# Radio del círculo que envuelve al robot, para la holgura con obstáculos.
+RADIO_ROBOT_CM = 12.0
+PASO_MUESTRA_CM = 1.0
+# Nombres de trayecto en el orden en que se importan.
+NOMBRES_TRAYECTO = ("recorrer", "recta", "giro_derecha", "giro_izquierda", "arco_derecha", "arco_izquierda")
+NOMBRES_MOVIMIENTO = ("avanzar_cm", "retroceder_cm", "girar_derecha_fase", "girar_izquierda_fase")
+
+# Velocidad escrita como número o como ajuste("nombre", defecto) (comun/ajustes.py).
+_VELOCIDAD = r"(\d+|ajuste\(\s*\"\w+\"\s*,\s*\d+\s*\))"
+_AJUSTE = re.compile(r"ajuste\(\s*\"(\w+)\"\s*,\s*(\d+)\s*\)")
+_AWAIT_RECTA = re.compile(
+    r"^(\s*)await (avanzar_cm|retroceder_cm)\(\s*([\d.]+)\s*(?:,\s*velocidad\s*=\s*%s)?\s*\)\s*(#.*)?$" % _VELOCIDAD)
+_AWAIT_GIRO = re.compile(
+    r"^(\s*)await girar_(derecha|izquierda)_fase\(\s*([\d.]*)\s*(?:,\s*velocidad\s*=\s*%s)?\s*\)\s*(#.*)?$"
+    % _VELOCIDAD)
+_SEGMENTO_RECTA = re.compile(r"^(\s*)recta\(\s*(-?[\d.]+)\s*(?:,\s*%s)?\s*\),\s*(#.*)?$" % _VELOCIDAD)
+_SEGMENTO_GIRO = re.compile(r"^(\s*)giro_(derecha|izquierda)\(\s*([\d.]*)\s*(?:,\s*%s)?\s*\),\s*(#.*)?$" % _VELOCIDAD)
+# Comentarios y líneas en blanco: quedan dentro del grupo de pasos que los rodea.
+_COMENTARIO = re.compile(r"^\s*(#.*)?$")
+# Líneas que no mueven el robot. Las que ejecutan algo (marcar_bloque, pausa...)
+# cortan el grupo, porque al reescribirlo quedarían fuera de su sitio.
+_NEUTRA = re.compile(r"^\s*(#.*|motor_pair\.pair\(.*|await recorrer\($|\)|await detener\(\)|await pausa\(.*|marcar_bloque\(.*)?\s*$")
+
+
+@dataclass
+class Paso:
+    linea: int
+    tipo: str           # "recta" o "giro"
+    valor: float        # cm (negativo: atrás) o grados (positivo: derecha)
+    velocidad: int      # None: la del perfil por defecto
+    segmento: bool      # True si es un segmento de recorrer(), False si es un await
+    sangria: str
+    comentario: str
+    pose: tuple = None  # (x, y, theta) al empezar el paso, o None si se desconoce
+    recorte_inicio: float = 0.0
+    recorte_fin: float = 0.0
+    arco: float = None  # radio si el giro se convierte en arco
+    ajuste: str = None  # nombre de ajuste() que da la velocidad, si se escribió así
+
+
+def _formato(numero: float) -> str:
+    return "%g" % round(numero, 1)
+
+
+def _velocidad(texto: str, defecto: int = None) -> tuple:
+    """(velocidad, nombre de ajuste() o None) de la velocidad escrita en el programa."""
+    if texto is None:
+        return defecto, None
+    coincidencia = _AJUSTE.match(texto)
+    if coincidencia:
+        return int(coincidencia.group(2)), coincidencia.group(1)
+    return int(texto), None
+
+
+def _texto_velocidad(velocidad: int, ajuste: str = None) -> str:
+    return 'ajuste("%s", %d)' % (ajuste, velocidad) if ajuste else "%d" % velocidad
+
+
+def leer_pasos(lineas, pose_inicial):
+    """Grupos de pasos consecutivos de main(), con la pose a estima de cada uno."""
+    grupos, actual = [], []
+    pose = pose_inicial
+    dentro = False
+    for indice, linea in enumerate(lineas):
+        if linea.startswith("async def main"):
+            dentro = True
+            continue
+        if dentro and linea.strip() and not linea[0].isspace():
+            break
+        if not dentro:
+            continue
+        paso = _paso(indice, linea)
+        if paso is None and _COMENTARIO.match(linea):
+            continue
+        if paso is None:
+            if actual:
+                grupos.append(actual)
+                actual = []
+            if not _NEUTRA.match(linea):
+                pose = None
+            continue
+        if actual and actual[-1].segmento != paso.segmento:
+            grupos.append(actual)
+            actual = []
+        paso.pose = pose
+        pose = _mover(pose, paso)
+        actual.append(paso)
+    if actual:
+        grupos.append(actual)
+    return grupos
+
+
+def _paso(indice: int, linea: str):
+    coincidencia = _AWAIT_RECTA.match(linea)
+    if coincidencia:
+        sangria, funcion, cm, velocidad, comentario = coincidencia.groups()
+        signo = -1 if funcion == "retroceder_cm" else 1
+        velocidad, ajuste = _velocidad(velocidad)
+        return Paso(indice, "recta", signo * float(cm), velocidad, False, sangria, comentario or "", ajuste=ajuste)
+    coincidencia = _AWAIT_GIRO.match(linea)
+    if coincidencia:
+        sangria, lado, grados, velocidad, comentario = coincidencia.groups()
+        signo = 1 if lado == "derecha" else -1
+        velocidad, ajuste = _velocidad(velocidad, 1000)
+        return Paso(indice, "giro", signo * float(grados or 90), velocidad, False, sangria, comentario or "",
+                    ajuste=ajuste)
+    coincidencia = _SEGMENTO_RECTA.match(linea)
+    if coincidencia:
+        sangria, cm, velocidad, comentario = coincidencia.groups()
+        velocidad, ajuste = _velocidad(velocidad)
+        return Paso(indice, "recta", float(cm), velocidad, True, sangria, comentario or "", ajuste=ajuste)
+    coincidencia = _SEGMENTO_GIRO.match(linea)
+    if coincidencia:
+        sangria, lado, grados, velocidad, comentario = coincidencia.groups()
+        signo = 1 if lado == "derecha" else -1
+        velocidad, ajuste = _velocidad(velocidad, 1000)
+        return Paso(indice, "giro", signo * float(grados or 90), velocidad, True, sangria, comentario or "",
+                    ajuste=ajuste)
+    return None
+
+
+def _mover(pose, paso: Paso):
+    if pose is None:
+        return None
+    x, y, theta = pose
+    if paso.tipo == "giro":
+        # En el tapete theta crece al girar a la derecha.
+        return x, y, theta + math.radians(paso.valor)
+    return x + paso.valor * math.cos(theta), y + paso.valor * math.sin(theta), theta
+
+
+def puntos_arco(esquina, theta: float, grados: float, radio: float):
+    """Puntos del centro del robot a lo largo del arco que sustituye a la esquina."""
+    tangente = radio * math.tan(math.radians(abs(grados)) / 2)
+    x = esquina[0] - tangente * math.cos(theta)
+    y = esquina[1] - tangente * math.sin(theta)
+    pasos = max(1, math.ceil(math.radians(abs(grados)) * radio / PASO_MUESTRA_CM))
+    giro = math.radians(grados) / pasos
+    largo = abs(giro) * radio
+    puntos = [(x, y)]
+    for _ in range(pasos):
+        theta += giro / 2
+        x, y = x + largo * math.cos(theta), y + largo * math.sin(theta)
+        theta += giro / 2
+        puntos.append((x, y))
+    return puntos
+
+
+def holgura_libre(campo, esquina, theta: float, grados: float, radio: float) -> bool:
+    if not campo.obstaculos:
+        return True
+    if esquina is None:
+        return False
+    return all(obstaculo.distancia_punto(x, y) >= RADIO_ROBOT_CM
+               for x, y in puntos_arco(esquina, theta, grados, radio) for obstaculo in campo.obstaculos)
+
+
+def fusionar(grupos, campo) -> list:
+    """Marca en los pasos los arcos posibles y devuelve la lista de (recta, giro, recta)."""
+    fusiones = []
+    for grupo in grupos:
+        for primera, giro, segunda in zip(grupo, grupo[1:], grupo[2:]):
+            if (primera.tipo, giro.tipo, segunda.tipo) != ("recta", "giro", "recta"):
+                continue
+            if primera.valor <= 0 or segunda.valor <= 0 or not 0 < abs(giro.valor) <= 90:
+                continue
+            factor = math.tan(math.radians(abs(giro.valor)) / 2)
+            disponible_primera = primera.valor - primera.recorte_inicio
+            radio = min(RADIO_MAXIMO_CM, disponible_primera / factor, segunda.valor / factor)
+            if radio < RADIO_MINIMO_CM:
+                continue
+            esquina = None if giro.pose is None else giro.pose[:2]
+            theta = None if giro.pose is None else giro.pose[2]
+            if not holgura_libre(campo, esquina, theta, giro.valor, radio):
+                continue
+            primera.recorte_fin = radio * factor
+            segunda.recorte_inicio = radio * factor
+            giro.arco = radio
+            fusiones.append((primera, giro, segunda))
+    return fusiones
+
+
+def _segmento(paso: Paso, velocidad_arco: int = None) -> str:
+    if paso.tipo == "recta":
+        largo = _formato(paso.valor - paso.recorte_inicio - paso.recorte_fin)
+        if paso.velocidad is None:
+            return "recta(%s)" % largo
+        return "recta(%s, %s)" % (largo, _texto_velocidad(paso.velocidad, paso.ajuste))
+    lado = "derecha" if paso.valor > 0 else "izquierda"
+    if paso.arco is not None:
+        if velocidad_arco is None:
+            return "arco_%s(%s, %s)" % (lado, _formato(paso.arco), _formato(abs(paso.valor)))
+        # El arco hereda el ajuste() del giro al que sustituye, con la velocidad de las rectas.
+        return "arco_%s(%s, %s, %s)" % (lado, _formato(paso.arco), _formato(abs(paso.valor)),
+                                       _texto_velocidad(velocidad_arco, paso.ajuste))
+    grados = _formato(abs(paso.valor))
+    if paso.velocidad != 1000 or paso.ajuste:
+        return "giro_%s(%s, %s)" % (lado, grados, _texto_velocidad(paso.velocidad, paso.ajuste))
+    return "giro_%s(%s)" % (lado, grados)
+
+
+def reescribir(lineas, grupos) -> list:
+    """Devuelve las líneas con los grupos que tienen arcos pasados a segmentos de recorrer()."""
+    nuevas = {}
+    for grupo in grupos:
+        if not any(paso.arco is not None for paso in grupo):
+            continue
+        textos = []
+        for indice, paso in enumerate(grupo):
+            if paso.tipo == "recta" and abs(paso.valor - paso.recorte_inicio - paso.recorte_fin) < 0.05:
+                textos.append(None)
+                continue
+            velocidad_arco = None
+            if paso.arco is not None:
+                velocidades = [p.velocidad for p in (grupo[indice - 1], grupo[indice + 1]) if p.velocidad]
+                velocidad_arco = min(velocidades) if velocidades else None
+            comentario = " " + paso.comentario if paso.comentario else ""
+            textos.append("%s,%s" % (_segmento(paso, velocidad_arco), comentario))
+        if grupo[0].segmento:
+            for paso, texto in zip(grupo, textos):
+                nuevas[paso.linea] = [] if texto is None else [paso.sangria + texto]
+        else:
+            # Los comentarios entre pasos pasan dentro de recorrer(), en su sitio.
+            sangria = grupo[0].sangria
+            por_linea = {paso.linea: texto for paso, texto in zip(grupo, textos)}
+            bloque = [sangria + "await recorrer("]
+            for indice in range(grupo[0].linea, grupo[-1].linea + 1):
+                if indice not in por_linea:
+                    bloque.append(sangria + "    " + lineas[indice].strip() if lineas[indice].strip() else "")
+                elif por_linea[indice] is not None:
+                    bloque.append(sangria + "    " + por_linea[indice])
+                nuevas[indice] = []
+            bloque.append(sangria + ")")
+            nuevas[grupo[0].linea] = bloque
+    resultado = []
+    for indice, linea in enumerate(lineas):
+        resultado.extend(nuevas.get(indice, [linea]))
+    return _actualizar_importaciones(resultado)
+
+
+def _actualizar_importaciones(lineas) -> list:
+    codigo = "\n".join(l for l in lineas if not l.startswith("from ") and not l.startswith("    ") or "(" in l)
+    usados = [n for n in NOMBRES_TRAYECTO if re.search(r"\b%s\(" % n, codigo)]
+    resultado = []
+    en_movimiento = False
+    for linea in lineas:
+        if linea.startswith("from trayecto import"):
+            continue
+        if linea.startswith("from movimiento import ("):
+            en_movimiento = True
+        elif en_movimiento and linea.startswith(")"):
+            en_movimiento = False
+            resultado.append(linea)
+            resultado.append("from trayecto import " + ", ".join(usados))
+            continue
+        elif en_movimiento and linea.strip().rstrip(",") in NOMBRES_MOVIMIENTO:
+            if not re.search(r"\b%s\(" % linea.strip().rstrip(","), codigo):
+                continue
+        resultado.append(linea)
+    return resultado
+
+
+def optimizar(ruta: Path, sin_campo: bool = False):
+    """(fuente optimizada, fusiones) para un programa."""
+    fuente = ruta.read_text(encoding="utf-8")
+    if sin_campo:
+        campo = Campo()
+    else:
+        config = buscar_config(ruta)
+        if config is None:
+            raise ValueError("No hay config JSON junto a %s: no se puede comprobar la holgura de los arcos" % ruta)
+        campo = Campo.desde_json(config)
+    lineas = fuente.split("\n")
+    grupos = leer_pasos(lineas, campo.pose_inicial())
+    fusiones = fusionar(grupos, campo)
+    if not fusiones:
+        return fuente, []
+    return "\n".join(reescribir(lineas, grupos)), fusiones
+
+
+def _describir(paso: Paso) -> str:
+    if paso.tipo == "recta":
+        return "%s %s cm" % ("avanzar" if paso.valor > 0 else "retroceder", _formato(abs(paso.valor)))
+    return "girar %s %s" % ("derecha" if paso.valor > 0 else "izquierda", _formato(abs(paso.valor)))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("programas", nargs="*", type=Path)
+    parser.add_argument("--escribir", action="store_true", help="guardar los programas optimizados")
+    parser.add_argument("--medir", action="store_true", help="comparar el tiempo en el hub emulado")
+    parser.add_argument("--tiempo-maximo", type=float, default=600.0)
+    parser.add_argument("--sin-campo", action="store_true", help="fusionar sin comprobar obstáculos")
+    args = parser.parse_args(argv)
+
+    for ruta in args.programas or programas_por_defecto():
+        try:
+            optimizado, fusiones = optimizar(ruta, args.sin_campo)
+        except ValueError as error:
+            print("%s: no se fusiona (%s; --sin-campo para fusionar igualmente)" % (ruta.stem, error))
+            continue
+        print("%s: %d arcos" % (ruta.stem, len(fusiones)))
+        for primera, giro, segunda in fusiones:
+            print("    l.%d-%d  %s + %s + %s -> arco de %s cm" % (
+                primera.linea + 1, segunda.linea + 1, _describir(primera), _describir(giro), _describir(segunda),
+                _formato(giro.arco)))
+        if args.medir and fusiones:
+            antes = medir_programa(ruta, args.tiempo_maximo)
+            despues = medir_programa(ruta, args.tiempo_maximo, optimizado)
+            if antes["estado"] == despues["estado"] == "ok":
+                print("    tiempo: %.2f s -> %.2f s (%+.2f s)" % (
+                    antes["tiempo"], despues["tiempo"], despues["tiempo"] - antes["tiempo"]))
+            else:
+                # Sin tiempo total (p. ej. espera un color que el campo no tiene): se comparan
+                # los bloques que terminaron en ambas ejecuciones.
+                terminados = list(despues["bloques"])[:-1]
+                comunes = [nombre for nombre in list(antes["bloques"])[:-1] if nombre in terminados]
+                print("    tiempo en %d bloques completos: %.2f s -> %.2f s (%+.2f s)" % (
+                    len(comunes), sum(antes["bloques"][n] for n in comunes),
+                    sum(despues["bloques"][n] for n in comunes),
+                    sum(despues["bloques"][n] - antes["bloques"][n] for n in comunes)))
+        if args.escribir and fusiones:
+            ruta.write_text(optimizado, encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
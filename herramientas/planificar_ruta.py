@@ -0,0 +1,248 @@
+"""Planifica en el PC una ruta entre destinos del tapete y genera el reto.
+
+Uso:
+    python -m herramientas.planificar_ruta RetoN/RetoNRuta.json [--salida PROGRAMA]
+                                           [--arcos] [--medir]
+
+El JSON de ruta lista los destinos en las coordenadas de robotPoses:
+
+    {"robot": 0, "destinos": [{"x": 0.5, "y": 0.4}, {"x": 0.8, "y": 0.3, "theta": 0.0}]}
+
+Se parte de la pose del robot en el config JSON de la misma carpeta. Entre
+cada par de destinos se busca el camino de menor tiempo por un grafo de
+visibilidad (destinos y esquinas de los obstáculos ensanchadas en
+RADIO_ROBOT_CM), con el coste de cada recta según PERFILES_RECTA de
+movimiento y el de cada giro con giroscopio; las rectas pueden ir hacia
+atrás si así se ahorra un giro. El resultado es un RetoN...Spike.py con un
+`await recorrer(...)` por destino: el hub solo ejecuta el plan.
+
+--arcos pasa el programa por herramientas/optimizar_arcos.py y --medir lo
+ejecuta en el hub emulado comparando la pose final con el último destino.
+"""
+import argparse
+import heapq
+import json
+import math
+import sys
+from pathlib import Path
+
+from simulador import Campo, Mundo, ejecutar_programa, hub_emulado, mundo_para_programa
+from simulador.campo import buscar_config
+
+from .optimizar_arcos import RADIO_ROBOT_CM, optimizar
+
+# Distancia mínima del centro del robot al borde del tapete.
+MARGEN_PAREDES_CM = 6.0
+PASO_COMPROBACION_CM = 1.0
+# Tiempo de girar_*_fase en el hub emulado: ~0.15 s fijos más 0.0024 s por grado.
+TIEMPO_GIRO_S = 0.15
+SEGUNDOS_POR_GRADO_GIRO = 0.0024
+# Por debajo de esto no se emite giro.
+GIRO_MINIMO_GRADOS = 0.5
+
+
+class ModeloTiempos:
+    """Tiempo estimado de rectas y giros con los perfiles de comun/movimiento.py."""
+
+    def __init__(self) -> None:
+        # movimiento importa los módulos del hub: se carga dentro del hub emulado.
+        with hub_emulado(Mundo()):
+            import movimiento
+            self.perfiles = movimiento.PERFILES_RECTA
+            self.cm_por_grado = movimiento.CIRCUNFERENCIA_RUEDA / movimiento.GRADOS_POR_ROTACION
+            # Velocidad de crucero real de cada perfil según la tabla medida del robot.
+            self.cm_por_segundo = movimiento.cm_por_segundo
+
+    def recta(self, cm: float) -> float:
+        cm = abs(cm)
+        if cm == 0:
+            return 0.0
+        for hasta_cm, velocidad, aceleracion, deceleracion in self.perfiles:
+            if cm <= hasta_cm:
+                break
+        v = self.cm_por_segundo(velocidad)
+        a, d = aceleracion * self.cm_por_grado, deceleracion * self.cm_por_grado
+        rampas = v * v / (2 * a) + v * v / (2 * d)
+        if cm >= rampas:
+            return (cm - rampas) / v + v / a + v / d
+        # Triángulo: no llega a la velocidad de crucero.
+        pico = math.sqrt(2 * cm * a * d / (a + d))
+        return pico / a + pico / d
+
+    def giro(self, grados: float) -> float:
+        if abs(grados) < GIRO_MINIMO_GRADOS:
+            return 0.0
+        return TIEMPO_GIRO_S + abs(grados) * SEGUNDOS_POR_GRADO_GIRO
+
+
+def _angulo(radianes: float) -> float:
+    """Ángulo en grados normalizado a (-180, 180]; positivo es a la derecha."""
+    grados = math.degrees(radianes) % 360
+    return grados - 360 if grados > 180 else grados
+
+
+def libre(campo, x0: float, y0: float, x1: float, y1: float) -> bool:
+    """True si el robot puede ir en línea recta de (x0, y0) a (x1, y1)."""
+    pasos = max(1, math.ceil(math.hypot(x1 - x0, y1 - y0) / PASO_COMPROBACION_CM))
+    for paso in range(pasos + 1):
+        x = x0 + (x1 - x0) * paso / pasos
+        y = y0 + (y1 - y0) * paso / pasos
+        if campo.paredes and not (MARGEN_PAREDES_CM <= x <= campo.ancho - MARGEN_PAREDES_CM
+                                  and MARGEN_PAREDES_CM <= y <= campo.alto - MARGEN_PAREDES_CM):
+            return False
+        if any(obstaculo.distancia_punto(x, y) < RADIO_ROBOT_CM for obstaculo in campo.obstaculos):
+            return False
+    return True
+
+
+def nodos_obstaculos(campo) -> list:
+    """Esquinas de los obstáculos desplazadas hacia fuera lo justo para que el robot pase."""
+    nodos = []
+    for obstaculo in campo.obstaculos:
+        for x, y in obstaculo.esquinas():
+            dx, dy = x - obstaculo.cx, y - obstaculo.cy
+            largo = math.hypot(dx, dy)
+            # En la diagonal hace falta RADIO * raíz de 2 para quedar a RADIO de ambos lados.
+            separacion = RADIO_ROBOT_CM * math.sqrt(2) + PASO_COMPROBACION_CM
+            nodo = (x + dx / largo * separacion, y + dy / largo * separacion)
+            if libre(campo, nodo[0], nodo[1], nodo[0], nodo[1]):
+                nodos.append(nodo)
+    return nodos
+
+
+def planificar_tramo(campo, modelo: ModeloTiempos, inicio, destino, theta_final=None, esquinas=()):
+    """Camino de menor tiempo de la pose `inicio` a `destino`.
+
+    Devuelve (segundos, lista de (tipo, valor), theta al llegar); tipo es
+    "giro" (grados, positivo a la derecha) o "recta" (cm, negativo hacia atrás).
+    """
+    puntos = [inicio[:2]] + list(esquinas) + [destino]
+    llegada = len(puntos) - 1
+    # Estado: (tiempo, contador, punto, rumbo del robot, segmentos hasta aquí).
+    contador = 0
+    frontera = [(0.0, contador, 0, inicio[2], [])]
+    visitados = set()
+    while frontera:
+        tiempo, _, actual, rumbo, segmentos = heapq.heappop(frontera)
+        if actual is None:
+            return tiempo, segmentos, rumbo
+        clave = (actual, round(math.degrees(rumbo) % 360, 1))
+        if clave in visitados:
+            continue
+        visitados.add(clave)
+        if actual == llegada:
+            giro = 0.0 if theta_final is None else _angulo(theta_final - rumbo)
+            final = segmentos + ([("giro", giro)] if abs(giro) >= GIRO_MINIMO_GRADOS else [])
+            contador += 1
+            heapq.heappush(frontera, (tiempo + modelo.giro(giro), contador, None,
+                                      rumbo if theta_final is None else theta_final, final))
+            continue
+        x0, y0 = puntos[actual]
+        for siguiente, (x1, y1) in enumerate(puntos):
+            if siguiente == actual or not libre(campo, x0, y0, x1, y1):
+                continue
+            distancia = math.hypot(x1 - x0, y1 - y0)
+            direccion = math.atan2(y1 - y0, x1 - x0)
+            for sentido in (1, -1):
+                nuevo_rumbo = direccion if sentido > 0 else direccion + math.pi
+                giro = _angulo(nuevo_rumbo - rumbo)
+                pasos = [("giro", giro)] if abs(giro) >= GIRO_MINIMO_GRADOS else []
+                pasos.append(("recta", sentido * distancia))
+                contador += 1
+                heapq.heappush(frontera, (tiempo + modelo.giro(giro) + modelo.recta(distancia), contador, siguiente,
+                                          nuevo_rumbo % (2 * math.pi), segmentos + pasos))
+    raise ValueError("No hay camino libre hasta (%.1f, %.1f) cm" % destino)
+
+
+def _segmento(tipo: str, valor: float) -> str:
+    if tipo == "recta":
+        return "recta(%g)" % round(valor, 1)
+    lado = "derecha" if valor > 0 else "izquierda"
+    return "giro_%s(%g)" % (lado, round(abs(valor), 1))
+
+
+def generar_programa(nombre: str, tramos) -> str:
+    """Código del reto: un bloque `await recorrer(...)` por destino."""
+    usados = sorted({"recta"} | {"giro_derecha" if valor > 0 else "giro_izquierda"
+                                 for _, segmentos in tramos for tipo, valor in segmentos if tipo == "giro"},
+                    key=("recta", "giro_derecha", "giro_izquierda").index)
+    lineas = [
+        "# Generado por herramientas/planificar_ruta.py desde %s: no editar a mano." % nombre,
+        "import runloop",
+        "import motor_pair",
+        "from movimiento import (",
+        "    motor_izquierda,",
+        "    motor_derecha,",
+        "    detener,",
+        ")",
+        "from trayecto import recorrer, %s" % ", ".join(usados),
+        "",
+        "# --- FUNCIÓN PRINCIPAL Y EJECUCIÓN ---",
+        "async def main():",
+        "    # Inicialización del par de motores",
+        "    motor_pair.pair(motor_pair.PAIR_1, motor_izquierda, motor_derecha)",
+    ]
+    for numero, (destino, segmentos) in enumerate(tramos, 1):
+        lineas += ["", "    # Bloque %d: hacia %s" % (numero, destino)]
+        if not segmentos:
+            lineas.append("    # (ya estaba allí)")
+            continue
+        lineas.append("    await recorrer(")
+        lineas += ["        %s," % _segmento(tipo, valor) for tipo, valor in segmentos]
+        lineas.append("    )")
+    lineas += ["", "    await detener()", "", "# Ejecutar programa", "runloop.run(main())", ""]
+    return "\n".join(lineas)
+
+
+def planificar(ruta: Path):
+    """(código del reto, tiempo estimado, pose final en cm) para un JSON de ruta."""
+    with open(ruta, encoding="utf-8") as archivo:
+        datos = json.load(archivo)
+    config = buscar_config(ruta)
+    if config is None:
+        raise ValueError("No hay config JSON junto a %s" % ruta)
+    campo = Campo.desde_json(config)
+    modelo = ModeloTiempos()
+    esquinas = nodos_obstaculos(campo)
+    pose = campo.pose_inicial(datos.get("robot", 0))
+    total = 0.0
+    tramos = []
+    for destino in datos["destinos"]:
+        punto = (destino["x"] * campo.ancho, destino["y"] * campo.alto)
+        tiempo, segmentos, theta = planificar_tramo(campo, modelo, pose, punto, destino.get("theta"), esquinas)
+        total += tiempo
+        descripcion = "(%.3f, %.3f)" % (destino["x"], destino["y"])
+        if "theta" in destino:
+            descripcion += " mirando a %.0f grados" % math.degrees(destino["theta"])
+        tramos.append((descripcion, segmentos))
+        pose = (punto[0], punto[1], theta)
+    return generar_programa(ruta.name, tramos), total, pose
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("ruta", type=Path)
+    parser.add_argument("--salida", type=Path, help="por defecto <ruta sin .json>_Spike.py")
+    parser.add_argument("--arcos", action="store_true", help="fusionar giros y rectas en arcos")
+    parser.add_argument("--medir", action="store_true", help="ejecutar en el hub emulado")
+    args = parser.parse_args(argv)
+
+    salida = args.salida or args.ruta.with_name(args.ruta.stem + "_Spike.py")
+    codigo, estimado, pose = planificar(args.ruta)
+    salida.write_text(codigo, encoding="utf-8")
+    print("%s: %.2f s estimados" % (salida, estimado))
+    if args.arcos:
+        codigo, fusiones = optimizar(salida)
+        salida.write_text(codigo, encoding="utf-8")
+        print("    %d arcos" % len(fusiones))
+    if args.medir:
+        mundo = mundo_para_programa(salida)
+        ejecutar_programa(salida, mundo)
+        robot = mundo.robot
+        print("    hub emulado: %.2f s, pose final (%.1f, %.1f) cm, error %.2f cm" % (
+            mundo.tiempo, robot.x, robot.y, math.hypot(robot.x - pose[0], robot.y - pose[1])))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""Ejecuta un reto en el hub emulado con los sensores de un registro de telemetría real.
+
+Uso:
+    python -m herramientas.reproducir Reto5/Reto5_Spike.py REGISTROS... [--tiempo-maximo 600]
+                                      [--telemetria CARPETA] [--campo JSON] [--sin-campo]
+
+REGISTROS son telemetria_<reto>_NNN.bin (o carpetas con ellos) guardados por
+comun/telemetria.py en el robot real, con el canal ENCODERS y los sensores
+que se quieran reproducir (COLOR, REFLEXION, DISTANCIA). Para cada registro
+se ejecuta el programa en un MundoReproducido (simulador/reproduccion.py):
+color_sensor y distance_sensor devuelven lo que midió el robot cuando sus
+ruedas llevaban el mismo recorrido, y lo demás sale del campo del reto.
+
+Sirve para probar un main() modificado, p. ej. otros umbrales en Reto5,
+contra las lecturas de una ejecución que falló en el campo. Corre con el
+reloj virtual: una misión de minutos se reproduce en un par de segundos.
+
+Supone que el programa modificado sigue más o menos la misma ruta: las
+lecturas van por recorrido de las ruedas, no por posición en el campo. Si se
+pasa del final del registro se avisa con los cm recorridos fuera de él. Los
+registros con muestras pisadas por el búfer circular se rechazan: sin el
+principio no se sabe cuánto llevaban recorrido las ruedas.
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from herramientas.telemetria import COLOR, DISTANCIA, ENCODERS, REFLEXION, Telemetria, buscar, leer
+from simulador import Campo, TiempoAgotado, ejecutar_programa, mundo_para_programa
+from simulador.reproduccion import MundoReproducido
+
+TIEMPO_MAXIMO = 600.0
+
+
+def recorrido(telemetria: Telemetria) -> np.ndarray:
+    """Grados recorridos por las ruedas hasta cada muestra (media de los valores absolutos)."""
+    izquierda, derecha = telemetria.ruedas()
+    pasos = np.abs(np.diff(izquierda, prepend=izquierda[:1])) + np.abs(np.diff(derecha, prepend=derecha[:1]))
+    return np.cumsum(pasos) / 2
+
+
+def mundo_reproducido(telemetria: Telemetria, **opciones) -> MundoReproducido:
+    """MundoReproducido con los sensores que tenga el registro."""
+    if not telemetria.canales & ENCODERS:
+        raise ValueError("%s no tiene el canal ENCODERS: no se puede situar cada lectura" % telemetria.ruta)
+    if not len(telemetria.muestras):
+        raise ValueError("%s no tiene muestras" % telemetria.ruta)
+    if not telemetria.canales & (COLOR | REFLEXION | DISTANCIA):
+        raise ValueError("%s no tiene ningún sensor que reproducir" % telemetria.ruta)
+    if telemetria.pisadas:
+        # El recorrido se cuenta desde la primera muestra guardada, no desde la salida:
+        # cada lectura caería antes en la ruta de lo que la midió el robot.
+        raise ValueError("%s perdió sus %d primeras muestras en el búfer circular: sube CAPACIDAD "
+                         "en comun/telemetria.py para que quepa la misión entera" % (telemetria.ruta, telemetria.pisadas))
+
+    def canal(bit: int, nombre: str):
+        return telemetria.muestras[nombre] if telemetria.canales & bit else None
+
+    return MundoReproducido(recorrido(telemetria), canal(COLOR, "color"), canal(REFLEXION, "reflexion"),
+                            canal(DISTANCIA, "distancia"), **opciones)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("programa")
+    parser.add_argument("registros", nargs="+", help="archivos .bin o carpetas")
+    parser.add_argument("--tiempo-maximo", type=float, default=TIEMPO_MAXIMO, help="segundos virtuales por registro")
+    parser.add_argument("--telemetria", metavar="CARPETA", help="guardar ahí la telemetría de cada reproducción")
+    parser.add_argument("--campo", help="JSON de configuración (por defecto, el de la carpeta del reto)")
+    parser.add_argument("--sin-campo", action="store_true", help="no cargar ningún campo")
+    args = parser.parse_args(argv)
+
+    if args.sin_campo:
+        campo = None
+    elif args.campo:
+        campo = Campo.desde_json(args.campo)
+    else:
+        campo = mundo_para_programa(args.programa).campo
+    codigo = 0
+    for ruta in buscar(args.registros):
+        try:
+            telemetria = leer(ruta)
+            mundo = mundo_reproducido(telemetria, campo=campo, tiempo_maximo=args.tiempo_maximo)
+        except ValueError as error:
+            print(error)
+            codigo = 1
+            continue
+        inicio = time.perf_counter()
+        estado = "ok"
+        try:
+            ejecutar_programa(args.programa, mundo, flash=args.telemetria)
+        except TiempoAgotado:
+            estado = "tiempo agotado"
+            codigo = 1
+        real = time.perf_counter() - inicio
+        grabado = telemetria.tiempo[-1]
+        cm_por_grado = mundo.robot.geometria.circunferencia_rueda / 360
+        fuera = mundo.fuera_de_traza() * cm_por_grado
+        print("%-28s %-15s virtual %7.1f s (registro %6.1f s)  real %5.2f s  recorrido %6.1f/%.1f cm%s" % (
+            ruta.name, estado, mundo.tiempo, grabado, real, mundo.recorrido * cm_por_grado,
+            mundo.traza[-1] * cm_por_grado, "  ¡%.1f cm fuera del registro!" % fuera if fuera >= 1 else ""))
+    return codigo
+
+
+if __name__ == "__main__":
+    sys.exit(main())
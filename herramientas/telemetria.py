@@ -0,0 +1,354 @@
+"""Decodifica los registros de telemetría del hub y mide cada bloque de la misión.
+
+Uso:
+    python -m herramientas.telemetria [ARCHIVOS O CARPETAS...] [--salida build/telemetria.json]
+                                      [--trazas CARPETA] [--circunferencia 17.58] [--ancho-eje 11.2]
+
+Lee los telemetria_<reto>_NNN.bin que guarda comun/telemetria.py (por
+defecto, los de build/flash). Cada archivo se proyecta en memoria con
+np.memmap y se ve como un array estructurado, sin recorrer los registros en
+Python. De cada ejecución se obtiene:
+- el tiempo de cada bloque (marcar_bloque() en el reto);
+- las trazas de velocidad de cada rueda, de avance y de giro (--trazas las
+  guarda en un .npz por archivo);
+- el sobrepaso de cada parada: lo que el robot llegó a pasarse del punto
+  donde queda quieto, en cm tras una recta y en grados tras un giro;
+- la oscilación por bloque mientras el robot avanza: desviación de la
+  reflexión respecto a su media y frecuencia con que la cruza (el seguidor de
+  línea), y desviación de la velocidad de giro.
+
+Los resultados de cada archivo y el resumen por reto (mediana y p95 entre
+ejecuciones) se guardan en JSON.
+"""
+import argparse
+import json
+import math
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+RAIZ = Path(__file__).resolve().parent.parent
+ENTRADA = RAIZ / "build" / "flash"
+SALIDA = RAIZ / "build" / "telemetria.json"
+# Los de movimiento.py; con perfil_robot.py, pasar los medidos.
+CIRCUNFERENCIA_RUEDA = 17.58
+ANCHO_EJE = 11.2
+# Una rueda más lenta que esto (grados/s) cuenta como parada.
+UMBRAL_PARADO = 30.0
+# Un tramo más corto que esto tras una recta o un giro (un retroceso para
+# corregir, una rueda que arranca antes que la otra) es parte de ella.
+CORRECCION_CM = 2.0
+CORRECCION_GRADOS = 5.0
+# Bloques con menos tiempo avanzando (s) no dan oscilación.
+AVANCE_MINIMO = 0.5
+
+# Formato de comun/telemetria.py: canales, cabecera y campos de cada canal en orden.
+ENCODERS = 1
+YAW = 2
+COLOR = 4
+REFLEXION = 8
+DISTANCIA = 16
+FIRMA = b"TLMT"
+VERSION = 1
+CABECERA = np.dtype([("firma", "S4"), ("version", "u1"), ("canales", "u1"), ("periodo_ms", "<u2"),
+                     ("muestras", "<u4"), ("pisadas", "<u4")])
+CAMPOS = (
+    (ENCODERS, [("izquierda", "<i4"), ("derecha", "<i4")]),
+    (YAW, [("yaw", "<i2")]),
+    (COLOR, [("color", "i1")]),
+    (REFLEXION, [("reflexion", "u1")]),
+    (DISTANCIA, [("distancia", "<i2")]),
+)
+
+
+def tipo_registro(canales: int) -> np.dtype:
+    """dtype de un registro con `canales` (el formato_registro() del hub)."""
+    campos = [("tiempo", "<u4"), ("bloque", "u1")]
+    for canal, nuevos in CAMPOS:
+        if canales & canal:
+            campos += nuevos
+    return np.dtype(campos)
+
+
+@dataclass
+class Telemetria:
+    """Un archivo de telemetría: la cabecera y las muestras como array estructurado."""
+
+    ruta: Path
+    reto: str
+    canales: int
+    periodo_ms: int
+    pisadas: int
+    muestras: np.ndarray
+
+    @property
+    def tiempo(self) -> np.ndarray:
+        """Segundos desde el arranque."""
+        return self.muestras["tiempo"] / 1000.0
+
+    @property
+    def bloque(self) -> np.ndarray:
+        return self.muestras["bloque"]
+
+    def ruedas(self) -> tuple:
+        """Grados de cada rueda, adelante positivo (el motor izquierdo está en espejo)."""
+        return -self.muestras["izquierda"].astype(float), self.muestras["derecha"].astype(float)
+
+    def rumbo(self, circunferencia: float = CIRCUNFERENCIA_RUEDA, ancho_eje: float = ANCHO_EJE) -> np.ndarray:
+        """Rumbo en grados, creciendo a la izquierda y sin saltos de ±180.
+
+        Sale del yaw y, si no se registró, de la diferencia entre ruedas.
+        """
+        if self.canales & YAW:
+            return np.degrees(np.unwrap(np.radians(self.muestras["yaw"] / 10.0)))
+        izquierda, derecha = self.ruedas()
+        return (derecha - izquierda) * circunferencia / 360 / ancho_eje * 180 / math.pi
+
+
+def leer(ruta) -> Telemetria:
+    """Proyecta `ruta` en memoria; las muestras se leen del archivo al usarlas."""
+    ruta = Path(ruta)
+    cabecera = np.fromfile(ruta, dtype=CABECERA, count=1)
+    if len(cabecera) == 0 or cabecera["firma"][0] != FIRMA:
+        raise ValueError("%s no es un archivo de telemetría" % ruta)
+    if cabecera["version"][0] != VERSION:
+        raise ValueError("%s: versión %d no soportada" % (ruta, cabecera["version"][0]))
+    canales = int(cabecera["canales"][0])
+    muestras = int(cabecera["muestras"][0])
+    tipo = tipo_registro(canales)
+    if muestras:
+        datos = np.memmap(ruta, dtype=tipo, mode="r", offset=CABECERA.itemsize, shape=(muestras,))
+    else:
+        datos = np.zeros(0, dtype=tipo)
+    # telemetria_<reto>_NNN.bin
+    reto = ruta.stem[len("telemetria_"):].rpartition("_")[0] or ruta.stem
+    return Telemetria(ruta, reto, canales, int(cabecera["periodo_ms"][0]), int(cabecera["pisadas"][0]), datos)
+
+
+def buscar(rutas) -> list:
+    """Los .bin de telemetría de `rutas` (archivos o carpetas), ordenados."""
+    archivos = []
+    for ruta in map(Path, rutas):
+        archivos += sorted(ruta.glob("telemetria_*.bin")) if ruta.is_dir() else [ruta]
+    return archivos
+
+
+# --- Métricas ---
+def tiempos_bloque(telemetria: Telemetria) -> dict:
+    """Segundos de cada bloque; el 0 es lo anterior al primer marcar_bloque()."""
+    if len(telemetria.muestras) < 2:
+        return {}
+    # Cada intervalo entre muestras cuenta para el bloque de la primera.
+    bloques = telemetria.bloque[:-1]
+    totales = np.bincount(bloques, weights=np.diff(telemetria.tiempo))
+    return {int(bloque): round(float(totales[bloque]), 3) for bloque in np.unique(bloques)}
+
+
+def velocidades(telemetria: Telemetria, circunferencia: float = CIRCUNFERENCIA_RUEDA,
+                ancho_eje: float = ANCHO_EJE) -> dict:
+    """Trazas: ruedas en grados/s (adelante positivo), avance en cm/s y giro en grados/s."""
+    tiempo = telemetria.tiempo
+    trazas = {"tiempo": tiempo, "bloque": np.asarray(telemetria.bloque)}
+    if len(tiempo) < 2 or not telemetria.canales & (ENCODERS | YAW):
+        return trazas
+    if telemetria.canales & ENCODERS:
+        izquierda, derecha = (np.gradient(grados, tiempo) for grados in telemetria.ruedas())
+        trazas.update(izquierda=izquierda, derecha=derecha, avance=(izquierda + derecha) / 2 * circunferencia / 360)
+    trazas["giro"] = np.gradient(telemetria.rumbo(circunferencia, ancho_eje), tiempo)
+    return trazas
+
+
+def sobrepasos(telemetria: Telemetria, circunferencia: float = CIRCUNFERENCIA_RUEDA,
+               ancho_eje: float = ANCHO_EJE) -> dict:
+    """Arrays con cada movimiento: bloque, instante en que acaba, si es giro y sobrepaso.
+
+    Un movimiento es un tramo de recta (o arco) o de giro en un mismo sentido,
+    con la parada que le sigue. Los tramos cortos que vienen detrás
+    (CORRECCION_CM, CORRECCION_GRADOS), como un retroceso para corregir, forman
+    parte de él.
+    El sobrepaso es lo que el robot llegó a pasarse, en el sentido del
+    movimiento, de donde queda al acabar: cm en las rectas, grados en los
+    giros; 0 si frena sin pasarse.
+    """
+    vacio = {"bloque": np.zeros(0, int), "instante": np.zeros(0), "giro": np.zeros(0, bool),
+             "sobrepaso": np.zeros(0)}
+    if not telemetria.canales & ENCODERS or len(telemetria.muestras) < 3:
+        return vacio
+    trazas = velocidades(telemetria, circunferencia, ancho_eje)
+    izquierda, derecha = trazas["izquierda"], trazas["derecha"]
+    # Tipo de cada muestra: ±1 recta adelante/atrás, ±2 giro a la izquierda/derecha, 0 parado.
+    # Girando sobre una rueda las dos componentes son iguales: cuenta como giro.
+    es_giro = np.abs(derecha - izquierda) >= np.abs(derecha + izquierda)
+    tipo = np.where(es_giro, 2 * np.sign(derecha - izquierda), np.sign(derecha + izquierda)).astype(int)
+    tipo[np.maximum(np.abs(izquierda), np.abs(derecha)) < UMBRAL_PARADO] = 0
+    # Las muestras paradas siguen siendo del movimiento anterior.
+    ultimo = np.maximum.accumulate(np.where(tipo != 0, np.arange(len(tipo)), 0))
+    tipo = tipo[ultimo]
+    inicios = np.flatnonzero(np.diff(tipo, prepend=0) != 0)
+    inicios = inicios[tipo[inicios] != 0]
+    if len(inicios) == 0:
+        return vacio
+    finales = np.append(inicios[1:], len(tipo))
+
+    avance = (telemetria.ruedas()[0] + telemetria.ruedas()[1]) / 2 * circunferencia / 360
+    rumbo = telemetria.rumbo(circunferencia, ancho_eje)
+    giro = np.abs(tipo[inicios]) == 2
+    recorrido = np.where(giro, np.abs(rumbo[finales - 1] - rumbo[inicios]),
+                         np.abs(avance[finales - 1] - avance[inicios]))
+    # Un tramo corto es la corrección del movimiento anterior o el paso de uno a
+    # otro (una rueda arranca antes): se suma al anterior, o al siguiente si es el primero.
+    corto = recorrido < np.where(giro, CORRECCION_GRADOS, CORRECCION_CM)
+    if corto.all():
+        return vacio
+    primero = np.argmax(~corto)
+    corto[primero] = False
+    inicios[primero] = inicios[0]
+    inicios, giro = inicios[~corto], giro[~corto]
+    finales = np.append(inicios[1:], len(tipo))
+    sentido = np.sign(tipo[inicios]).astype(float)
+    sobrepaso = np.empty(len(inicios))
+    for valores, elegidos in ((avance, ~giro), (rumbo, giro)):
+        # Cada muestra multiplicada por el sentido de su movimiento: el máximo es lo más lejos que llegó.
+        en_sentido = np.repeat(sentido, finales - inicios) * valores[inicios[0]:]
+        maximos = np.maximum.reduceat(en_sentido, inicios - inicios[0])
+        sobrepaso[elegidos] = (maximos - sentido * valores[finales - 1])[elegidos]
+    return {"bloque": telemetria.bloque[inicios].astype(int), "instante": telemetria.tiempo[finales - 1],
+            "giro": giro, "sobrepaso": sobrepaso}
+
+
+def oscilacion(telemetria: Telemetria, circunferencia: float = CIRCUNFERENCIA_RUEDA,
+               ancho_eje: float = ANCHO_EJE) -> dict:
+    """Por bloque, mientras el robot avanza: segundos, y desviación y cruces por segundo de la reflexión y el giro.
+
+    Siguiendo una línea, la reflexión oscila alrededor del valor de borde:
+    cuanto menor la desviación y la frecuencia de cruce, más suave el seguidor.
+    """
+    if not telemetria.canales & ENCODERS or len(telemetria.muestras) < 3:
+        return {}
+    trazas = velocidades(telemetria, circunferencia, ancho_eje)
+    avanzando = (trazas["izquierda"] > UMBRAL_PARADO) & (trazas["derecha"] > UMBRAL_PARADO)
+    bloques = telemetria.bloque[avanzando].astype(int)
+    if len(bloques) < 2:
+        return {}
+    # Tiempo de cada muestra: el intervalo hasta la siguiente.
+    intervalo = np.append(np.diff(trazas["tiempo"]), 0.0)[avanzando]
+    segundos = np.bincount(bloques, weights=intervalo)
+    cuenta = np.bincount(bloques)
+    senales = {"giro": trazas["giro"][avanzando]}
+    if telemetria.canales & REFLEXION:
+        senales["reflexion"] = telemetria.muestras["reflexion"][avanzando].astype(float)
+    # Solo se cruzan dos muestras seguidas del mismo bloque y del mismo tramo de avance.
+    contiguas = (np.diff(np.flatnonzero(avanzando)) == 1) & (bloques[1:] == bloques[:-1])
+    medidas = {"segundos": segundos}
+    for nombre, valores in senales.items():
+        desvio = valores - (np.bincount(bloques, weights=valores) / np.maximum(cuenta, 1))[bloques]
+        medidas[nombre + "_desviacion"] = np.sqrt(np.bincount(bloques, weights=desvio ** 2) / np.maximum(cuenta, 1))
+        cruces = contiguas & (np.sign(desvio[1:]) * np.sign(desvio[:-1]) < 0)
+        medidas[nombre + "_cruces_por_s"] = (np.bincount(bloques[1:], weights=cruces, minlength=len(segundos))
+                                             / np.maximum(segundos, 1e-9))
+    return {int(bloque): {nombre: round(float(valores[bloque]), 3) for nombre, valores in medidas.items()}
+            for bloque in np.unique(bloques) if segundos[bloque] >= AVANCE_MINIMO}
+
+
+def analizar(telemetria: Telemetria, circunferencia: float = CIRCUNFERENCIA_RUEDA, ancho_eje: float = ANCHO_EJE) -> dict:
+    """Todas las métricas de un archivo, listas para JSON."""
+    paradas = sobrepasos(telemetria, circunferencia, ancho_eje)
+    return {
+        "reto": telemetria.reto,
+        "muestras": len(telemetria.muestras),
+        "pisadas": telemetria.pisadas,
+        "duracion": round(float(telemetria.tiempo[-1]), 3) if len(telemetria.muestras) else 0.0,
+        "bloques": tiempos_bloque(telemetria),
+        "paradas": [{"bloque": int(bloque), "instante": round(float(instante), 3), "tipo": "giro" if giro else "recta",
+                     "sobrepaso": round(float(sobrepaso), 3)}
+                    for bloque, instante, giro, sobrepaso in zip(paradas["bloque"], paradas["instante"],
+                                                                  paradas["giro"], paradas["sobrepaso"])],
+        "oscilacion": oscilacion(telemetria, circunferencia, ancho_eje),
+    }
+
+
+def _percentiles(valores) -> dict:
+    valores = np.asarray(valores, dtype=float)
+    if len(valores) == 0:
+        return {}
+    return {"p50": round(float(np.percentile(valores, 50)), 3), "p95": round(float(np.percentile(valores, 95)), 3),
+            "max": round(float(valores.max()), 3)}
+
+
+def resumir(analisis: list) -> dict:
+    """Por reto: ejecuciones, duración y tiempo de cada bloque, sobrepasos y oscilación (p50, p95, máx.)."""
+    retos = {}
+    for resultado in analisis:
+        retos.setdefault(resultado["reto"], []).append(resultado)
+    resumen = {}
+    for reto, resultados in sorted(retos.items()):
+        bloques = sorted({bloque for resultado in resultados for bloque in resultado["bloques"]})
+        osciladores = sorted({bloque for resultado in resultados for bloque in resultado["oscilacion"]})
+        paradas = [parada for resultado in resultados for parada in resultado["paradas"]]
+        resumen[reto] = {
+            "ejecuciones": len(resultados),
+            "duracion": _percentiles([resultado["duracion"] for resultado in resultados]),
+            "bloques": {bloque: _percentiles([resultado["bloques"][bloque] for resultado in resultados
+                                              if bloque in resultado["bloques"]]) for bloque in bloques},
+            "sobrepaso_cm": _percentiles([parada["sobrepaso"] for parada in paradas if parada["tipo"] == "recta"]),
+            "sobrepaso_grados": _percentiles([parada["sobrepaso"] for parada in paradas if parada["tipo"] == "giro"]),
+            "oscilacion": {bloque: {nombre: _percentiles([resultado["oscilacion"][bloque][nombre]
+                                                          for resultado in resultados
+                                                          if bloque in resultado["oscilacion"]])
+                                    for nombre in next(resultado["oscilacion"][bloque] for resultado in resultados
+                                                       if bloque in resultado["oscilacion"])}
+                           for bloque in osciladores},
+        }
+    return resumen
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("rutas", nargs="*", type=Path, help="archivos .bin o carpetas (por defecto build/flash)")
+    parser.add_argument("--salida", type=Path, default=SALIDA)
+    parser.add_argument("--trazas", type=Path, help="carpeta donde guardar las trazas de velocidad (.npz)")
+    parser.add_argument("--circunferencia", type=float, default=CIRCUNFERENCIA_RUEDA)
+    parser.add_argument("--ancho-eje", type=float, default=ANCHO_EJE)
+    args = parser.parse_args(argv)
+
+    archivos = buscar(args.rutas or [ENTRADA])
+    if not archivos:
+        print("No hay archivos de telemetría en %s" % ", ".join(map(str, args.rutas or [ENTRADA])))
+        return 1
+    if args.trazas:
+        args.trazas.mkdir(parents=True, exist_ok=True)
+    analisis = {}
+    for ruta in archivos:
+        try:
+            telemetria = leer(ruta)
+        except ValueError as error:
+            print(error)
+            continue
+        analisis[ruta.name] = analizar(telemetria, args.circunferencia, args.ancho_eje)
+        if args.trazas:
+            np.savez_compressed(args.trazas / (ruta.stem + ".npz"),
+                                **velocidades(telemetria, args.circunferencia, args.ancho_eje))
+    resumen = resumir(list(analisis.values()))
+
+    for reto, datos in resumen.items():
+        print("%-8s %3d ejecuciones  duración p50 %s s  sobrepaso p95 %s cm / %s grados" % (
+            reto, datos["ejecuciones"], datos["duracion"].get("p50"), datos["sobrepaso_cm"].get("p95"),
+            datos["sobrepaso_grados"].get("p95")))
+        for bloque, tiempos in datos["bloques"].items():
+            linea = "    bloque %-3d p50 %7.2f s  p95 %7.2f s" % (bloque, tiempos["p50"], tiempos["p95"])
+            if bloque in datos["oscilacion"] and "reflexion_desviacion" in datos["oscilacion"][bloque]:
+                medidas = datos["oscilacion"][bloque]
+                linea += "  reflexión ±%.1f, %.1f cruces/s" % (medidas["reflexion_desviacion"]["p50"],
+                                                              medidas["reflexion_cruces_por_s"]["p50"])
+            print(linea)
+
+    args.salida.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.salida, "w", encoding="utf-8") as archivo:
+        json.dump({"archivos": analisis, "retos": resumen}, archivo, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
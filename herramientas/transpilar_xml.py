@@ -0,0 +1,443 @@
+"""Traduce los programas de Open Roberta (.xml) a RetoN_Spike.py con las funciones de comun/.
+
+Uso:
+    python -m herramientas.transpilar_xml RetoN/Programa.xml [...] [--destino DIR]
+                                          [--giros-exactos] [--forzar]
+
+Sin argumentos traduce los .xml de todas las carpetas RetoN. Cada programa
+se escribe en build/transpilado/RetoN_Spike.py (no pisa los retos ajustados a
+mano) con rectas de movimiento, giros con giroscopio y esperas de eventos:
+
+    motorDiff_on_for         -> avanzar_cm / retroceder_cm(cm, velocidad=...)
+    motorDiff_turn_for       -> girar_derecha_fase / girar_izquierda_fase(grados)
+    motorDiff_on, _curve     -> avanzar_indefinidamente, motor_pair.move_tank
+    wait_for color/distancia -> esperar_color / esperar_distancia_menor
+    repeat, loopForever, if  -> for, while True, if/elif/else
+
+La potencia (%) se deja como velocidad_de_potencia(N) de comun/movimiento.py,
+que en el hub usa la tabla medida de cada robot: 100 es su velocidad real
+máxima y lo que pasa de 100 se recorta (en las curvas se escalan las dos
+ruedas para no perder el giro). Los giros a menos de AJUSTE_GIRO_GRADOS de un
+múltiplo de 45 se redondean a él (el 88 del XML era una corrección a mano que
+el giroscopio ya no necesita), salvo con --giros-exactos. Los bloques sin traducción quedan como comentario y se cuentan.
+
+La cabecera del programa generado guarda el sha256 del XML y de la versión
+del traductor: si no han cambiado, el programa no se vuelve a traducir.
+"""
+import argparse
+import hashlib
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from simulador.campo import color_spike
+from simulador.spike import color as colores
+
+RAIZ = Path(__file__).resolve().parent.parent
+DESTINO = RAIZ / "build" / "transpilado"
+# Cambiarla invalida la caché de todos los programas ya traducidos.
+VERSION = 3
+NS = "{http://de.fhg.iais.roberta.blockly}"
+# Los bloques de acciones llevan "robActions_" (EV3/NXT) o "actions_" (RCJ).
+PREFIJOS_ACCION = ("robActions_", "actions_")
+POTENCIA_MAXIMA = 100
+AJUSTE_GIRO_GRADOS = 3
+PERIODO_BUCLE_MS = 10
+SANGRIA = "    "
+OPERADORES = {"EQ": "==", "NEQ": "!=", "LT": "<", "LTE": "<=", "GT": ">", "GTE": ">="}
+NOMBRES_COLOR = {valor: nombre for nombre, valor in vars(colores).items() if nombre.isupper()}
+# El selector de EV3 ofrece #585858 para "negro"; por distancia saldría morado.
+COLORES_SELECTOR = {"#585858": colores.BLACK}
+ADELANTE = ("FOREWARD", "FORWARD")
+
+
+def _numero(valor: float) -> str:
+    return "%g" % valor
+
+
+def _bloques(elemento) -> list:
+    """Bloques activos de una secuencia (instancia o statement), en orden."""
+    return [b for b in elemento.findall(NS + "block") if b.get("disabled") != "true"]
+
+
+def _hijo(bloque, etiqueta: str, nombre: str):
+    """value/statement `nombre` del bloque; los if y wait_for los anidan en <repetitions>."""
+    for contenedor in (bloque, bloque.find(NS + "repetitions")):
+        if contenedor is None:
+            continue
+        for elemento in contenedor.findall(NS + etiqueta):
+            if elemento.get("name") == nombre:
+                return elemento
+    return None
+
+
+def _campo(bloque, nombre: str, defecto: str = "") -> str:
+    for campo in bloque.findall(NS + "field"):
+        if campo.get("name") == nombre:
+            return campo.text or ""
+    return defecto
+
+
+def _tipo(bloque) -> str:
+    tipo = bloque.get("type", "")
+    for prefijo in PREFIJOS_ACCION:
+        if tipo.startswith(prefijo):
+            return tipo[len(prefijo):]
+    return tipo
+
+
+def _motores_traccion(raiz) -> dict:
+    """Puerto del XML -> "derecha"/"izquierda" según la configuración del robot."""
+    motores = {}
+    configuracion = raiz.find(NS + "config")
+    if configuracion is None:
+        return motores
+    for bloque in configuracion.iter(NS + "block"):
+        if bloque.get("type") == "robConf_differentialdrive":
+            motores[_campo(bloque, "MOTOR_L")] = "izquierda"
+            motores[_campo(bloque, "MOTOR_R")] = "derecha"
+    # EV3/NXT: <value name="MB"><block type="robBrick_motor_big"> con MOTOR_DRIVE.
+    for valor in configuracion.iter(NS + "value"):
+        bloque = valor.find(NS + "block")
+        if bloque is not None and _campo(bloque, "MOTOR_DRIVE") in ("RIGHT", "LEFT"):
+            motores[valor.get("name")[-1]] = "derecha" if _campo(bloque, "MOTOR_DRIVE") == "RIGHT" else "izquierda"
+    return motores
+
+
+def programa_principal(raiz):
+    """Instancia que empieza por robControls_start; las demás son bloques sueltos."""
+    programa = raiz.find(NS + "program")
+    contenedor = programa if programa is not None else raiz
+    for instancia in contenedor.iter(NS + "instance"):
+        bloques = _bloques(instancia)
+        if bloques and bloques[0].get("type") == "robControls_start":
+            return bloques[1:]
+    raise ValueError("El XML no tiene bloque de inicio (robControls_start)")
+
+
+class Traductor:
+    """Genera el código de main() bloque a bloque y anota lo que hay que importar."""
+
+    def __init__(self, motores: dict, ajustar_giros: bool = True) -> None:
+        self.motores = motores
+        self.ajustar_giros = ajustar_giros
+        self.lineas = []
+        self.modulos = {"runloop", "motor_pair"}
+        self.movimiento = {"motor_izquierda", "motor_derecha", "detener", "modo_absoluto"}
+        self.eventos = set()
+        self.sin_traducir = []
+
+    # --- Expresiones ---
+    def _valor(self, bloque, nombre: str) -> str:
+        valor = _hijo(bloque, "value", nombre)
+        interior = valor.find(NS + "block") if valor is not None else None
+        if interior is None:
+            raise ValueError("Falta la entrada %s en %s" % (nombre, bloque.get("type")))
+        return self.expresion(interior)
+
+    def _constante(self, bloque, nombre: str):
+        """Valor numérico de una entrada, o None si no es un número fijo."""
+        valor = _hijo(bloque, "value", nombre)
+        interior = valor.find(NS + "block") if valor is not None else None
+        if interior is None or interior.get("type") != "math_number":
+            return None
+        return float(_campo(interior, "NUM", "0"))
+
+    def _sensor(self, bloque) -> str:
+        """Tipo de lectura de un bloque de sensor: "color", "distancia", "encoder" o ""."""
+        tipo = bloque.get("type")
+        modo = _campo(bloque, "SENSORTYPE") or _campo(bloque, "MODE")
+        if tipo == "robSensors_colour_getSample" or modo == "COLOUR_COLOUR":
+            return "color"
+        if tipo == "robSensors_ultrasonic_getSample" or modo == "ULTRASONIC_DISTANCE":
+            return "distancia"
+        if tipo == "robSensors_encoder_getSample" or modo.startswith("ENCODER"):
+            return "encoder"
+        return ""
+
+    def _encoder(self, puerto: str) -> str:
+        """Grados de la rueda del puerto, positivos hacia delante."""
+        self.modulos.add("motor")
+        lado = self.motores.get(puerto)
+        if lado == "izquierda":
+            # El motor izquierdo está montado en espejo: adelante es negativo.
+            return "-motor.relative_position(motor_izquierda)"
+        if lado is None:
+            self.sin_traducir.append("encoder del puerto %s" % puerto)
+        return "motor.relative_position(motor_derecha)"
+
+    def expresion(self, bloque) -> str:
+        tipo = bloque.get("type")
+        if tipo == "math_number":
+            return _numero(float(_campo(bloque, "NUM", "0")))
+        if tipo == "logic_boolean":
+            return "True" if _campo(bloque, "BOOL") == "TRUE" else "False"
+        if tipo == "logic_negate":
+            return "not (%s)" % self._valor(bloque, "BOOL")
+        if tipo == "logic_operation":
+            operador = " and " if _campo(bloque, "OP") == "AND" else " or "
+            return "(%s%s%s)" % (self._valor(bloque, "A"), operador, self._valor(bloque, "B"))
+        if tipo == "logic_compare":
+            return "%s %s %s" % (self._valor(bloque, "A"), OPERADORES[_campo(bloque, "OP")], self._valor(bloque, "B"))
+        if tipo == "robColour_picker":
+            self.modulos.add("color")
+            hexadecimal = _campo(bloque, "COLOUR").lower()
+            return "color." + NOMBRES_COLOR[COLORES_SELECTOR.get(hexadecimal, color_spike(hexadecimal))]
+        sensor = self._sensor(bloque)
+        if sensor == "color":
+            self.modulos.update(("color_sensor", "color"))
+            self.movimiento.add("puerto_sensor_color")
+            return "color_sensor.color(puerto_sensor_color)"
+        if sensor == "distancia":
+            # Open Roberta mide en cm; distance_sensor en mm. Sin eco devuelve None, que
+            # no se puede comparar: distancia_mm() lo cambia por SIN_ECO_MM (muy lejos).
+            self.movimiento.add("distancia_mm")
+            return "distancia_mm() / 10"
+        if sensor == "encoder":
+            grados = self._encoder(_campo(bloque, "SENSORPORT"))
+            if _campo(bloque, "MODE") == "ROTATION":
+                return "(%s) / 360" % grados
+            if _campo(bloque, "MODE") == "DISTANCE":
+                self.movimiento.add("CIRCUNFERENCIA_RUEDA")
+                return "(%s) * CIRCUNFERENCIA_RUEDA / 360" % grados
+            return grados
+        self.sin_traducir.append(tipo)
+        return "None  # sin traducir: %s" % tipo
+
+    # --- Instrucciones ---
+    def _emitir(self, nivel: int, texto: str) -> None:
+        self.lineas.append(SANGRIA * nivel + texto)
+
+    def secuencia(self, bloques, nivel: int) -> None:
+        inicio = len(self.lineas)
+        for bloque in bloques:
+            self.instruccion(bloque, nivel)
+        if len(self.lineas) == inicio:
+            self._emitir(nivel, "pass")
+
+    def _cuerpo(self, bloque, nombre: str, nivel: int) -> None:
+        statement = _hijo(bloque, "statement", nombre)
+        self.secuencia(_bloques(statement) if statement is not None else [], nivel)
+
+    def _giro(self, bloque, nivel: int) -> None:
+        grados = self._constante(bloque, "DEGREE")
+        if grados is None:
+            grados = self._constante(bloque, "DEGREES")
+        derecha = _campo(bloque, "DIRECTION") == "RIGHT"
+        if grados is None:
+            texto = self._valor(bloque, "DEGREE")
+        else:
+            if grados < 0:
+                grados, derecha = -grados, not derecha
+            cercano = round(grados / 45) * 45
+            if self.ajustar_giros and cercano and cercano != grados and abs(cercano - grados) <= AJUSTE_GIRO_GRADOS:
+                self._emitir(nivel, "# %s en el XML (corrección a mano); con el giroscopio basta con %s"
+                             % (_numero(grados), cercano))
+                grados = cercano
+            texto = _numero(grados)
+        funcion = "girar_derecha_fase" if derecha else "girar_izquierda_fase"
+        self.movimiento.add(funcion)
+        self._emitir(nivel, "await %s(%s)" % (funcion, texto))
+
+    def _recta(self, bloque, nivel: int) -> None:
+        adelante = _campo(bloque, "DIRECTION") in ADELANTE
+        distancia = self._constante(bloque, "DISTANCE")
+        if distancia is not None and distancia < 0:
+            distancia, adelante = -distancia, not adelante
+        texto = _numero(distancia) if distancia is not None else self._valor(bloque, "DISTANCE")
+        funcion = "avanzar_cm" if adelante else "retroceder_cm"
+        self.movimiento.add(funcion)
+        self._emitir(nivel, "await %s(%s, velocidad=%s)" % (funcion, texto, self._velocidad(bloque, "POWER")))
+
+    def _velocidad(self, bloque, nombre: str, escala: float = 1.0) -> str:
+        self.movimiento.add("velocidad_de_potencia")
+        potencia = self._constante(bloque, nombre)
+        if potencia is None:
+            return "velocidad_de_potencia(%s)" % self._valor(bloque, nombre)
+        return "velocidad_de_potencia(%s)" % _numero(round(potencia * escala, 1))
+
+    def _tanque(self, bloque) -> tuple:
+        """Velocidades de cada rueda; si alguna pasa del 100 % se escalan las dos y se conserva la curva."""
+        potencias = [self._constante(bloque, nombre) for nombre in ("POWER_LEFT", "POWER_RIGHT")]
+        escala = 1.0
+        if None not in potencias:
+            mayor = max(abs(potencia) for potencia in potencias)
+            escala = POTENCIA_MAXIMA / mayor if mayor > POTENCIA_MAXIMA else 1.0
+        return self._velocidad(bloque, "POWER_LEFT", escala), self._velocidad(bloque, "POWER_RIGHT", escala)
+
+    def _espera(self, bloque, nivel: int) -> None:
+        condicion = _hijo(bloque, "value", "WAIT0")
+        comparacion = condicion.find(NS + "block") if condicion is not None else None
+        if comparacion is not None and comparacion.get("type") == "logic_compare":
+            valor_a = _hijo(comparacion, "value", "A")
+            sensor = self._sensor(valor_a.find(NS + "block")) if valor_a is not None else ""
+            operador = _campo(comparacion, "OP")
+            if sensor == "color" and operador == "EQ":
+                self.eventos.add("esperar_color")
+                self._emitir(nivel, "await esperar_color(%s)" % self._valor(comparacion, "B"))
+                return
+            if sensor == "distancia" and operador in ("LT", "LTE"):
+                self.eventos.add("esperar_distancia_menor")
+                self._emitir(nivel, "await esperar_distancia_menor(%s)" % self._valor(comparacion, "B"))
+                return
+        self._emitir(nivel, "while not (%s):" % self._valor(bloque, "WAIT0"))
+        self._emitir(nivel + 1, "await runloop.sleep_ms(%d)" % PERIODO_BUCLE_MS)
+
+    def _si(self, bloque, nivel: int) -> None:
+        mutacion = bloque.find(NS + "mutation")
+        ramas = 1 + int(mutacion.get("elseif", 0)) if mutacion is not None else 1
+        for rama in range(ramas):
+            palabra = "if" if rama == 0 else "elif"
+            self._emitir(nivel, "%s %s:" % (palabra, self._valor(bloque, "IF%d" % rama)))
+            self._cuerpo(bloque, "DO%d" % rama, nivel + 1)
+        if _hijo(bloque, "statement", "ELSE") is not None or (mutacion is not None and mutacion.get("else") == "1"):
+            self._emitir(nivel, "else:")
+            self._cuerpo(bloque, "ELSE", nivel + 1)
+
+    def instruccion(self, bloque, nivel: int) -> None:
+        tipo = _tipo(bloque)
+        direccion = _campo(bloque, "DIRECTION")
+        if tipo == "motorDiff_on_for":
+            self._recta(bloque, nivel)
+        elif tipo == "motorDiff_turn_for":
+            self._giro(bloque, nivel)
+        elif tipo == "motorDiff_on":
+            funcion = "avanzar_indefinidamente" if direccion in ADELANTE else "retroceder_indefinidamente"
+            self.movimiento.add(funcion)
+            self._emitir(nivel, "%s(%s)" % (funcion, self._velocidad(bloque, "POWER")))
+        elif tipo == "motorDiff_curve":
+            izquierda, derecha = self._tanque(bloque)
+            if direccion not in ADELANTE:
+                izquierda, derecha = "-" + izquierda, "-" + derecha
+            self.movimiento.add("soltar_objetivo")
+            self._emitir(nivel, "soltar_objetivo()")
+            self._emitir(nivel, "motor_pair.move_tank(motor_pair.PAIR_1, %s, %s)" % (izquierda, derecha))
+        elif tipo == "motorDiff_stop":
+            self._emitir(nivel, "await detener()")
+        elif tipo == "robControls_wait_time":
+            self.movimiento.add("pausa")
+            milisegundos = self._constante(bloque, "WAIT")
+            segundos = _numero(milisegundos / 1000) if milisegundos is not None else "%s / 1000" % self._valor(bloque, "WAIT")
+            self._emitir(nivel, "await pausa(%s)" % segundos)
+        elif tipo == "robControls_wait_for":
+            self._espera(bloque, nivel)
+        elif tipo == "controls_repeat_ext":
+            veces = self._constante(bloque, "TIMES")
+            self._emitir(nivel, "for _ in range(%s):" % (
+                int(veces) if veces is not None else "int(%s)" % self._valor(bloque, "TIMES")))
+            self._cuerpo(bloque, "DO", nivel + 1)
+        elif tipo == "robControls_loopForever":
+            self._emitir(nivel, "while True:")
+            self._cuerpo(bloque, "DO", nivel + 1)
+            # Sin esto un bucle que solo lee sensores no deja correr al resto de tareas.
+            self._emitir(nivel + 1, "await runloop.sleep_ms(%d)" % PERIODO_BUCLE_MS)
+        elif tipo in ("robControls_if", "robControls_ifElse", "controls_if"):
+            self._si(bloque, nivel)
+        elif tipo == "controls_flow_statements":
+            self._emitir(nivel, "break" if _campo(bloque, "FLOW") == "BREAK" else "continue")
+        elif tipo == "robSensors_encoder_reset":
+            lado = self.motores.get(_campo(bloque, "SENSORPORT"), "derecha")
+            self.modulos.add("motor")
+            self._emitir(nivel, "motor.reset_relative_position(motor_%s, 0)" % lado)
+        else:
+            self.sin_traducir.append(bloque.get("type"))
+            self._emitir(nivel, "# Sin traducir: bloque %s" % bloque.get("type"))
+
+
+def _importaciones(traductor: Traductor) -> list:
+    orden = ("runloop", "motor_pair", "motor", "color", "color_sensor", "distance_sensor")
+    lineas = ["import %s" % modulo for modulo in orden if modulo in traductor.modulos]
+    lineas.append("from movimiento import (")
+    lineas += ["    %s," % nombre for nombre in sorted(traductor.movimiento, key=_orden_movimiento)]
+    lineas.append(")")
+    if traductor.eventos:
+        lineas.append("from eventos import %s, ejecutar_con_muestreador" % ", ".join(sorted(traductor.eventos)))
+    return lineas
+
+
+def _orden_movimiento(nombre: str) -> tuple:
+    # Puertos y constantes primero, como en los retos escritos a mano.
+    primeros = ("motor_izquierda", "motor_derecha", "puerto_sensor_color", "puerto_sensor_ultrasonico",
+                "CIRCUNFERENCIA_RUEDA")
+    return (0, primeros.index(nombre)) if nombre in primeros else (1, nombre)
+
+
+def huella(contenido: bytes, ajustar_giros: bool = True) -> str:
+    """sha256 del XML, la versión del traductor y las opciones: la clave de la caché."""
+    return hashlib.sha256(b"%d:%d:" % (VERSION, ajustar_giros) + contenido).hexdigest()
+
+
+def transpilar(contenido: bytes, nombre: str, ajustar_giros: bool = True) -> tuple:
+    """(código del RetoN_Spike.py, bloques sin traducir) para el XML `contenido`."""
+    raiz = ET.fromstring(contenido)
+    traductor = Traductor(_motores_traccion(raiz), ajustar_giros)
+    traductor.secuencia(programa_principal(raiz), 1)
+    cuerpo = traductor.lineas
+    lineas = [
+        "# Generado por herramientas/transpilar_xml.py desde %s: no editar a mano." % nombre,
+        "# sha256: %s" % huella(contenido, ajustar_giros),
+    ]
+    lineas += _importaciones(traductor)
+    lineas += [
+        "",
+        "# --- FUNCIÓN PRINCIPAL Y EJECUCIÓN ---",
+        "async def main():",
+        "    # Inicialización del par de motores",
+        "    motor_pair.pair(motor_pair.PAIR_1, motor_izquierda, motor_derecha)",
+        "    modo_absoluto()",
+        "",
+    ]
+    lineas += cuerpo
+    lineas += ["", "    await detener()", "", "# Ejecutar programa"]
+    lineas.append("ejecutar_con_muestreador(main())" if traductor.eventos else "runloop.run(main())")
+    return "\n".join(lineas) + "\n", traductor.sin_traducir
+
+
+def _en_cache(salida: Path, clave: str) -> bool:
+    if not salida.exists():
+        return False
+    with open(salida, encoding="utf-8") as archivo:
+        archivo.readline()
+        return archivo.readline().strip() == "# sha256: %s" % clave
+
+
+def transpilar_archivo(ruta: Path, destino: Path = DESTINO, ajustar_giros: bool = True,
+                       forzar: bool = False) -> tuple:
+    """Traduce `ruta` a destino/RetoN_Spike.py; devuelve (salida, traducido, sin traducir)."""
+    contenido = ruta.read_bytes()
+    salida = destino / (ruta.parent.name + "_Spike.py")
+    if not forzar and _en_cache(salida, huella(contenido, ajustar_giros)):
+        return salida, False, []
+    codigo, sin_traducir = transpilar(contenido, ruta.name, ajustar_giros)
+    destino.mkdir(parents=True, exist_ok=True)
+    salida.write_text(codigo, encoding="utf-8")
+    return salida, True, sin_traducir
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("xml", nargs="*", type=Path, help="por defecto los .xml de todas las carpetas RetoN")
+    parser.add_argument("--destino", type=Path, default=DESTINO)
+    parser.add_argument("--giros-exactos", action="store_true", help="no redondear 88 -> 90")
+    parser.add_argument("--forzar", action="store_true", help="traducir aunque el XML no haya cambiado")
+    args = parser.parse_args(argv)
+
+    rutas = args.xml or sorted(RAIZ.glob("Reto*/*.xml"))
+    errores = 0
+    for ruta in rutas:
+        try:
+            salida, traducido, sin_traducir = transpilar_archivo(ruta, args.destino, not args.giros_exactos,
+                                                                 args.forzar)
+        except (ET.ParseError, ValueError) as error:
+            print("%s: %s" % (ruta, error), file=sys.stderr)
+            errores += 1
+            continue
+        estado = "traducido" if traducido else "sin cambios"
+        print("%-28s -> %s (%s)" % (ruta.name, salida, estado))
+        if sin_traducir:
+            print("    %d bloques sin traducir: %s" % (len(sin_traducir), ", ".join(sorted(set(sin_traducir)))))
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
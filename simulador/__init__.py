@@ -0,0 +1,14 @@
+"""Hub SPIKE emulado para ejecutar los RetoN_Spike.py en el ordenador.
+
+Implementa los módulos del firmware (`hub`, `runloop`, `motor`, `motor_pair`,
+`color_sensor`, `color`, `distance_sensor`, los ticks de `time`) sobre un modelo 2D de tracción
+diferencial y un reloj virtual: las esperas y los movimientos terminan al
+instante en tiempo real.
+"""
+from .campo import Campo
+from .ejecutar import ejecutar_programa, hub_emulado, mundo_para_programa
+from .mundo import Mundo, TiempoAgotado
+from .robot import Geometria
+
+__all__ = ["Campo", "ejecutar_programa", "hub_emulado", "mundo_para_programa", "Mundo", "TiempoAgotado",
+           "Geometria"]
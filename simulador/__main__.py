@@ -0,0 +1,42 @@
+"""Uso: python -m simulador Reto1/Reto1_spike.py [Reto2/Reto2_Spike.py ...]"""
+import argparse
+import math
+import sys
+import time
+
+from . import Campo, Mundo, TiempoAgotado, ejecutar_programa, mundo_para_programa
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Ejecuta programas RetoN_Spike.py en el hub emulado.")
+    parser.add_argument("programas", nargs="+")
+    parser.add_argument("--tiempo-maximo", type=float, default=600.0, help="segundos virtuales por programa")
+    parser.add_argument("--campo", help="JSON de configuración (por defecto, el de la carpeta del reto)")
+    parser.add_argument("--sin-campo", action="store_true", help="no cargar ningún campo")
+    parser.add_argument("--telemetria", metavar="CARPETA", help="guardar ahí la telemetría de los programas")
+    args = parser.parse_args(argv)
+
+    codigo = 0
+    for programa in args.programas:
+        if args.sin_campo:
+            mundo = Mundo(tiempo_maximo=args.tiempo_maximo)
+        elif args.campo:
+            mundo = Mundo(campo=Campo.desde_json(args.campo), tiempo_maximo=args.tiempo_maximo)
+        else:
+            mundo = mundo_para_programa(programa, tiempo_maximo=args.tiempo_maximo)
+        inicio = time.perf_counter()
+        estado = "ok"
+        try:
+            ejecutar_programa(programa, mundo, flash=args.telemetria)
+        except TiempoAgotado:
+            estado = "tiempo agotado"
+            codigo = 1
+        real = time.perf_counter() - inicio
+        robot = mundo.robot
+        print("%-28s %-15s virtual %7.1f s  real %5.2f s  pose (%.1f, %.1f, %.0f°)" % (
+            programa, estado, mundo.tiempo, real, robot.x, robot.y, math.degrees(robot.theta)))
+    return codigo
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+"""Campo del simulador cargado desde los RetoN config JSON de Open Roberta.
+
+Los JSON guardan `robotPoses`, `colorAreas` y `obstacles` en coordenadas
+normalizadas (0..1) respecto al tapete; aquí se pasan a centímetros. Las
+áreas y obstáculos se indexan en una rejilla uniforme para que cada lectura
+del sensor de color consulte solo las pocas figuras de su celda.
+"""
+import json
+import math
+from pathlib import Path
+
+from .spike import color as colores
+
+# Tapete WRO estándar (2362 x 1143 mm).
+ANCHO_CAMPO_CM = 236.2
+ALTO_CAMPO_CM = 114.3
+# Lado de cada celda de la rejilla espacial.
+TAMANO_CELDA_CM = 2.0
+# Alcance del sensor ultrasónico de SPIKE.
+ALCANCE_MAXIMO_CM = 200.0
+
+# Colores de referencia del sensor de SPIKE para clasificar los colores hex.
+PALETA = {
+    colores.BLACK: (0, 0, 0),
+    colores.MAGENTA: (200, 0, 120),
+    colores.PURPLE: (110, 40, 150),
+    colores.BLUE: (0, 87, 166),
+    colores.AZURE: (0, 160, 230),
+    colores.TURQUOISE: (0, 170, 160),
+    colores.GREEN: (0, 100, 46),
+    colores.YELLOW: (247, 209, 23),
+    colores.ORANGE: (240, 130, 20),
+    colores.RED: (220, 20, 60),
+    colores.WHITE: (255, 255, 255),
+}
+# Reflexión (%) aproximada de cada color sobre el tapete.
+REFLEXION = {
+    colores.BLACK: 8, colores.MAGENTA: 45, colores.PURPLE: 30, colores.BLUE: 25, colores.AZURE: 50,
+    colores.TURQUOISE: 55, colores.GREEN: 20, colores.YELLOW: 80, colores.ORANGE: 60, colores.RED: 45,
+    colores.WHITE: 98, colores.UNKNOWN: 0,
+}
+# La reflexión promedia una mancha de luz de este radio: cerca del borde de una
+# línea la lectura cambia de forma gradual, como en el sensor real.
+RADIO_MANCHA_CM = 0.8
+_PUNTOS_MANCHA = [(0.0, 0.0)] + [(RADIO_MANCHA_CM * math.cos(a * math.pi / 4), RADIO_MANCHA_CM * math.sin(a * math.pi / 4))
+                                 for a in range(8)]
+
+
+def color_spike(hexadecimal: str) -> int:
+    """Convierte un color '#rgb' o '#rrggbb' al color SPIKE más cercano."""
+    digitos = hexadecimal.lstrip("#")
+    if len(digitos) == 3:
+        digitos = "".join(c * 2 for c in digitos)
+    if len(digitos) != 6:
+        raise ValueError("Color no válido: %r" % hexadecimal)
+    rgb = tuple(int(digitos[i:i + 2], 16) for i in (0, 2, 4))
+    return min(PALETA, key=lambda c: sum((a - b) ** 2 for a, b in zip(PALETA[c], rgb)))
+
+
+class Rectangulo:
+    """Rectángulo girado `theta` radianes alrededor de su centro (medidas en cm)."""
+
+    def __init__(self, x: float, y: float, ancho: float, alto: float, theta: float = 0.0, color: int = None) -> None:
+        self.ancho = ancho
+        self.alto = alto
+        self.theta = theta
+        self.color = color
+        # Open Roberta guarda la esquina superior izquierda sin girar.
+        self.cx = x + ancho / 2
+        self.cy = y + alto / 2
+        self._cos = math.cos(theta)
+        self._sin = math.sin(theta)
+
+    def contiene(self, x: float, y: float) -> bool:
+        dx, dy = x - self.cx, y - self.cy
+        local_x = dx * self._cos + dy * self._sin
+        local_y = -dx * self._sin + dy * self._cos
+        return abs(local_x) <= self.ancho / 2 and abs(local_y) <= self.alto / 2
+
+    def distancia_punto(self, x: float, y: float) -> float:
+        """Distancia desde (x, y) hasta el rectángulo (0 si está dentro)."""
+        dx, dy = x - self.cx, y - self.cy
+        local_x = dx * self._cos + dy * self._sin
+        local_y = -dx * self._sin + dy * self._cos
+        return math.hypot(max(abs(local_x) - self.ancho / 2, 0.0), max(abs(local_y) - self.alto / 2, 0.0))
+
+    def esquinas(self):
+        medio_x, medio_y = self.ancho / 2, self.alto / 2
+        return [(self.cx + px * self._cos - py * self._sin, self.cy + px * self._sin + py * self._cos)
+                for px, py in ((-medio_x, -medio_y), (medio_x, -medio_y), (medio_x, medio_y), (-medio_x, medio_y))]
+
+    def caja(self):
+        """Caja alineada con los ejes que contiene al rectángulo: (x0, y0, x1, y1)."""
+        xs, ys = zip(*self.esquinas())
+        return min(xs), min(ys), max(xs), max(ys)
+
+    def distancia_rayo(self, x: float, y: float, dx: float, dy: float):
+        """Distancia desde (x, y) en la dirección unitaria (dx, dy) hasta el borde, o None."""
+        mejor = None
+        esquinas = self.esquinas()
+        for (ax, ay), (bx, by) in zip(esquinas, esquinas[1:] + esquinas[:1]):
+            t = _corte_rayo_segmento(x, y, dx, dy, ax, ay, bx, by)
+            if t is not None and (mejor is None or t < mejor):
+                mejor = t
+        return mejor
+
+
+class Rejilla:
+    """Índice espacial uniforme: cada celda guarda las figuras que la tocan."""
+
+    def __init__(self, figuras, ancho: float, alto: float, celda: float = TAMANO_CELDA_CM) -> None:
+        self.celda = celda
+        self.columnas = max(1, math.ceil(ancho / celda))
+        self.filas = max(1, math.ceil(alto / celda))
+        self.celdas = {}
+        for figura in figuras:
+            x0, y0, x1, y1 = figura.caja()
+            for fila in range(self._fila(y0), self._fila(y1) + 1):
+                for columna in range(self._columna(x0), self._columna(x1) + 1):
+                    self.celdas.setdefault((columna, fila), []).append(figura)
+
+    def candidatas(self, x: float, y: float):
+        return self.celdas.get((int(x // self.celda), int(y // self.celda)), ())
+
+    def _columna(self, x: float) -> int:
+        return min(max(int(x // self.celda), 0), self.columnas - 1)
+
+    def _fila(self, y: float) -> int:
+        return min(max(int(y // self.celda), 0), self.filas - 1)
+
+
+class Campo:
+    """Tapete con áreas de color, obstáculos y poses iniciales."""
+
+    def __init__(self, areas=(), obstaculos=(), poses=(), ancho: float = ANCHO_CAMPO_CM,
+                 alto: float = ALTO_CAMPO_CM, color_fondo: int = colores.WHITE, paredes: bool = True) -> None:
+        self.ancho = ancho
+        self.alto = alto
+        self.areas = list(areas)
+        self.obstaculos = list(obstaculos)
+        self.poses = list(poses)
+        self.color_fondo = color_fondo
+        self.paredes = paredes
+        # Las áreas definidas después se dibujan encima: se recorren al revés.
+        self._rejilla_areas = Rejilla(reversed(self.areas), ancho, alto)
+        self._rejilla_obstaculos = Rejilla(self.obstaculos, ancho, alto)
+
+    @classmethod
+    def desde_json(cls, ruta, ancho: float = ANCHO_CAMPO_CM, alto: float = ALTO_CAMPO_CM, **opciones) -> "Campo":
+        with open(ruta, encoding="utf-8") as archivo:
+            datos = json.load(archivo)
+
+        def rectangulo(figura):
+            if figura.get("form", "RECTANGLE") != "RECTANGLE":
+                raise ValueError("Forma no soportada en %s: %s" % (ruta, figura.get("form")))
+            return Rectangulo(figura["x"] * ancho, figura["y"] * alto, figura["w"] * ancho, figura["h"] * alto,
+                              figura.get("theta", 0.0), color_spike(figura.get("color", "#000")))
+
+        poses = [(robot[0]["x"] * ancho, robot[0]["y"] * alto, robot[0]["theta"])
+                 for robot in datos.get("robotPoses", []) if robot]
+        return cls([rectangulo(a) for a in datos.get("colorAreas", [])],
+                   [rectangulo(o) for o in datos.get("obstacles", [])],
+                   poses, ancho, alto, **opciones)
+
+    def pose_inicial(self, robot: int = 0):
+        """(x, y, theta) de salida del robot, o el centro del campo si no hay."""
+        if robot < len(self.poses):
+            return self.poses[robot]
+        return self.ancho / 2, self.alto / 2, 0.0
+
+    def color_en(self, x: float, y: float) -> int:
+        for area in self._rejilla_areas.candidatas(x, y):
+            if area.contiene(x, y):
+                return area.color
+        return self.color_fondo
+
+    def distancia(self, x: float, y: float, theta: float, alcance: float = ALCANCE_MAXIMO_CM):
+        """Distancia en cm al primer obstáculo o pared en la dirección theta, o None."""
+        dx, dy = math.cos(theta), math.sin(theta)
+        mejor = self._distancia_paredes(x, y, dx, dy) if self.paredes else None
+        vistos = set()
+        for celda, entrada in self._celdas_rayo(x, y, dx, dy, min(alcance, mejor or alcance)):
+            if mejor is not None and entrada > mejor:
+                break
+            for obstaculo in self._rejilla_obstaculos.celdas.get(celda, ()):
+                if id(obstaculo) in vistos:
+                    continue
+                vistos.add(id(obstaculo))
+                t = obstaculo.distancia_rayo(x, y, dx, dy)
+                if t is not None and (mejor is None or t < mejor):
+                    mejor = t
+        return mejor if mejor is not None and mejor <= alcance else None
+
+    def _distancia_paredes(self, x: float, y: float, dx: float, dy: float):
+        tiempos = []
+        if dx > 0:
+            tiempos.append((self.ancho - x) / dx)
+        elif dx < 0:
+            tiempos.append(-x / dx)
+        if dy > 0:
+            tiempos.append((self.alto - y) / dy)
+        elif dy < 0:
+            tiempos.append(-y / dy)
+        positivos = [t for t in tiempos if t >= 0]
+        return min(positivos) if positivos else None
+
+    def _celdas_rayo(self, x: float, y: float, dx: float, dy: float, largo: float):
+        """(celda, distancia de entrada) que atraviesa el rayo, en orden (DDA de Amanatides-Woo)."""
+        if not self.obstaculos:
+            return
+        celda = self._rejilla_obstaculos.celda
+        columna, fila = int(x // celda), int(y // celda)
+        paso_x = 1 if dx > 0 else -1
+        paso_y = 1 if dy > 0 else -1
+        siguiente_x = ((columna + (paso_x > 0)) * celda - x) / dx if dx else math.inf
+        siguiente_y = ((fila + (paso_y > 0)) * celda - y) / dy if dy else math.inf
+        delta_x = celda / abs(dx) if dx else math.inf
+        delta_y = celda / abs(dy) if dy else math.inf
+        recorrido = 0.0
+        while recorrido <= largo:
+            yield (columna, fila), recorrido
+            if siguiente_x < siguiente_y:
+                recorrido = siguiente_x
+                siguiente_x += delta_x
+                columna += paso_x
+            else:
+                recorrido = siguiente_y
+                siguiente_y += delta_y
+                fila += paso_y
+
+
+def buscar_config(programa) -> Path:
+    """Devuelve el JSON de configuración junto a un RetoN_Spike.py, o None."""
+    carpeta = Path(programa).resolve().parent
+    candidatos = sorted(p for p in carpeta.glob("*.json") if "config" in p.name.lower())
+    return candidatos[0] if candidatos else None
+
+
+def _corte_rayo_segmento(x, y, dx, dy, ax, ay, bx, by):
+    ex, ey = bx - ax, by - ay
+    denominador = dx * ey - dy * ex
+    if abs(denominador) < 1e-12:
+        return None
+    t = ((ax - x) * ey - (ay - y) * ex) / denominador
+    u = ((ax - x) * dy - (ay - y) * dx) / denominador
+    if t >= 0 and 0 <= u <= 1:
+        return t
+    return None
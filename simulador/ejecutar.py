@@ -0,0 +1,95 @@
+"""Ejecución de programas RetoN_Spike.py sobre el hub emulado."""
+import importlib
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+from .campo import Campo, buscar_config
+from .mundo import Mundo, activar
+from .spike import (color, color_sensor, distance_sensor, hub, light_matrix, motion_sensor, motor,
+                    motor_pair, runloop, sound, time)
+
+RAIZ = Path(__file__).resolve().parent.parent
+COMUN = RAIZ / "comun"
+
+MODULOS = {
+    "hub": hub,
+    "hub.light_matrix": light_matrix,
+    "hub.motion_sensor": motion_sensor,
+    "hub.sound": sound,
+    "runloop": runloop,
+    "motor": motor,
+    "motor_pair": motor_pair,
+    "color_sensor": color_sensor,
+    "color": color,
+    "distance_sensor": distance_sensor,
+    "time": time,
+}
+
+
+@contextmanager
+def hub_emulado(mundo: Mundo, carpeta=None, flash=None):
+    """Activa `mundo` y expone los módulos emulados y la librería de comun/.
+
+    Con `carpeta` (la del reto) también se importan sus módulos, como los
+    ajustes_retoN.py que en el hub están en el flash junto al programa. La
+    telemetría (comun/telemetria.py) se guarda en la carpeta `flash`; sin ella
+    se registra igual, pero no se escribe.
+    """
+    carpetas = [COMUN] + ([Path(carpeta).resolve()] if carpeta is not None else [])
+    anteriores = {nombre: sys.modules.get(nombre) for nombre in MODULOS}
+    sys.modules.update(MODULOS)
+    for ruta in carpetas:
+        sys.path.insert(0, str(ruta))
+    # La librería se reimporta en cada ejecución para partir de un estado limpio.
+    _olvidar(carpetas)
+    activar(mundo)
+    try:
+        importlib.import_module("telemetria").CARPETA = None if flash is None else str(flash)
+        yield mundo
+    finally:
+        activar(None)
+        _olvidar(carpetas)
+        for ruta in carpetas:
+            sys.path.remove(str(ruta))
+        for nombre, modulo in anteriores.items():
+            if modulo is None:
+                sys.modules.pop(nombre, None)
+            else:
+                sys.modules[nombre] = modulo
+
+
+def mundo_para_programa(ruta, **opciones) -> Mundo:
+    """Crea un mundo con el campo del JSON de configuración del reto, si existe."""
+    config = buscar_config(ruta)
+    campo = Campo.desde_json(config) if config is not None else None
+    return Mundo(campo=campo, **opciones)
+
+
+def ejecutar_programa(ruta, mundo: Mundo = None, fuente: str = None, globales: dict = None,
+                      flash=None) -> Mundo:
+    """Ejecuta un RetoN_Spike.py completo y devuelve el mundo al terminar.
+
+    `fuente` sustituye al contenido del archivo (p. ej. una versión
+    instrumentada) y `globales` añade nombres al espacio del programa. Con
+    `flash`, la telemetría del programa se guarda en esa carpeta.
+    """
+    mundo = mundo or Mundo()
+    ruta = Path(ruta).resolve()
+    if fuente is None:
+        fuente = ruta.read_text(encoding="utf-8")
+    espacio = {"__name__": "__main__", "__file__": str(ruta)}
+    espacio.update(globales or {})
+    codigo = compile(fuente, str(ruta), "exec")
+    if flash is not None:
+        Path(flash).mkdir(parents=True, exist_ok=True)
+    with hub_emulado(mundo, ruta.parent, flash):
+        exec(codigo, espacio)
+    return mundo
+
+
+def _olvidar(carpetas) -> None:
+    for nombre, modulo in list(sys.modules.items()):
+        archivo = getattr(modulo, "__file__", None)
+        if archivo and Path(archivo).resolve().parent in carpetas:
+            del sys.modules[nombre]
@@ -0,0 +1,1024 @@
+"""Simulación por lotes con NumPy: N robots avanzan a la vez con paso fijo.
+
+Para ajustar parámetros hacen falta miles de ejecuciones de una misión, y el
+hub emulado (mundo.py) simula un solo robot por ejecución. Aquí:
+
+1. grabar_secuencia() ejecuta una vez el main() de un reto en el hub emulado y
+   anota las órdenes de alto nivel que da (rectas, giros, cola de movimientos,
+   esperas, seguidor...) con los valores por defecto ya resueltos. El tiempo
+   entre órdenes que no se graban (pausas, garra) queda como pausa.
+2. Lote guarda la pose, las velocidades y los encoders de N robots en arrays.
+   Los sensores de color, reflexión y distancia se evalúan contra el campo
+   para todos a la vez.
+3. replicar() ejecuta la secuencia en el lote. Cada orden repite el lazo de
+   control de su función en el hub (p. ej. el giro con giroscopio), y cada
+   robot la termina cuando su propio encoder o sensor lo dice.
+
+Cada lazo hace las mismas llamadas a la API que comun/, en el mismo orden y
+con el mismo coste que en el hub emulado, y las ruedas recorren las fases de
+Motor (robot.py) con sus instantes exactos: una recta que arranca con las
+ruedas aún frenando tras un giro sale igual que allí. La telemetría de fondo
+se modela como una tarea que ocupa la CPU lo que tarda cada muestra; las
+demás tareas en paralelo no se replican, y las esperas de eventos.py son un
+lazo en el propio main(). repetir_orden() repite una orden sola desde el
+estado que tenía el hub al empezarla (herramientas/comprobar_lote.py).
+
+Un robot que termina una orden antes que el resto se congela hasta que acaban
+todos, así que su tiempo y su pose son los mismos que si se ejecutara solo. Las
+medidas reales de cada robot (circunferencia, ancho de eje, giroscopio) pueden
+variar, mientras que el control usa las nominales de movimiento.py, como en
+el hub.
+
+Requiere NumPy (pip install numpy), que solo hace falta en el PC.
+
+Uso: python -m simulador.lote Reto2/Reto2_Spike.py --robots 1000
+"""
+import argparse
+import inspect
+import math
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from .campo import _PUNTOS_MANCHA, ALCANCE_MAXIMO_CM, REFLEXION
+from .ejecutar import hub_emulado, mundo_para_programa
+from .mundo import COSTO_LLAMADA, SIN_ECO, TiempoAgotado
+from .robot import ACELERACION_DEFECTO, DECELERACION_FRENO, EPSILON, Geometria
+from .spike.motor_pair import velocidades_direccion
+
+# Paso máximo de integración de la pose (el de PASO_FINO en mundo.py).
+PASO = 0.005
+# Una espera sin timeout que no se cumple en este tiempo cuenta como fallo.
+ESPERA_MAXIMA = 30.0
+# Huecos más cortos entre órdenes grabadas son llamadas a la API, no esperas.
+PAUSA_MINIMA = 0.002
+# Lectura que usa comun/ cuando el ultrasonido no tiene eco (SIN_ECO_MM de movimiento.py).
+SIN_ECO_MM = 2000
+# Fases del perfil de una rueda (las de Motor._fase en robot.py).
+_CRUCERO, _RAMPA, _INVERTIR, _LLEGADA, _FRENAR, _ACELERAR, _REDUCIR = range(7)
+# Constantes de comun/ que usan los lazos de control, leídas al grabar.
+CONSTANTES = {
+    "movimiento": ("CIRCUNFERENCIA_RUEDA", "ANCHO_EJE", "INERCIA_GIRO", "TOLERANCIA_GIRO", "FRENADO_GIRO",
+                   "VELOCIDAD_GIRO_MINIMA", "ACELERACION_GIRO", "ACELERACION_DEFECTO", "VELOCIDAD_MAXIMA",
+                   "MUESTRAS_FILTRO"),
+    "trayecto": ("ACELERACION_COLA", "VELOCIDAD_MINIMA_COLA", "PERIODO_MS", "KP_SINCRONIA", "RECTA", "GIRO", "ARCO"),
+    "seguidor": ("ACELERACION_SEGUIDOR", "LIMITE_INTEGRAL"),
+}
+
+
+# --- Secuencia de órdenes ---
+@dataclass
+class Orden:
+    """Orden de alto nivel del main(): `tipo` y sus valores con los defectos resueltos."""
+
+    tipo: str
+    valores: dict
+    inicio: float = 0.0
+    fin: float = 0.0
+    # Pose (x, y, theta) del robot emulado al terminar la orden, para comparar.
+    pose: tuple = ()
+    # Estado del hub emulado al empezar la orden, para repetirla sola (comprobar()).
+    hub: dict = None
+
+
+@dataclass
+class Secuencia:
+    ordenes: list
+    constantes: dict
+    # Tiempo del reto en el hub emulado y si terminó (Reto4-7 agotan el tiempo).
+    tiempo: float = 0.0
+    completa: bool = True
+    pose_final: tuple = ()
+    ruta: Path = None
+    # Parámetros que el reto consultó con ajuste() y su valor por defecto.
+    ajustes: dict = field(default_factory=dict)
+    # Telemetría de fondo: (primera muestra, periodo, duración de una muestra) en segundos, o None.
+    fondo: tuple = None
+
+
+class _Grabadora:
+    """Sustituye funciones de comun/ por envolturas que anotan la orden y llaman a la original."""
+
+    def __init__(self, mundo) -> None:
+        self.mundo = mundo
+        self.ordenes = []
+        # Solo se graban las llamadas del main(): recorrer() llama a su vez a los giros.
+        self.profundidad = 0
+        self.fondo = None
+        self.siguiente_muestra = None
+        self.objetivo_encoder = None
+
+    def terminar(self, orden: Orden) -> None:
+        robot = self.mundo.robot
+        orden.fin = self.mundo.tiempo
+        orden.pose = (robot.x, robot.y, robot.theta)
+
+    def envolver(self, modulo, nombre: str, traducir) -> None:
+        original = getattr(modulo, nombre)
+        firma = inspect.signature(original)
+        grabadora = self
+
+        def anotar(args, kwargs):
+            if grabadora.profundidad:
+                return None
+            argumentos = firma.bind(*args, **kwargs)
+            argumentos.apply_defaults()
+            tipo, valores = traducir(**argumentos.arguments)
+            orden = Orden(tipo, valores, grabadora.mundo.tiempo, hub=grabadora.foto())
+            grabadora.terminar(orden)
+            grabadora.ordenes.append(orden)
+            return orden
+
+        if inspect.iscoroutinefunction(original):
+            async def envoltura(*args, **kwargs):
+                orden = anotar(args, kwargs)
+                grabadora.profundidad += 1
+                try:
+                    return await original(*args, **kwargs)
+                finally:
+                    grabadora.profundidad -= 1
+                    if orden is not None:
+                        grabadora.terminar(orden)
+        else:
+            def envoltura(*args, **kwargs):
+                anotar(args, kwargs)
+                grabadora.profundidad += 1
+                try:
+                    return original(*args, **kwargs)
+                finally:
+                    grabadora.profundidad -= 1
+        setattr(modulo, nombre, envoltura)
+
+    def foto(self) -> dict:
+        """Ruedas (en grados hacia adelante), pose, yaw, objetivo absoluto y telemetría del hub ahora."""
+        mundo = self.mundo
+        if mundo.ruedas is None:
+            return None
+        # El motor izquierdo está montado en espejo: adelante es negativo.
+        ruedas = [(signo, mundo.motor(puerto)) for signo, puerto in zip((-1, 1), mundo.ruedas)]
+        objetivo = self.objetivo_encoder
+        return {
+            "tiempo": mundo.tiempo, "pose": (mundo.robot.x, mundo.robot.y, mundo.robot.theta),
+            "yaw_origen": mundo.yaw_origen,
+            "encoders": [signo * motor.posicion for signo, motor in ruedas],
+            "origen": [signo * motor.origen_relativo for signo, motor in ruedas],
+            "velocidad": [signo * motor.velocidad for signo, motor in ruedas],
+            "objetivo": [signo * motor.objetivo for signo, motor in ruedas],
+            "aceleracion": [motor.aceleracion for _, motor in ruedas],
+            "deceleracion": [motor.deceleracion for _, motor in ruedas],
+            "destino": [np.nan if motor.destino is None else signo * motor.destino for signo, motor in ruedas],
+            "base": np.nan if objetivo is None or objetivo.base is None else objetivo.base,
+            "grados": 0.0 if objetivo is None else objetivo.grados,
+            "siguiente_muestra": self.siguiente_muestra,
+        }
+
+    def medir_fondo(self, registrador) -> None:
+        """Anota cuándo toma la telemetría su primera muestra, cada cuánto y cuánto tarda."""
+        muestrear = registrador.muestrear
+        grabadora = self
+
+        def envoltura():
+            inicio = grabadora.mundo.tiempo
+            muestrear()
+            if grabadora.fondo is None:
+                grabadora.fondo = (inicio, registrador.periodo_ms / 1000, grabadora.mundo.tiempo - inicio)
+            grabadora.siguiente_muestra = grabadora.mundo.tiempo + registrador.periodo_ms / 1000
+
+        registrador.muestrear = envoltura
+
+
+def _preparar_grabadora(grabadora: _Grabadora) -> dict:
+    """Importa la librería dentro del hub emulado, envuelve sus funciones y devuelve sus constantes."""
+    import movimiento
+    import trayecto
+    import eventos
+    import seguidor
+    import telemetria
+
+    def recta(cm, signo, velocidad, aceleracion, deceleracion):
+        perfil = movimiento.perfil_recta(cm)
+        return "recta", {
+            "grados": signo * cm * movimiento.GRADOS_POR_ROTACION / movimiento.CIRCUNFERENCIA_RUEDA,
+            "velocidad": velocidad or perfil[0], "aceleracion": aceleracion or perfil[1],
+            "deceleracion": deceleracion or perfil[2], "absoluto": movimiento.objetivo_encoder.activo}
+
+    def recta_grados(grados, velocidad):
+        return "recta", {"grados": grados, "velocidad": velocidad, "aceleracion": movimiento.ACELERACION_DEFECTO,
+                         "deceleracion": movimiento.ACELERACION_DEFECTO, "absoluto": movimiento.objetivo_encoder.activo}
+
+    def giro(signo):
+        return lambda grados, direccion, velocidad: ("giro", {"grados": signo * grados, "direccion": direccion,
+                                                              "velocidad": velocidad})
+
+    envolver = grabadora.envolver
+    envolver(movimiento, "avanzar_cm", lambda cm, velocidad, aceleracion, deceleracion:
+             recta(cm, 1, velocidad, aceleracion, deceleracion))
+    envolver(movimiento, "retroceder_cm", lambda cm, velocidad, aceleracion, deceleracion:
+             recta(cm, -1, velocidad, aceleracion, deceleracion))
+    envolver(movimiento, "avanzar_grados", lambda grados, velocidad: recta_grados(grados, velocidad))
+    envolver(movimiento, "retroceder_grados", lambda grados, velocidad: recta_grados(-grados, velocidad))
+    envolver(movimiento, "girar_derecha_fase", giro(1))
+    envolver(movimiento, "girar_izquierda_fase", giro(-1))
+    envolver(movimiento, "avanzar_indefinidamente", lambda velocidad: ("mover", {"velocidad": velocidad}))
+    envolver(movimiento, "retroceder_indefinidamente", lambda velocidad: ("mover", {"velocidad": -velocidad}))
+    envolver(movimiento, "detener", lambda: ("detener", {}))
+    envolver(movimiento, "avanzar_hasta_detectar_objeto",
+             lambda distancia_cm, velocidad, frenar_desde_cm, velocidad_minima, periodo_ms: ("acercarse", {
+                 "distancia_cm": distancia_cm, "velocidad": velocidad, "frenar_desde_cm": frenar_desde_cm,
+                 "velocidad_minima": velocidad_minima, "periodo_ms": periodo_ms}))
+    envolver(trayecto, "recorrer", lambda segmentos: ("trayecto", {"segmentos": tuple(segmentos)}))
+    envolver(eventos, "esperar_color", lambda objetivo, periodo_ms, timeout_ms: (
+        "esperar_color", {"objetivo": objetivo, "periodo_ms": periodo_ms, "timeout_ms": timeout_ms}))
+    envolver(eventos, "esperar_distancia_menor", lambda distancia_cm, periodo_ms, timeout_ms: (
+        "esperar_distancia", {"distancia_cm": distancia_cm, "periodo_ms": periodo_ms, "timeout_ms": timeout_ms}))
+    envolver(seguidor, "seguir_linea", lambda grados, velocidad, kp, ki, kd, borde, objetivo, periodo_ms: (
+        "seguir_linea", {"grados": grados, "velocidad": velocidad, "kp": kp, "ki": ki, "kd": kd, "borde": borde,
+                         "objetivo": objetivo, "periodo_ms": periodo_ms}))
+    grabadora.medir_fondo(telemetria.registrador)
+    grabadora.objetivo_encoder = movimiento.objetivo_encoder
+    modulos = {"movimiento": movimiento, "trayecto": trayecto, "seguidor": seguidor}
+    return {nombre: getattr(modulos[modulo], nombre) for modulo, nombres in CONSTANTES.items() for nombre in nombres}
+
+
+def _preparar_ajustes(tabla: dict, usados: dict) -> None:
+    """Anota los ajuste() que consulta el reto y, con `tabla`, la impone en lugar de su archivo."""
+    import ajustes
+
+    consultar = ajustes.ajuste
+
+    def ajuste(nombre, defecto):
+        usados.setdefault(nombre, defecto)
+        return consultar(nombre, defecto)
+
+    ajustes.ajuste = ajuste
+    if tabla is not None:
+        ajustes.cargar_ajustes = lambda reto: ajustes.usar_ajustes(tabla)
+
+
+def grabar_secuencia(ruta, mundo=None, ajustes: dict = None) -> Secuencia:
+    """Ejecuta el reto en el hub emulado y devuelve sus órdenes, con pausas en los huecos entre ellas.
+
+    Con `ajustes` el reto usa esa tabla en vez de su ajustes_retoN.py.
+    """
+    ruta = Path(ruta).resolve()
+    mundo = mundo or mundo_para_programa(ruta)
+    grabadora = _Grabadora(mundo)
+    espacio = {"__name__": "__main__", "__file__": str(ruta)}
+    codigo = compile(ruta.read_text(encoding="utf-8"), str(ruta), "exec")
+    completa = True
+    usados = {}
+    with hub_emulado(mundo, ruta.parent):
+        constantes = _preparar_grabadora(grabadora)
+        _preparar_ajustes(ajustes, usados)
+        try:
+            exec(codigo, espacio)
+        except TiempoAgotado:
+            completa = False
+    ordenes = []
+    anterior, pose = 0.0, ()
+    for orden in grabadora.ordenes:
+        if orden.inicio - anterior > EPSILON:
+            ordenes.append(Orden("pausa", {"segundos": orden.inicio - anterior}, anterior, orden.inicio, pose))
+        ordenes.append(orden)
+        anterior, pose = orden.fin, orden.pose
+    robot = mundo.robot
+    return Secuencia(ordenes, constantes, mundo.tiempo, completa, (robot.x, robot.y, robot.theta), ruta, usados,
+                     grabadora.fondo)
+
+
+# --- Campo en arrays ---
+def _rectangulos(figuras) -> np.ndarray:
+    """(cx, cy, medio ancho, medio alto, cos, sin) de cada rectángulo, una fila por figura."""
+    return np.array([(f.cx, f.cy, f.ancho / 2, f.alto / 2, f._cos, f._sin) for f in figuras], dtype=float).reshape(-1, 6)
+
+
+def _locales(rectangulos: np.ndarray, x: np.ndarray, y: np.ndarray):
+    """Coordenadas de cada punto en el sistema de cada rectángulo: arrays (N, figuras)."""
+    dx = x[:, None] - rectangulos[:, 0]
+    dy = y[:, None] - rectangulos[:, 1]
+    coseno, seno = rectangulos[:, 4], rectangulos[:, 5]
+    return dx * coseno + dy * seno, -dx * seno + dy * coseno
+
+
+class CampoLote:
+    """Áreas y obstáculos de un Campo en arrays para leer los sensores de N robots a la vez."""
+
+    def __init__(self, campo) -> None:
+        self.campo = campo
+        self.areas = _rectangulos(campo.areas)
+        self.colores = np.array([area.color for area in campo.areas], dtype=int)
+        self.obstaculos = _rectangulos(campo.obstaculos)
+        # Reflexión por color; el índice es color + 1 porque UNKNOWN es -1.
+        self.reflexiones = np.zeros(max(REFLEXION) + 2)
+        for valor, reflexion in REFLEXION.items():
+            self.reflexiones[valor + 1] = reflexion
+
+    def color(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        if not len(self.areas):
+            return np.full(len(x), self.campo.color_fondo)
+        local_x, local_y = _locales(self.areas, x, y)
+        dentro = (np.abs(local_x) <= self.areas[:, 2]) & (np.abs(local_y) <= self.areas[:, 3])
+        # Las áreas definidas después se dibujan encima: gana la última que contiene el punto.
+        ultima = len(self.areas) - 1 - np.argmax(dentro[:, ::-1], axis=1)
+        return np.where(dentro.any(axis=1), self.colores[ultima], self.campo.color_fondo)
+
+    def reflexion(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        total = sum(self.reflexiones[self.color(x + dx, y + dy) + 1] for dx, dy in _PUNTOS_MANCHA)
+        return np.round(total / len(_PUNTOS_MANCHA))
+
+    def distancia_mm(self, x: np.ndarray, y: np.ndarray, theta: np.ndarray, alcance: float = ALCANCE_MAXIMO_CM):
+        """Lectura del ultrasonido en mm para cada robot, o SIN_ECO."""
+        dx, dy = np.cos(theta), np.sin(theta)
+        mejor = np.full(len(x), np.inf)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if self.campo.paredes:
+                for hasta, origen, direccion in ((self.campo.ancho, x, dx), (self.campo.alto, y, dy)):
+                    t = np.where(direccion > 0, (hasta - origen) / direccion,
+                                 np.where(direccion < 0, -origen / direccion, np.inf))
+                    mejor = np.minimum(mejor, np.where(t >= 0, t, np.inf))
+            if len(self.obstaculos):
+                # Método de las franjas en el sistema de cada obstáculo.
+                origen_x, origen_y = _locales(self.obstaculos, x, y)
+                coseno, seno = self.obstaculos[:, 4], self.obstaculos[:, 5]
+                rayo_x = dx[:, None] * coseno + dy[:, None] * seno
+                rayo_y = -dx[:, None] * seno + dy[:, None] * coseno
+                entrada = np.zeros_like(origen_x)
+                salida = np.full_like(origen_x, np.inf)
+                for origen, rayo, medio in ((origen_x, rayo_x, self.obstaculos[:, 2]),
+                                            (origen_y, rayo_y, self.obstaculos[:, 3])):
+                    t1, t2 = (-medio - origen) / rayo, (medio - origen) / rayo
+                    paralelo = rayo == 0
+                    fuera = paralelo & (np.abs(origen) > medio)
+                    entrada = np.where(paralelo, entrada, np.maximum(entrada, np.minimum(t1, t2)))
+                    salida = np.where(fuera, -np.inf, np.where(paralelo, salida, np.minimum(salida, np.maximum(t1, t2))))
+                corte = np.where(entrada <= salida, entrada, np.inf)
+                mejor = np.minimum(mejor, corte.min(axis=1))
+        return np.where(mejor <= alcance, np.round(mejor * 10), SIN_ECO).astype(int)
+
+
+# --- Lote de robots ---
+def _por_robot(valor, defecto: float, n: int) -> np.ndarray:
+    return np.broadcast_to(np.asarray(defecto if valor is None else valor, dtype=float), (n,)).copy()
+
+
+class Lote:
+    """N robots de tracción diferencial en arrays; velocidades y encoders en grados, positivos adelante.
+
+    `pose`, `circunferencia`, `ancho_eje` y `factor_giroscopio` son los
+    valores reales de cada robot (números o arrays de N); por defecto, la pose
+    del campo y las medidas de `geometria`. Con `deslizamiento` cada rueda
+    avanza en cada paso una fracción |N(0, deslizamiento)| menos de lo que
+    cuenta su encoder, y `ruido_reflexion` (%) y `ruido_distancia` (mm) suman
+    ruido normal a las lecturas. `semilla` fija el generador de ese ruido.
+    """
+
+    def __init__(self, n: int, campo=None, geometria: Geometria = None, pose=None, circunferencia=None,
+                 ancho_eje=None, factor_giroscopio=None, paso: float = PASO, deslizamiento: float = 0.0,
+                 ruido_reflexion: float = 0.0, ruido_distancia: float = 0.0, semilla=None) -> None:
+        geometria = geometria or Geometria()
+        self.n = n
+        self.paso = paso
+        self.campo = CampoLote(campo) if campo is not None else None
+        inicial = pose or (campo.pose_inicial() if campo is not None else (0.0, 0.0, 0.0))
+        self.x = _por_robot(inicial[0], 0.0, n)
+        self.y = _por_robot(inicial[1], 0.0, n)
+        self.theta = _por_robot(inicial[2], 0.0, n)
+        self.theta_inicial = self.theta.copy()
+        self.circunferencia = _por_robot(circunferencia, geometria.circunferencia_rueda, n)
+        self.ancho_eje = _por_robot(ancho_eje, geometria.ancho_eje, n)
+        self.factor_giroscopio = _por_robot(factor_giroscopio, 1.0, n)
+        self.deslizamiento = deslizamiento
+        self.ruido_reflexion = ruido_reflexion
+        self.ruido_distancia = ruido_distancia
+        self.aleatorio = np.random.default_rng(semilla)
+        self.adelanto_color = geometria.adelanto_sensor_color
+        self.adelanto_distancia = geometria.adelanto_sensor_distancia
+        # Columnas: rueda izquierda, rueda derecha.
+        self.velocidad = np.zeros((n, 2))
+        self.objetivo = np.zeros((n, 2))
+        self.aceleracion = np.full((n, 2), float(ACELERACION_DEFECTO))
+        self.deceleracion = np.full((n, 2), float(ACELERACION_DEFECTO))
+        self.encoders = np.zeros((n, 2))
+        # Destino de cada rueda en grados de encoder (NaN: sin destino).
+        self.destino = np.full((n, 2), np.nan)
+        self.tiempo = np.zeros(n)
+        self.fallo = np.zeros(n, dtype=bool)
+        # Índice de la orden en que falló cada robot (-1: ninguna).
+        self.orden_fallo = np.full(n, -1)
+
+    # --- Motores ---
+    def ordenar(self, mascara: np.ndarray, izquierda, derecha, aceleracion, deceleracion=None, grados=None) -> None:
+        """Como motor_pair: aceleraciones proporcionales para que ambas ruedas lleguen a la vez.
+
+        Con `grados` cada rueda frena para pararse justo en su destino, como
+        move_for_degrees; sin ellos se anula el destino que hubiera.
+        """
+        deceleracion = aceleracion if deceleracion is None else deceleracion
+        velocidades = np.stack(np.broadcast_arrays(np.asarray(izquierda, dtype=float),
+                                                   np.asarray(derecha, dtype=float)), axis=-1)
+        velocidades = np.broadcast_to(velocidades, (self.n, 2))
+        rapida = np.abs(velocidades).max(axis=1, keepdims=True)
+        proporcion = np.abs(velocidades) / np.where(rapida > 0, rapida, 1)
+        # Una rueda con velocidad 0 frena con la rampa completa.
+        proporcion = np.where(proporcion > 0, proporcion, 1.0)
+        columna = lambda valor: np.broadcast_to(np.asarray(valor, dtype=float).reshape(-1, 1), (self.n, 1))
+        self.objetivo[mascara] = velocidades[mascara]
+        self.aceleracion[mascara] = (columna(aceleracion) * proporcion)[mascara]
+        self.deceleracion[mascara] = (columna(deceleracion) * proporcion)[mascara]
+        if grados is None:
+            self.destino[mascara] = np.nan
+        else:
+            # Una rueda con velocidad 0 solo frena, sin destino.
+            recorrido = np.sign(velocidades) * np.abs(columna(grados)) * proporcion
+            self.destino[mascara] = np.where(velocidades != 0, self.encoders + recorrido, np.nan)[mascara]
+
+    def parar(self, mascara: np.ndarray, deceleracion: float = DECELERACION_FRENO) -> None:
+        self.ordenar(mascara, 0.0, 0.0, deceleracion)
+
+    def en_destino(self) -> np.ndarray:
+        """True para los robots cuyas dos ruedas acabaron su orden (como EsperarMotores)."""
+        return (np.isnan(self.destino) & (self.velocidad == self.objetivo)).all(axis=1)
+
+    def _fases(self):
+        """Fase del perfil de cada rueda y su duración, como Motor._fase de robot.py."""
+        v, objetivo, a, d = self.velocidad, self.objetivo, self.aceleracion, self.deceleracion
+        acelera = (np.abs(objetivo) > np.abs(v)) & (v * objetivo >= 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fase = np.where(v == objetivo, _CRUCERO, _RAMPA)
+            duracion = np.where(v == objetivo, np.inf, np.abs(objetivo - v) / np.where(acelera, a, d))
+            con_destino = ~np.isnan(self.destino)
+            if not con_destino.any():
+                return fase, duracion
+            s = np.where(objetivo < 0, -1.0, 1.0)
+            restante = (self.destino - self.encoders) * s
+            u = v * s
+            crucero = np.abs(objetivo)
+            frenado = u * u / (2 * d)
+            discriminante = 4 * u * u * (a + d) ** 2 - 4 * a * (a + d) * (u * u - 2 * d * restante)
+            hasta_frenar = (-2 * u * (a + d) + np.sqrt(np.maximum(discriminante, 0.0))) / (2 * a * (a + d))
+            casos = [
+                (u < -EPSILON, _INVERTIR, -u / d),
+                ((restante <= frenado + EPSILON) & (u <= EPSILON), _LLEGADA, 0.0),
+                (restante <= frenado + EPSILON, _FRENAR, 2 * restante / u),
+                (u < crucero - EPSILON, _ACELERAR, np.maximum(np.minimum((crucero - u) / a, hasta_frenar), 0.0)),
+                (u > crucero + EPSILON, _REDUCIR, (u - crucero) / d),
+                (True, _CRUCERO, (restante - frenado) / np.maximum(u, EPSILON)),
+            ]
+            fase_destino = np.select([caso[0] for caso in casos], [caso[1] for caso in casos])
+            duracion_destino = np.select([caso[0] for caso in casos], [caso[2] for caso in casos])
+        return (np.where(con_destino, fase_destino, fase), np.where(con_destino, duracion_destino, duracion))
+
+    def _avanzar_fases(self, fase, tramo, completa, mueve) -> None:
+        """Avanza `tramo` segundos la fase de cada rueda de `mueve` (Motor._avanzar_fase)."""
+        v, objetivo = self.velocidad, self.objetivo
+        s = np.where(objetivo < 0, -1.0, 1.0)
+        acelera = (np.abs(objetivo) > np.abs(v)) & (v * objetivo >= 0)
+        tasa = np.where(acelera, self.aceleracion, self.deceleracion)
+        restante = (self.destino - self.encoders) * s
+        with np.errstate(divide="ignore", invalid="ignore"):
+            frenada = s * (v * s - (v * s) ** 2 / (2 * restante) * tramo)
+        acelerada = v + s * self.aceleracion * tramo
+        nueva = np.select(
+            [fase == _RAMPA, fase == _CRUCERO, fase == _FRENAR, fase == _INVERTIR, fase == _ACELERAR],
+            [np.where(completa, objetivo, v + np.copysign(tasa * tramo, objetivo - v)), v, frenada,
+             np.where(completa, 0.0, v + s * self.deceleracion * tramo),
+             np.where(np.abs(acelerada) > np.abs(objetivo), objetivo, acelerada)],
+            np.where(completa, objetivo, v - s * self.deceleracion * tramo))
+        llega = mueve & ((fase == _LLEGADA) | (fase == _FRENAR) & completa)
+        sigue = mueve & ~llega
+        self.encoders = np.where(sigue, self.encoders + (v + nueva) / 2 * tramo,
+                                 np.where(llega, self.destino, self.encoders))
+        self.velocidad = np.where(sigue, nueva, np.where(llega, 0.0, v))
+        self.objetivo[llega] = 0.0
+        self.destino[llega] = np.nan
+
+    def avanzar(self, mascara: np.ndarray, dt=None) -> np.ndarray:
+        """Avanza `dt` segundos (PASO por defecto; número o array de N) los robots de `mascara`.
+
+        El resto queda congelado. Cada rueda recorre sus fases (acelerar,
+        crucero, frenar...) con los instantes exactos en que cambian, como
+        Motor.paso(). Devuelve, para cada robot, cuántos segundos del paso
+        tardaron sus ruedas en acabar la orden (NaN si no la acabaron).
+        """
+        dt = np.broadcast_to(np.asarray(self.paso if dt is None else dt, dtype=float), (self.n,))
+        quedan = np.repeat(np.where(mascara, dt, 0.0)[:, None], 2, axis=1)
+        antes = self.encoders.copy()
+        terminada = np.isnan(self.destino) & (self.velocidad == self.objetivo)
+        acabo = np.where(terminada, 0.0, np.nan)
+        while True:
+            mueve = quedan > EPSILON
+            if not mueve.any():
+                break
+            fase, duracion = self._fases()
+            tramo = np.where(mueve, np.minimum(quedan, np.maximum(duracion, EPSILON)), 0.0)
+            self._avanzar_fases(fase, tramo, tramo >= duracion - EPSILON, mueve)
+            quedan -= tramo
+            terminada = np.isnan(self.destino) & (self.velocidad == self.objetivo)
+            acabo = np.where(terminada & np.isnan(acabo), dt[:, None] - quedan, acabo)
+        grados = self.encoders - antes
+        cm = grados * (self.circunferencia / 360)[:, None]
+        if self.deslizamiento:
+            cm *= 1 - np.abs(self.aleatorio.normal(0.0, self.deslizamiento, cm.shape))
+        avance = cm.mean(axis=1)
+        giro = (cm[:, 0] - cm[:, 1]) / self.ancho_eje
+        medio = self.theta + giro / 2
+        self.x += avance * np.cos(medio)
+        self.y += avance * np.sin(medio)
+        self.theta += giro
+        self.tiempo += np.where(mascara, dt, 0.0)
+        return np.where(mascara, acabo.max(axis=1), np.nan)
+
+    def transcurrir(self, mascara: np.ndarray, segundos) -> None:
+        """Avanza `segundos` (número o array de N) en pasos de PASO como mucho."""
+        fin = self.tiempo + segundos
+        pendientes = mascara & (fin - self.tiempo > EPSILON)
+        while pendientes.any():
+            self.avanzar(pendientes, np.minimum(self.paso, fin - self.tiempo))
+            pendientes &= fin - self.tiempo > EPSILON
+
+    def consumir(self, mascara: np.ndarray, llamadas: int = 1) -> None:
+        """Tiempo de `llamadas` llamadas a la API del hub: las ruedas siguen con la última orden."""
+        self.transcurrir(mascara, llamadas * COSTO_LLAMADA)
+
+    # --- Sensores ---
+    def rumbo(self) -> np.ndarray:
+        """Yaw del giroscopio en grados, entre -180 y 180 (izquierda positivo)."""
+        yaw = -np.degrees(self.theta - self.theta_inicial) * self.factor_giroscopio
+        return np.round(((yaw + 180) % 360 - 180) * 10) / 10
+
+    def posicion_media(self) -> np.ndarray:
+        return self.encoders.mean(axis=1)
+
+    def _punto(self, adelanto: float):
+        return self.x + adelanto * np.cos(self.theta), self.y + adelanto * np.sin(self.theta)
+
+    def color(self) -> np.ndarray:
+        if self.campo is None:
+            return np.full(self.n, 10)
+        return self.campo.color(*self._punto(self.adelanto_color))
+
+    def reflexion(self) -> np.ndarray:
+        if self.campo is None:
+            return np.full(self.n, 98.0)
+        reflexion = self.campo.reflexion(*self._punto(self.adelanto_color))
+        if self.ruido_reflexion:
+            reflexion = np.clip(np.round(reflexion + self.aleatorio.normal(0.0, self.ruido_reflexion, self.n)), 0, 100)
+        return reflexion
+
+    def distancia_mm(self) -> np.ndarray:
+        if self.campo is None:
+            return np.full(self.n, SIN_ECO)
+        distancia = self.campo.distancia_mm(*self._punto(self.adelanto_distancia), self.theta)
+        if self.ruido_distancia:
+            ruidosa = np.maximum(np.round(distancia + self.aleatorio.normal(0.0, self.ruido_distancia, self.n)), 0)
+            distancia = np.where(distancia == SIN_ECO, SIN_ECO, ruidosa).astype(int)
+        return distancia
+
+
+# --- Replicar órdenes ---
+@dataclass
+class _Estado:
+    """Lo que replicar() arrastra entre órdenes, como los módulos de comun/ en el hub."""
+
+    constantes: dict
+    # Objetivo acumulado del modo absoluto (NaN: suelto), en grados de encoder.
+    base: np.ndarray = None
+    grados: np.ndarray = None
+    # Encoder de cada rueda en el último reset_relative_position (cola de movimientos, seguidor).
+    origen: np.ndarray = None
+    # Telemetría de fondo: (periodo, duración de una muestra) en segundos, o None.
+    fondo: tuple = None
+    # Instante en que cada robot toma su siguiente muestra de telemetría.
+    fondo_listo: np.ndarray = None
+
+
+# Cada lectura o comando cuesta una llamada a la API, y las ruedas siguen con la
+# última orden mientras tanto (Mundo.consumir). Estas funciones repiten esas
+# llamadas en el mismo orden que comun/.
+def _encoder(lote: Lote, estado: _Estado, activos, rueda: int) -> np.ndarray:
+    """motor.relative_position de `rueda` (0 izquierda, 1 derecha) en grados hacia adelante."""
+    lote.consumir(activos)
+    return np.round(lote.encoders[:, rueda] - estado.origen[:, rueda])
+
+
+def _posicion_media(lote: Lote, estado: _Estado, activos) -> np.ndarray:
+    """movimiento.posicion_media: lee la rueda derecha y después la izquierda."""
+    derecha = _encoder(lote, estado, activos, 1)
+    return (derecha + _encoder(lote, estado, activos, 0)) / 2
+
+
+def _rumbo(lote: Lote, activos) -> np.ndarray:
+    lote.consumir(activos)
+    return lote.rumbo()
+
+
+def _diferencia_angular(a, b):
+    return (a - b + 180) % 360 - 180
+
+
+def _poner_a_cero(lote: Lote, estado: _Estado, activos, rueda: int) -> None:
+    """motor.reset_relative_position(rueda, 0)."""
+    lote.consumir(activos)
+    estado.origen[activos, rueda] = lote.encoders[activos, rueda]
+
+
+def _ceder(lote: Lote, estado: _Estado, activos, cedio: np.ndarray, despierta: np.ndarray) -> None:
+    """El main() cedió en `cedio` y despierta en `despierta`; la telemetría de fondo puede retrasarlo.
+
+    En el planificador la muestra que vence antes que el main() ocupa la CPU
+    hasta terminar, y en un empate va primero la tarea que cedió antes.
+    """
+    reanuda = despierta.copy()
+    if estado.fondo is not None:
+        periodo, costo = estado.fondo
+        listo = estado.fondo_listo
+        while True:
+            corre = activos & ((listo < reanuda - EPSILON) |
+                               ((listo <= reanuda + EPSILON) & (listo - periodo < cedio - EPSILON)))
+            if not corre.any():
+                break
+            final = np.maximum(listo, cedio) + costo
+            reanuda = np.where(corre, np.maximum(reanuda, final), reanuda)
+            listo[corre] = final[corre] + periodo
+    lote.transcurrir(activos, np.where(activos, reanuda - lote.tiempo, 0.0))
+
+
+def _dormir(lote: Lote, estado: _Estado, activos, segundos: float) -> None:
+    """runloop.sleep_ms: las ruedas siguen con su orden y la telemetría aprovecha para muestrear."""
+    cedio = lote.tiempo.copy()
+    _ceder(lote, estado, activos, cedio, cedio + segundos)
+
+
+def _esperar_motores(lote: Lote, estado: _Estado, activos) -> None:
+    """await move_for_degrees: el main() sigue cuando sus dos ruedas llegan al destino."""
+    cedio = lote.tiempo.copy()
+    pendientes = activos.copy()
+    while pendientes.any():
+        inicio = lote.tiempo.copy()
+        acabo = lote.avanzar(pendientes)
+        llegan = pendientes & ~np.isnan(acabo)
+        # Paradas, siguen paradas: solo se devuelve el reloj al instante de la llegada.
+        lote.tiempo[llegan] = inicio[llegan] + acabo[llegan]
+        pendientes &= ~llegan
+    _ceder(lote, estado, activos, cedio, lote.tiempo.copy())
+
+
+def _mientras(lote: Lote, estado: _Estado, activos: np.ndarray, control, periodo_ms: int, limite: float = None,
+              fallar: bool = True) -> None:
+    """Llama a `control(activos)` y duerme `periodo_ms` hasta que no quede ningún robot activo.
+
+    `control` devuelve la máscara de los que terminan. Los que pasan `limite`
+    segundos sin terminar se descartan y, con `fallar`, quedan marcados como fallo.
+    """
+    inicio = lote.tiempo.copy()
+    activos = activos.copy()
+    while activos.any():
+        activos &= ~control(activos)
+        if limite is not None:
+            vencidos = activos & (lote.tiempo - inicio >= limite - EPSILON)
+            if fallar:
+                lote.fallo |= vencidos
+            activos &= ~vencidos
+        if activos.any():
+            _dormir(lote, estado, activos, periodo_ms / 1000)
+
+
+def _recta(lote: Lote, estado: _Estado, activos, grados, velocidad, aceleracion, deceleracion, absoluto) -> None:
+    """avanzar_cm: move_for_degrees lleva cada rueda a su destino con un trapecio."""
+    if absoluto:
+        media = _posicion_media(lote, estado, activos)
+        suelto = np.isnan(estado.base)
+        estado.base = np.where(suelto, media, estado.base)
+        estado.grados = np.where(suelto, 0.0, estado.grados) + grados
+        relativos = np.round(estado.base + estado.grados - media)
+    else:
+        estado.base[:] = np.nan
+        relativos = np.full(lote.n, float(round(grados)))
+    activos = activos & (relativos != 0)
+    lote.consumir(activos)
+    lote.ordenar(activos, velocidad * np.sign(relativos), velocidad * np.sign(relativos), aceleracion, deceleracion,
+                 relativos)
+    _esperar_motores(lote, estado, activos)
+
+
+def _giro(lote: Lote, estado: _Estado, activos, grados, direccion, velocidad) -> None:
+    """girar_*_fase: lazo sobre el yaw, más lento al acercarse al objetivo."""
+    c = estado.constantes
+    estado.base[:] = np.nan
+    signo = 1 if grados > 0 else -1
+    grados = abs(grados)
+    anterior = _rumbo(lote, activos)
+    girado = np.zeros(lote.n)
+    izquierda_unidad, derecha_unidad = velocidades_direccion(signo * direccion, 1.0)
+
+    def control(activos):
+        nonlocal anterior
+        actual = _rumbo(lote, activos)
+        girado[:] += signo * _diferencia_angular(anterior, actual)
+        anterior = actual
+        restante = grados - girado
+        terminados = activos & (restante <= c["TOLERANCIA_GIRO"] + c["INERCIA_GIRO"])
+        lote.consumir(activos)
+        lote.parar(terminados)
+        fraccion = np.minimum(1.0, restante / c["FRENADO_GIRO"])
+        v = np.trunc(c["VELOCIDAD_GIRO_MINIMA"] + (velocidad - c["VELOCIDAD_GIRO_MINIMA"]) * fraccion)
+        lote.ordenar(activos & ~terminados, v * izquierda_unidad, v * derecha_unidad, c["ACELERACION_GIRO"])
+        return terminados
+
+    _mientras(lote, estado, activos, control, 5)
+
+
+def _recta_cola(lote: Lote, estado: _Estado, activos, objetivo, segmento, velocidad_inicial, velocidad_final) -> None:
+    """Recta de recorrer(): trapecio por software y corrección de sincronía entre ruedas."""
+    c = estado.constantes
+    velocidad, aceleracion, deceleracion = segmento[2], segmento[3], segmento[4]
+    inicio = _posicion_media(lote, estado, activos)
+    signo = np.where(objetivo > inicio, 1.0, -1.0)
+
+    def control(activos):
+        izquierda = _encoder(lote, estado, activos, 0)
+        derecha = _encoder(lote, estado, activos, 1)
+        media = (izquierda + derecha) / 2
+        restante = (objetivo - media) * signo
+        terminados = activos & (restante <= 0)
+        if not velocidad_final:
+            lote.consumir(terminados)
+            lote.parar(terminados)
+        subida = np.sqrt(velocidad_inicial ** 2 + 2 * aceleracion * np.maximum(0.0, (media - inicio) * signo))
+        bajada = np.sqrt(velocidad_final ** 2 + 2 * deceleracion * np.maximum(restante, 0.0))
+        v = np.maximum(c["VELOCIDAD_MINIMA_COLA"], np.minimum(np.minimum(velocidad, subida), bajada))
+        direccion = np.clip(np.trunc(-c["KP_SINCRONIA"] * (izquierda - derecha) * signo), -100, 100)
+        # move(direccion, velocity=int(signo * v)): la rueda lenta no se trunca.
+        rapida = np.trunc(signo * v)
+        lenta = rapida * (1 - np.abs(direccion) / 50)
+        siguen = activos & ~terminados
+        lote.consumir(siguen)
+        lote.ordenar(siguen, np.where(direccion >= 0, rapida, lenta), np.where(direccion >= 0, lenta, rapida),
+                     max(aceleracion, deceleracion))
+        return terminados
+
+    _mientras(lote, estado, activos, control, c["PERIODO_MS"])
+
+
+def _arco(lote: Lote, estado: _Estado, activos, grados, radio_cm, velocidad, velocidad_final) -> None:
+    c = estado.constantes
+    signo = 1 if grados > 0 else -1
+    medio_eje = c["ANCHO_EJE"] / 2
+    exterior = (radio_cm + medio_eje) / radio_cm
+    interior = (radio_cm - medio_eje) / radio_cm
+    velocidad = min(velocidad, c["VELOCIDAD_MAXIMA"] / exterior)
+    restante = np.full(lote.n, float(abs(grados)))
+    anterior = _rumbo(lote, activos)
+
+    def control(activos):
+        nonlocal anterior
+        actual = _rumbo(lote, activos)
+        restante[:] -= signo * _diferencia_angular(anterior, actual)
+        anterior = actual
+        terminados = activos & (restante <= c["TOLERANCIA_GIRO"] + c["INERCIA_GIRO"])
+        if not velocidad_final:
+            lote.consumir(terminados)
+            lote.parar(terminados)
+        restante_grados = np.round(np.radians(restante) * radio_cm * 360 / c["CIRCUNFERENCIA_RUEDA"])
+        limite = np.sqrt(velocidad_final ** 2 + 2 * c["ACELERACION_COLA"] * np.maximum(restante_grados, 0.0))
+        v = np.maximum(c["VELOCIDAD_MINIMA_COLA"], np.minimum(velocidad, limite))
+        rapida, lenta = np.trunc(v * exterior), np.trunc(v * interior)
+        izquierda, derecha = (rapida, lenta) if signo > 0 else (lenta, rapida)
+        siguen = activos & ~terminados
+        lote.consumir(siguen)
+        lote.ordenar(siguen, izquierda, derecha, c["ACELERACION_COLA"])
+        return terminados
+
+    _mientras(lote, estado, activos, control, c["PERIODO_MS"])
+
+
+def _trayecto(lote: Lote, estado: _Estado, activos, segmentos) -> None:
+    """recorrer(): mismo enlace de velocidades entre segmentos que trayecto.py."""
+    c = estado.constantes
+    estado.base[:] = np.nan
+
+    def sentido(segmento):
+        if segmento is None or segmento[0] == c["GIRO"]:
+            return 0
+        if segmento[0] == c["ARCO"]:
+            return 1
+        return 1 if segmento[1] > 0 else -1
+
+    def velocidad_final(segmento, siguiente):
+        return 0 if sentido(siguiente) != sentido(segmento) else min(segmento[2], siguiente[2])
+
+    objetivo = None
+    velocidad_inicial = 0
+    for indice, segmento in enumerate(segmentos):
+        siguiente = segmentos[indice + 1] if indice + 1 < len(segmentos) else None
+        if segmento[0] == c["GIRO"]:
+            velocidad_inicial = 0
+            _giro(lote, estado, activos, segmento[1], 90, segmento[2])
+        elif segmento[0] == c["ARCO"]:
+            velocidad_inicial = velocidad_final(segmento, siguiente)
+            _arco(lote, estado, activos, segmento[1], segmento[3], segmento[2], velocidad_inicial)
+        else:
+            if objetivo is None:
+                _poner_a_cero(lote, estado, activos, 0)
+                _poner_a_cero(lote, estado, activos, 1)
+                objetivo = 0
+            objetivo += segmento[1]
+            final = velocidad_final(segmento, siguiente)
+            _recta_cola(lote, estado, activos, round(objetivo), segmento, velocidad_inicial, final)
+            velocidad_inicial = final
+            continue
+        objetivo = None
+
+
+def _distancia_filtrada(lote: Lote) -> np.ndarray:
+    """Lectura del ultrasonido con SIN_ECO cambiado por "muy lejos", como hace el hub."""
+    lectura = lote.distancia_mm()
+    return np.where(lectura < 0, SIN_ECO_MM, lectura)
+
+
+def _esperar(lote: Lote, estado: _Estado, activos, condicion, periodo_ms: int, timeout_ms: int) -> None:
+    """eventos.esperar: primera muestra inmediata y luego una cada `periodo_ms`.
+
+    Cada muestra es la lectura del sensor y la del encoder derecho. El
+    muestreador corre en su propia tarea y el main() lo vigila cada
+    milisegundo; aquí se simplifica a un lazo en el propio main().
+    """
+    # Con timeout, vencer no es un fallo: el main() sigue con la orden siguiente.
+    limite = timeout_ms / 1000 if timeout_ms else ESPERA_MAXIMA
+
+    def control(activos):
+        lote.consumir(activos)
+        cumple = condicion()
+        lote.consumir(activos)
+        return activos & cumple
+
+    _mientras(lote, estado, activos, control, periodo_ms, limite, fallar=not timeout_ms)
+
+
+def _acercarse(lote: Lote, estado: _Estado, activos, distancia_cm, velocidad, frenar_desde_cm, velocidad_minima,
+               periodo_ms) -> None:
+    """avanzar_hasta_detectar_objeto: mediana de las últimas lecturas y frenado lineal."""
+    c = estado.constantes
+    estado.base[:] = np.nan
+    lecturas = np.full((lote.n, c["MUESTRAS_FILTRO"]), float(SIN_ECO_MM))
+    objetivo, inicio_frenado = distancia_cm * 10, frenar_desde_cm * 10
+    lote.consumir(activos)
+    lote.ordenar(activos, velocidad, velocidad, c["ACELERACION_DEFECTO"])
+
+    def control(activos):
+        lecturas[:, 1:] = lecturas[:, :-1]
+        lote.consumir(activos)
+        lecturas[:, 0] = _distancia_filtrada(lote)
+        distancia = np.sort(lecturas, axis=1)[:, lecturas.shape[1] // 2]
+        terminados = activos & (distancia <= objetivo)
+        lote.consumir(terminados)
+        lote.parar(terminados)
+        frenando = activos & ~terminados & (distancia < inicio_frenado)
+        fraccion = (distancia - objetivo) / max(inicio_frenado - objetivo, 1e-9)
+        v = np.trunc(velocidad_minima + (velocidad - velocidad_minima) * fraccion)
+        lote.consumir(frenando)
+        lote.ordenar(frenando, v, v, c["ACELERACION_DEFECTO"])
+        return terminados
+
+    _mientras(lote, estado, activos, control, periodo_ms, ESPERA_MAXIMA)
+
+
+def _seguir_linea(lote: Lote, estado: _Estado, activos, grados, velocidad, kp, ki, kd, borde, objetivo,
+                  periodo_ms) -> None:
+    c = estado.constantes
+    estado.base[:] = np.nan
+    _poner_a_cero(lote, estado, activos, 1)
+    integral = np.zeros(lote.n)
+    error_anterior = np.zeros(lote.n)
+    tope = c["VELOCIDAD_MAXIMA"]
+
+    def control(activos):
+        nonlocal integral, error_anterior
+        terminados = activos & (np.abs(_encoder(lote, estado, activos, 1)) >= grados)
+        siguen = activos & ~terminados
+        lote.consumir(siguen)
+        error = lote.reflexion() - objetivo
+        integral = np.clip(integral + error, -c["LIMITE_INTEGRAL"], c["LIMITE_INTEGRAL"])
+        correccion = borde * (kp * error + ki * integral + kd * (error - error_anterior))
+        error_anterior = error
+        lote.consumir(siguen)
+        lote.ordenar(siguen, np.trunc(np.clip(velocidad - correccion, -tope, tope)),
+                     np.trunc(np.clip(velocidad + correccion, -tope, tope)), c["ACELERACION_SEGUIDOR"])
+        return terminados
+
+    _mientras(lote, estado, activos, control, periodo_ms)
+
+
+def _pausa(lote: Lote, estado: _Estado, activos, segundos: float) -> None:
+    """Hueco entre órdenes grabadas: tiempo de CPU o, si es largo, una espera en la que muestrea la telemetría."""
+    inicio = lote.tiempo.copy()
+    lote.transcurrir(activos, segundos)
+    if estado.fondo is None or segundos < PAUSA_MINIMA:
+        return
+    periodo, costo = estado.fondo
+    listo = estado.fondo_listo
+    while True:
+        muestrea = activos & (listo < lote.tiempo - EPSILON)
+        if not muestrea.any():
+            break
+        listo[muestrea] = (np.maximum(listo, inicio) + costo + periodo)[muestrea]
+
+
+def replicar(lote: Lote, secuencia: Secuencia) -> Lote:
+    """Ejecuta las órdenes de `secuencia` en todos los robots del lote y lo devuelve."""
+    estado = _Estado(secuencia.constantes, np.full(lote.n, np.nan), np.zeros(lote.n), np.zeros((lote.n, 2)))
+    if secuencia.fondo is not None:
+        estado.fondo = secuencia.fondo[1:]
+        estado.fondo_listo = np.full(lote.n, secuencia.fondo[0])
+    for indice, orden in enumerate(secuencia.ordenes):
+        activos = ~lote.fallo
+        if not activos.any():
+            break
+        _replicar_orden(lote, estado, activos, orden)
+        lote.orden_fallo[lote.fallo & (lote.orden_fallo < 0)] = indice
+    return lote
+
+
+def repetir_orden(secuencia: Secuencia, indice: int, campo=None) -> Lote:
+    """Repite sola la orden `indice` en un Lote(1) que parte del estado del hub emulado al empezarla.
+
+    Sirve para comparar cada orden con la pose que grabó el hub sin arrastrar
+    lo que se separaron las anteriores.
+    """
+    orden = secuencia.ordenes[indice]
+    hub = orden.hub
+    if hub is None:
+        raise ValueError("La orden %d (%s) se dio antes de emparejar las ruedas" % (indice, orden.tipo))
+    lote = Lote(1, campo, pose=hub["pose"])
+    lote.theta_inicial[:] = hub["yaw_origen"]
+    lote.tiempo[:] = hub["tiempo"]
+    for nombre in ("encoders", "velocidad", "objetivo", "aceleracion", "deceleracion", "destino"):
+        getattr(lote, nombre)[0] = hub[nombre]
+    estado = _Estado(secuencia.constantes, np.full(1, hub["base"]), np.full(1, hub["grados"]),
+                     np.array([hub["origen"]], dtype=float))
+    if secuencia.fondo is not None:
+        siguiente = hub["siguiente_muestra"]
+        estado.fondo = secuencia.fondo[1:]
+        estado.fondo_listo = np.full(1, secuencia.fondo[0] if siguiente is None else siguiente)
+    _replicar_orden(lote, estado, ~lote.fallo, orden)
+    return lote
+
+
+def _replicar_orden(lote: Lote, estado: _Estado, activos: np.ndarray, orden: Orden) -> None:
+    valores = orden.valores
+    if orden.tipo == "recta":
+        _recta(lote, estado, activos, **valores)
+    elif orden.tipo == "giro":
+        _giro(lote, estado, activos, **valores)
+    elif orden.tipo == "trayecto":
+        _trayecto(lote, estado, activos, **valores)
+    elif orden.tipo == "mover":
+        estado.base[:] = np.nan
+        lote.consumir(activos)
+        lote.ordenar(activos, valores["velocidad"], valores["velocidad"], estado.constantes["ACELERACION_DEFECTO"])
+    elif orden.tipo == "detener":
+        lote.consumir(activos)
+        lote.parar(activos)
+    elif orden.tipo == "esperar_color":
+        _esperar(lote, estado, activos, lambda: lote.color() == valores["objetivo"], valores["periodo_ms"],
+                 valores["timeout_ms"])
+    elif orden.tipo == "esperar_distancia":
+        _esperar(lote, estado, activos, lambda: _distancia_filtrada(lote) < valores["distancia_cm"] * 10,
+                 valores["periodo_ms"], valores["timeout_ms"])
+    elif orden.tipo == "acercarse":
+        _acercarse(lote, estado, activos, **valores)
+    elif orden.tipo == "seguir_linea":
+        _seguir_linea(lote, estado, activos, **valores)
+    elif orden.tipo == "pausa":
+        _pausa(lote, estado, activos, valores["segundos"])
+    else:
+        raise ValueError("Orden desconocida: %s" % orden.tipo)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Replica en un lote de robots la secuencia de un RetoN_Spike.py.")
+    parser.add_argument("programa")
+    parser.add_argument("--robots", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    secuencia = grabar_secuencia(args.programa)
+    grabar = time.perf_counter() - inicio
+    x, y, theta = secuencia.pose_final
+    print("hub emulado: %d órdenes, %s, virtual %.2f s  real %.2f s  pose (%.1f, %.1f, %.0f°)" % (
+        len(secuencia.ordenes), "completa" if secuencia.completa else "tiempo agotado", secuencia.tiempo, grabar,
+        x, y, math.degrees(theta)))
+    inicio = time.perf_counter()
+    lote = replicar(Lote(args.robots, mundo_para_programa(args.programa).campo), secuencia)
+    real = time.perf_counter() - inicio
+    print("lote de %d:   %d fallos, virtual %.2f s  real %.2f s  pose media (%.1f, %.1f, %.0f°)" % (
+        lote.n, lote.fallo.sum(), lote.tiempo.mean(), real, lote.x.mean(), lote.y.mean(),
+        math.degrees(lote.theta.mean())))
+    return 0 if secuencia.completa and not lote.fallo.any() else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
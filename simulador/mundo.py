@@ -0,0 +1,168 @@
+"""Estado del hub emulado: reloj virtual, motores, robot y sensores."""
+from .campo import _PUNTOS_MANCHA, REFLEXION
+from .robot import EPSILON, Geometria, Motor, Robot
+from .spike.color import WHITE
+
+# Paso máximo de integración de la pose mientras alguna rueda acelera o frena.
+PASO_FINO = 0.005
+# Tiempo virtual que consume cada llamada a la API del hub. Evita que los
+# bucles sin `await` (p. ej. los seguidores de línea) congelen el reloj.
+COSTO_LLAMADA = 0.0005
+# Tiempo virtual máximo de una ejecución antes de abortarla.
+TIEMPO_MAXIMO = 600.0
+# Lectura del sensor ultrasónico cuando no hay eco.
+SIN_ECO = -1
+
+_actual = None
+
+
+class TiempoAgotado(RuntimeError):
+    """La ejecución superó el tiempo virtual máximo del mundo."""
+
+    def __init__(self, tiempo: float) -> None:
+        super().__init__("Tiempo virtual agotado tras %.1f s" % tiempo)
+        self.tiempo = tiempo
+
+
+def mundo_actual() -> "Mundo":
+    """Devuelve el mundo activo al que responden los módulos emulados."""
+    if _actual is None:
+        raise RuntimeError("No hay ningún mundo activo; usa simulador.ejecutar_programa().")
+    return _actual
+
+
+def activar(mundo: "Mundo") -> None:
+    global _actual
+    _actual = mundo
+
+
+class Mundo:
+    """Reloj virtual, motores por puerto y un robot de tracción diferencial.
+
+    Con un `campo` los sensores responden según sus áreas y obstáculos y, si no
+    se da una pose, el robot sale de la pose inicial del campo.
+    """
+
+    def __init__(self, geometria: Geometria = None, x: float = None, y: float = None, theta: float = None,
+                 tiempo_maximo: float = TIEMPO_MAXIMO, costo_llamada: float = COSTO_LLAMADA,
+                 campo=None) -> None:
+        self.tiempo = 0.0
+        self.tiempo_maximo = tiempo_maximo
+        self.costo_llamada = costo_llamada
+        self.campo = campo
+        inicial = campo.pose_inicial() if campo is not None else (0.0, 0.0, 0.0)
+        x = inicial[0] if x is None else x
+        y = inicial[1] if y is None else y
+        theta = inicial[2] if theta is None else theta
+        self.robot = Robot(geometria, x, y, theta)
+        self.motores = {}
+        self.pares = {}
+        self.ruedas = None
+        self.yaw_origen = theta
+        self._paradas_programadas = []
+
+    # --- Motores ---
+    def motor(self, puerto: int) -> Motor:
+        if puerto not in self.motores:
+            self.motores[puerto] = Motor()
+        return self.motores[puerto]
+
+    def emparejar(self, par: int, izquierda: int, derecha: int) -> None:
+        self.pares[par] = (izquierda, derecha)
+        # El primer par definido mueve el chasis.
+        if self.ruedas is None:
+            self.ruedas = (izquierda, derecha)
+
+    def programar_parada(self, instante: float, puertos, comandos) -> None:
+        """Detiene los motores en `instante` si siguen con el mismo comando."""
+        self._paradas_programadas.append((instante, tuple(puertos), tuple(comandos)))
+
+    # --- Reloj ---
+    def consumir(self, segundos: float = None) -> None:
+        """Hace pasar tiempo de CPU sin ceder el control (llamadas a la API)."""
+        self.avanzar_hasta(self.tiempo + (self.costo_llamada if segundos is None else segundos),
+                           parar_en_evento=False)
+
+    def avanzar_hasta(self, instante: float, parar_en_evento: bool = True) -> None:
+        """Integra el mundo hasta `instante`.
+
+        Con `parar_en_evento` vuelve antes si algún motor llega a su destino,
+        para que el planificador despierte a las tareas que lo esperan.
+        """
+        limite = min(instante, self.tiempo_maximo)
+        while self.tiempo < limite - EPSILON:
+            dt = limite - self.tiempo
+            fino = False
+            for motor in self.motores.values():
+                motor.llego = False
+                dt = min(dt, motor.horizonte())
+                fino = fino or motor.en_rampa()
+            for parada in self._paradas_programadas:
+                dt = min(dt, parada[0] - self.tiempo)
+            if fino:
+                dt = min(dt, PASO_FINO)
+            dt = max(dt, EPSILON)
+            self._integrar(dt)
+            evento = self._aplicar_paradas()
+            if parar_en_evento and (evento or any(m.llego for m in self.motores.values())):
+                return
+        if instante > self.tiempo_maximo and self.tiempo >= self.tiempo_maximo - EPSILON:
+            raise TiempoAgotado(self.tiempo)
+
+    def _integrar(self, dt: float) -> None:
+        if self.ruedas is not None:
+            izquierda, derecha = self.motor(self.ruedas[0]), self.motor(self.ruedas[1])
+            antes = izquierda.posicion, derecha.posicion
+        for motor in self.motores.values():
+            motor.paso(dt)
+        if self.ruedas is not None:
+            # El motor izquierdo está montado en espejo: adelante es negativo.
+            self.robot.desplazar(antes[0] - izquierda.posicion, derecha.posicion - antes[1])
+        self.tiempo += dt
+
+    def _aplicar_paradas(self) -> bool:
+        vencidas = [p for p in self._paradas_programadas if p[0] <= self.tiempo + EPSILON]
+        if not vencidas:
+            return False
+        self._paradas_programadas = [p for p in self._paradas_programadas if p not in vencidas]
+        for _, puertos, comandos in vencidas:
+            for puerto, comando in zip(puertos, comandos):
+                motor = self.motor(puerto)
+                if motor.comando == comando:
+                    motor.parar()
+        return True
+
+    # --- Sensores ---
+    def color_en(self, x: float, y: float) -> int:
+        """Color del suelo en (x, y). Sin campo cargado todo es blanco."""
+        if self.campo is None:
+            return WHITE
+        return self.campo.color_en(x, y)
+
+    def color_sensor(self) -> int:
+        """Color que ve el sensor de color."""
+        robot = self.robot
+        return self.color_en(*robot.punto_adelante(robot.geometria.adelanto_sensor_color))
+
+    def reflexion_sensor(self) -> int:
+        """Reflexión (%) que ve el sensor de color: la media de su mancha de luz."""
+        robot = self.robot
+        x, y = robot.punto_adelante(robot.geometria.adelanto_sensor_color)
+        total = sum(REFLEXION[self.color_en(x + dx, y + dy)] for dx, dy in _PUNTOS_MANCHA)
+        return round(total / len(_PUNTOS_MANCHA))
+
+    def distancia_mm(self) -> int:
+        """Distancia en mm medida por el sensor ultrasónico, o SIN_ECO."""
+        if self.campo is None:
+            return SIN_ECO
+        robot = self.robot
+        x, y = robot.punto_adelante(robot.geometria.adelanto_sensor_distancia)
+        distancia = self.campo.distancia(x, y, robot.theta)
+        return SIN_ECO if distancia is None else round(distancia * 10)
+
+    def yaw(self) -> float:
+        """Ángulo girado desde el último reinicio, en radianes (izquierda positivo)."""
+        return self.yaw_origen - self.robot.theta
+
+    def sin_movimiento(self) -> bool:
+        return all(m.destino is None and m.velocidad == 0 and m.objetivo == 0 for m in self.motores.values())
@@ -0,0 +1,71 @@
+"""Planificador de corrutinas sobre el reloj virtual (lo que hace runloop en el hub)."""
+from .mundo import EPSILON, mundo_actual
+
+
+class Espera:
+    """Objeto que una corrutina emulada entrega al planificador al hacer `await`."""
+
+    # Instante absoluto en el que la espera termina seguro, o None si depende
+    # de un evento del mundo (p. ej. que un motor llegue a su destino).
+    despertar = None
+
+    def lista(self, mundo) -> bool:
+        raise NotImplementedError
+
+    def resultado(self):
+        return None
+
+    def __await__(self):
+        yield self
+        return self.resultado()
+
+
+class Dormir(Espera):
+    """Espera hasta un instante del reloj virtual."""
+
+    def __init__(self, instante: float) -> None:
+        self.despertar = instante
+
+    def lista(self, mundo) -> bool:
+        return mundo.tiempo >= self.despertar - EPSILON
+
+
+class EsperarMotores(Espera):
+    """Espera a que terminen (o se reemplacen) los comandos de varios motores."""
+
+    def __init__(self, comandos, valor=0) -> None:
+        self.comandos = tuple(comandos)
+        self.valor = valor
+
+    def lista(self, mundo) -> bool:
+        return all(motor.terminado(comando) for motor, comando in self.comandos)
+
+    def resultado(self):
+        return self.valor
+
+
+def dormir_ms(milisegundos: float) -> Dormir:
+    mundo = mundo_actual()
+    return Dormir(mundo.tiempo + milisegundos / 1000)
+
+
+def ejecutar(*corrutinas) -> None:
+    """Ejecuta las corrutinas de forma concurrente hasta que todas terminen."""
+    mundo = mundo_actual()
+    tareas = [[corrutina, None] for corrutina in corrutinas]
+    while tareas:
+        lista = next((t for t in tareas if t[1] is None or t[1].lista(mundo)), None)
+        if lista is None:
+            despertares = [t[1].despertar for t in tareas if t[1].despertar is not None]
+            mundo.avanzar_hasta(min(despertares) if despertares else float("inf"))
+            continue
+        # Rotación simple para que ninguna tarea acapare el planificador.
+        tareas.remove(lista)
+        corrutina = lista[0]
+        try:
+            siguiente = corrutina.send(None)
+        except StopIteration:
+            continue
+        if not isinstance(siguiente, Espera):
+            raise TypeError("Solo se pueden esperar objetos del hub emulado, no %r" % (siguiente,))
+        tareas.append([corrutina, siguiente])
@@ -0,0 +1,82 @@
+"""Mundo que reproduce las lecturas de sensores grabadas en el robot real.
+
+Los sensores de color y ultrasonido no miran el campo: devuelven lo que midió
+el robot real cuando sus ruedas llevaban el mismo recorrido. Así un main()
+modificado (otros umbrales, otras esperas) se prueba contra datos reales
+mientras el resto del hub (motores, reloj, yaw) sigue emulado.
+"""
+import numpy as np
+
+from .mundo import SIN_ECO, Mundo
+
+
+class MundoReproducido(Mundo):
+    """Mundo cuyos sensores devuelven las lecturas de una traza grabada.
+
+    `recorrido` son los grados que llevaban recorridos las ruedas en cada
+    muestra: la media de lo que giró cada una en valor absoluto, así que nunca
+    decrece (los giros y los retrocesos también cuentan). `color`, `reflexion`
+    y `distancia` (mm o SIN_ECO) son las lecturas de esas muestras; el sensor
+    que quede en None se lee del campo como siempre.
+
+    El color se toma de la última muestra alcanzada y la reflexión y la
+    distancia se interpolan entre las dos muestras que rodean el recorrido
+    actual. Pasado el final de la traza se repite la última lectura.
+    """
+
+    def __init__(self, recorrido, color=None, reflexion=None, distancia=None, **opciones) -> None:
+        super().__init__(**opciones)
+        recorrido = np.asarray(recorrido, dtype=float)
+        if len(recorrido) == 0:
+            raise ValueError("La traza no tiene muestras")
+        # En cada parada vale la última muestra: la lectura ya asentada.
+        ultimas = np.append(np.diff(recorrido) > 0, True)
+        self.traza = recorrido[ultimas]
+
+        def lecturas(valores):
+            return None if valores is None else np.asarray(valores)[ultimas]
+
+        self.colores = lecturas(color)
+        self.reflexiones = None if reflexion is None else lecturas(reflexion).astype(float)
+        self.distancias = lecturas(distancia)
+        self.recorrido = 0.0
+
+    def fuera_de_traza(self) -> float:
+        """Grados recorridos más allá del final de la traza (0 si no se salió)."""
+        return max(self.recorrido - self.traza[-1], 0.0)
+
+    def _integrar(self, dt: float) -> None:
+        if self.ruedas is None:
+            super()._integrar(dt)
+            return
+        izquierda, derecha = self.motor(self.ruedas[0]), self.motor(self.ruedas[1])
+        antes = izquierda.posicion, derecha.posicion
+        super()._integrar(dt)
+        self.recorrido += (abs(izquierda.posicion - antes[0]) + abs(derecha.posicion - antes[1])) / 2
+
+    def _indice(self) -> int:
+        """Última muestra con un recorrido no mayor que el actual."""
+        return max(int(np.searchsorted(self.traza, self.recorrido, side="right")) - 1, 0)
+
+    # --- Sensores ---
+    def color_sensor(self) -> int:
+        if self.colores is None:
+            return super().color_sensor()
+        return int(self.colores[self._indice()])
+
+    def reflexion_sensor(self) -> int:
+        if self.reflexiones is None:
+            return super().reflexion_sensor()
+        return round(float(np.interp(self.recorrido, self.traza, self.reflexiones)))
+
+    def distancia_mm(self) -> int:
+        if self.distancias is None:
+            return super().distancia_mm()
+        i = self._indice()
+        siguiente = min(i + 1, len(self.traza) - 1)
+        antes, despues = int(self.distancias[i]), int(self.distancias[siguiente])
+        # Sin eco en alguno de los dos extremos no hay nada que interpolar.
+        if siguiente == i or SIN_ECO in (antes, despues):
+            return antes
+        fraccion = (self.recorrido - self.traza[i]) / (self.traza[siguiente] - self.traza[i])
+        return round(antes + (despues - antes) * min(max(fraccion, 0.0), 1.0))
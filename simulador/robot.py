@@ -0,0 +1,194 @@
+"""Modelo físico del robot: motores con rampas de velocidad y tracción diferencial."""
+import math
+from dataclasses import dataclass
+
+INFINITO = float("inf")
+EPSILON = 1e-9
+
+# Valores por defecto de la API de SPIKE (grados/s²).
+ACELERACION_DEFECTO = 1000
+DECELERACION_DEFECTO = 1000
+# Deceleración usada por motor.stop / motor_pair.stop con freno.
+DECELERACION_FRENO = 8000
+
+
+@dataclass
+class Geometria:
+    """Medidas del robot en centímetros."""
+
+    circunferencia_rueda: float = 17.58
+    ancho_eje: float = 11.2
+    # Distancia desde el eje de las ruedas hasta cada sensor, hacia delante.
+    adelanto_sensor_color: float = 6.0
+    adelanto_sensor_distancia: float = 8.0
+
+
+class Motor:
+    """Motor con perfil trapezoidal de velocidad y destino opcional en grados.
+
+    Todas las fases (acelerar, crucero, frenar) son de aceleración constante,
+    así que `paso()` es exacto para cualquier intervalo.
+    """
+
+    def __init__(self) -> None:
+        self.posicion = 0.0
+        self.origen_relativo = 0.0
+        self.velocidad = 0.0
+        self.objetivo = 0.0
+        self.aceleracion = ACELERACION_DEFECTO
+        self.deceleracion = DECELERACION_DEFECTO
+        self.destino = None
+        self.comando = 0
+        self.llego = False
+
+    def ordenar(self, velocidad: float, aceleracion: float = ACELERACION_DEFECTO,
+                deceleracion: float = DECELERACION_DEFECTO, destino: float = None) -> int:
+        """Sustituye el comando actual y devuelve su identificador."""
+        self.comando += 1
+        self.objetivo = velocidad
+        self.aceleracion = max(aceleracion, EPSILON)
+        self.deceleracion = max(deceleracion, EPSILON)
+        self.destino = destino
+        if destino is not None and (destino - self.posicion) * _signo(velocidad) <= EPSILON:
+            self._llegar()
+        return self.comando
+
+    def parar(self, deceleracion: float = DECELERACION_FRENO) -> int:
+        return self.ordenar(0, deceleracion, deceleracion)
+
+    def terminado(self, comando: int) -> bool:
+        """True si el comando terminó o fue reemplazado por otro."""
+        return comando != self.comando or (self.destino is None and self.velocidad == self.objetivo)
+
+    def en_rampa(self) -> bool:
+        """True mientras la velocidad cambia (acelerando o frenando)."""
+        if self.destino is not None:
+            return self._fase()[0] != "crucero"
+        return self.velocidad != self.objetivo
+
+    def horizonte(self) -> float:
+        """Tiempo hasta el próximo cambio de fase."""
+        return self._fase()[1]
+
+    def paso(self, dt: float) -> None:
+        """Avanza el motor `dt` segundos, atravesando los cambios de fase."""
+        while dt > 0:
+            fase, duracion = self._fase()
+            if duracion == INFINITO and fase == "crucero" and self.destino is None:
+                self.posicion += self.velocidad * dt
+                return
+            tramo = min(dt, max(duracion, EPSILON))
+            self._avanzar_fase(fase, tramo, tramo >= duracion - EPSILON)
+            dt -= tramo
+            if self.destino is None and self.velocidad == self.objetivo and fase != "crucero":
+                # Fin de rampa sin destino: el resto del intervalo es crucero.
+                self.posicion += self.velocidad * dt
+                return
+
+    # --- Fases del perfil ---
+    def _fase(self):
+        v = self.velocidad
+        if self.destino is None:
+            if v == self.objetivo:
+                return "crucero", INFINITO
+            tasa = self._tasa(v, self.objetivo)
+            return "rampa", abs(self.objetivo - v) / tasa
+
+        s = _signo(self.objetivo)
+        restante = (self.destino - self.posicion) * s
+        u = v * s
+        crucero = abs(self.objetivo)
+        if u < -EPSILON:
+            return "invertir", -u / self.deceleracion
+        frenado = u * u / (2 * self.deceleracion)
+        if restante <= frenado + EPSILON:
+            if u <= EPSILON:
+                return "llegada", 0.0
+            return "frenar", 2 * restante / u
+        if u < crucero - EPSILON:
+            a, d = self.aceleracion, self.deceleracion
+            hasta_crucero = (crucero - u) / a
+            # Instante en que la distancia restante iguala la de frenado.
+            discriminante = 4 * u * u * (a + d) ** 2 - 4 * a * (a + d) * (u * u - 2 * d * restante)
+            hasta_frenar = (-2 * u * (a + d) + math.sqrt(max(discriminante, 0.0))) / (2 * a * (a + d))
+            return "acelerar", max(min(hasta_crucero, hasta_frenar), 0.0)
+        if u > crucero + EPSILON:
+            return "reducir", (u - crucero) / self.deceleracion
+        return "crucero", (restante - frenado) / max(u, EPSILON)
+
+    def _avanzar_fase(self, fase: str, dt: float, completa: bool) -> None:
+        v = self.velocidad
+        if fase == "llegada":
+            self._llegar()
+            return
+        if fase == "rampa":
+            tasa = self._tasa(v, self.objetivo)
+            nueva = self.objetivo if completa else v + math.copysign(tasa * dt, self.objetivo - v)
+        elif fase == "crucero":
+            nueva = v
+        else:
+            s = _signo(self.objetivo)
+            if fase == "frenar":
+                restante = (self.destino - self.posicion) * s
+                if completa:
+                    self._llegar()
+                    return
+                tasa = (v * s) ** 2 / (2 * restante)
+                nueva = s * (v * s - tasa * dt)
+            elif fase == "invertir":
+                nueva = 0.0 if completa else v + s * self.deceleracion * dt
+            elif fase == "acelerar":
+                nueva = v + s * self.aceleracion * dt
+                if abs(nueva) > abs(self.objetivo):
+                    nueva = self.objetivo
+            else:  # reducir
+                nueva = self.objetivo if completa else v - s * self.deceleracion * dt
+        self.posicion += (v + nueva) / 2 * dt
+        self.velocidad = nueva
+
+    def _tasa(self, actual: float, objetivo: float) -> float:
+        acelera = abs(objetivo) > abs(actual) and actual * objetivo >= 0
+        return self.aceleracion if acelera else self.deceleracion
+
+    def _llegar(self) -> None:
+        self.posicion = self.destino if self.destino is not None else self.posicion
+        self.velocidad = 0.0
+        self.objetivo = 0.0
+        self.destino = None
+        self.llego = True
+
+
+class Robot:
+    """Base de tracción diferencial.
+
+    Usa el sistema de coordenadas del simulador de Open Roberta: x hacia la
+    derecha, y hacia abajo y theta en radianes, creciendo al girar a la derecha.
+    """
+
+    def __init__(self, geometria: Geometria = None, x: float = 0.0, y: float = 0.0, theta: float = 0.0) -> None:
+        self.geometria = geometria or Geometria()
+        self.x = x
+        self.y = y
+        self.theta = theta
+        self.distancia_recorrida = 0.0
+
+    def desplazar(self, grados_izquierda: float, grados_derecha: float) -> None:
+        """Integra un avance dado en grados de cada rueda (positivo = adelante)."""
+        cm_por_grado = self.geometria.circunferencia_rueda / 360
+        izquierda = grados_izquierda * cm_por_grado
+        derecha = grados_derecha * cm_por_grado
+        avance = (izquierda + derecha) / 2
+        giro = (izquierda - derecha) / self.geometria.ancho_eje
+        rumbo = self.theta + giro / 2
+        self.x += avance * math.cos(rumbo)
+        self.y += avance * math.sin(rumbo)
+        self.theta += giro
+        self.distancia_recorrida += abs(avance)
+
+    def punto_adelante(self, distancia: float):
+        """Coordenadas de un punto a `distancia` cm delante del eje."""
+        return self.x + distancia * math.cos(self.theta), self.y + distancia * math.sin(self.theta)
+
+
+def _signo(valor: float) -> int:
+    return -1 if valor < 0 else 1
@@ -0,0 +1,6 @@
+"""Sustitutos de los módulos del firmware SPIKE (API de Python de SPIKE 3).
+
+`simulador.ejecutar_programa` los registra en `sys.modules` con sus nombres
+reales (`hub`, `runloop`, `motor`, ...) para que los RetoN_Spike.py se ejecuten
+sin cambios en el ordenador.
+"""
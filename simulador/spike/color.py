@@ -0,0 +1,13 @@
+"""Constantes de color del sensor de color de SPIKE."""
+UNKNOWN = -1
+BLACK = 0
+MAGENTA = 1
+PURPLE = 2
+BLUE = 3
+AZURE = 4
+TURQUOISE = 5
+GREEN = 6
+YELLOW = 7
+ORANGE = 8
+RED = 9
+WHITE = 10
@@ -0,0 +1,22 @@
+"""Sensor de color emulado: lee el suelo bajo su posición en el robot."""
+from ..campo import REFLEXION
+from ..mundo import mundo_actual
+
+
+def _mundo():
+    mundo = mundo_actual()
+    mundo.consumir()
+    return mundo
+
+
+def color(puerto: int) -> int:
+    return _mundo().color_sensor()
+
+
+def reflection(puerto: int) -> int:
+    return _mundo().reflexion_sensor()
+
+
+def rgbi(puerto: int):
+    intensidad = REFLEXION[_mundo().color_sensor()] * 10
+    return intensidad, intensidad, intensidad, intensidad
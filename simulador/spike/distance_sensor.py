@@ -0,0 +1,16 @@
+"""Sensor ultrasónico emulado. Devuelve milímetros o -1 si no hay eco."""
+from ..mundo import mundo_actual
+
+
+def distance(puerto: int) -> int:
+    mundo = mundo_actual()
+    mundo.consumir()
+    return mundo.distancia_mm()
+
+
+def show(puerto: int, pixeles) -> None:
+    mundo_actual().consumir()
+
+
+def clear(puerto: int) -> None:
+    mundo_actual().consumir()
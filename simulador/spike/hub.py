@@ -0,0 +1,8 @@
+"""Módulo `hub` emulado: puertos y periféricos integrados."""
+from types import SimpleNamespace
+
+from . import light_matrix, motion_sensor, sound
+
+port = SimpleNamespace(A=0, B=1, C=2, D=3, E=4, F=5)
+
+__all__ = ["port", "light_matrix", "motion_sensor", "sound"]
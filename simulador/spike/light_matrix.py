@@ -0,0 +1,39 @@
+"""Matriz de luces del hub. En el simulador solo se recuerda lo mostrado."""
+from ..mundo import mundo_actual
+from ..planificador import dormir_ms
+
+IMAGE_HEART = 1
+IMAGE_HEART_SMALL = 2
+IMAGE_HAPPY = 3
+IMAGE_SMILE = 4
+IMAGE_SAD = 5
+IMAGE_CONFUSED = 6
+IMAGE_ANGRY = 7
+IMAGE_ASLEEP = 8
+IMAGE_SURPRISED = 9
+IMAGE_SILLY = 10
+IMAGE_FABULOUS = 11
+IMAGE_MEH = 12
+IMAGE_YES = 13
+IMAGE_NO = 14
+
+ultima_imagen = None
+
+
+def show_image(imagen: int) -> None:
+    global ultima_imagen
+    mundo_actual().consumir()
+    ultima_imagen = imagen
+
+
+def write(texto: str, intensidad: int = 100, tiempo: int = 500):
+    mundo_actual().consumir()
+    return dormir_ms(len(str(texto)) * tiempo)
+
+
+def clear() -> None:
+    show_image(None)
+
+
+def set_pixel(x: int, y: int, intensidad: int) -> None:
+    mundo_actual().consumir()
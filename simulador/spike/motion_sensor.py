@@ -0,0 +1,23 @@
+"""Sensor inercial del hub: el yaw sale del rumbo del robot simulado."""
+import math
+
+from ..mundo import mundo_actual
+
+
+def tilt_angles():
+    """(yaw, pitch, roll) en décimas de grado; girar a la izquierda aumenta el yaw."""
+    mundo = mundo_actual()
+    mundo.consumir()
+    yaw = math.degrees(mundo.yaw())
+    yaw = (yaw + 180) % 360 - 180
+    return round(yaw * 10), 0, 0
+
+
+def reset_yaw(angulo: int = 0) -> None:
+    mundo = mundo_actual()
+    mundo.consumir()
+    mundo.yaw_origen = mundo.robot.theta + math.radians(angulo / 10)
+
+
+def stable() -> bool:
+    return True
@@ -0,0 +1,89 @@
+"""Motores individuales emulados (posición en grados, velocidad en grados/s)."""
+from ..mundo import mundo_actual
+from ..planificador import Dormir, EsperarMotores
+from ..robot import ACELERACION_DEFECTO, DECELERACION_DEFECTO, DECELERACION_FRENO
+
+READY = 0
+RUNNING = 1
+STALLED = 2
+CANCELED = 3
+ERROR = 4
+DISCONNECTED = 5
+
+COAST = 0
+BRAKE = 1
+HOLD = 2
+CONTINUE = 3
+SMART_COAST = 4
+SMART_BRAKE = 5
+
+CLOCKWISE = 0
+COUNTERCLOCKWISE = 1
+SHORTEST_PATH = 2
+LONGEST_PATH = 3
+
+# Deceleración aproximada al soltar el motor en punto muerto.
+DECELERACION_LIBRE = 1500
+
+
+def _motor(puerto: int):
+    mundo = mundo_actual()
+    mundo.consumir()
+    return mundo.motor(puerto)
+
+
+def deceleracion_parada(stop: int) -> float:
+    return DECELERACION_LIBRE if stop in (COAST, SMART_COAST) else DECELERACION_FRENO
+
+
+def run(puerto: int, velocidad: int, *, acceleration: int = ACELERACION_DEFECTO) -> None:
+    _motor(puerto).ordenar(velocidad, acceleration, acceleration)
+
+
+def run_for_degrees(puerto: int, grados: int, velocidad: int, *, stop: int = BRAKE,
+                    acceleration: int = ACELERACION_DEFECTO, deceleration: int = DECELERACION_DEFECTO):
+    motor = _motor(puerto)
+    sentido = -1 if (grados < 0) != (velocidad < 0) else 1
+    destino = motor.posicion + sentido * abs(grados)
+    comando = motor.ordenar(sentido * abs(velocidad), acceleration, deceleration, destino)
+    return EsperarMotores([(motor, comando)], READY)
+
+
+def run_for_time(puerto: int, duracion: int, velocidad: int, *, stop: int = BRAKE,
+                 acceleration: int = ACELERACION_DEFECTO, deceleration: int = DECELERACION_DEFECTO):
+    mundo = mundo_actual()
+    motor = _motor(puerto)
+    comando = motor.ordenar(velocidad, acceleration, deceleration)
+    mundo.programar_parada(mundo.tiempo + duracion / 1000, [puerto], [comando])
+    return Dormir(mundo.tiempo + duracion / 1000)
+
+
+def run_to_relative_position(puerto: int, posicion: int, velocidad: int, *, stop: int = BRAKE,
+                             acceleration: int = ACELERACION_DEFECTO, deceleration: int = DECELERACION_DEFECTO):
+    motor = _motor(puerto)
+    destino = motor.origen_relativo + posicion
+    sentido = 1 if destino >= motor.posicion else -1
+    comando = motor.ordenar(sentido * abs(velocidad), acceleration, deceleration, destino)
+    return EsperarMotores([(motor, comando)], READY)
+
+
+def stop(puerto: int, *, stop: int = BRAKE) -> None:
+    _motor(puerto).parar(deceleracion_parada(stop))
+
+
+def relative_position(puerto: int) -> int:
+    motor = _motor(puerto)
+    return round(motor.posicion - motor.origen_relativo)
+
+
+def reset_relative_position(puerto: int, posicion: int = 0) -> None:
+    motor = _motor(puerto)
+    motor.origen_relativo = motor.posicion - posicion
+
+
+def absolute_position(puerto: int) -> int:
+    return round((_motor(puerto).posicion + 180) % 360 - 180)
+
+
+def velocity(puerto: int) -> int:
+    return round(_motor(puerto).velocidad)
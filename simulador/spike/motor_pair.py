@@ -0,0 +1,103 @@
+"""Pares de motores emulados. Velocidades positivas hacen avanzar al robot."""
+from ..mundo import mundo_actual
+from ..planificador import Dormir, EsperarMotores
+from ..robot import ACELERACION_DEFECTO, DECELERACION_DEFECTO
+from .motor import BRAKE, READY, deceleracion_parada
+
+PAIR_1 = 0
+PAIR_2 = 1
+PAIR_3 = 2
+
+
+def pair(par: int, izquierda: int, derecha: int) -> None:
+    mundo = mundo_actual()
+    mundo.consumir()
+    mundo.emparejar(par, izquierda, derecha)
+
+
+def unpair(par: int) -> None:
+    mundo = mundo_actual()
+    mundo.consumir()
+    mundo.pares.pop(par, None)
+
+
+def velocidades_direccion(direccion: int, velocidad: float):
+    """Velocidades (izquierda, derecha) para un valor de dirección entre -100 y 100."""
+    direccion = max(-100, min(100, direccion))
+    lenta = velocidad * (1 - abs(direccion) / 50)
+    return (velocidad, lenta) if direccion >= 0 else (lenta, velocidad)
+
+
+def _ordenar(par: int, izquierda: float, derecha: float, aceleracion: float, deceleracion: float,
+             grados: float = None) -> EsperarMotores:
+    """Ordena ambos motores con trayectorias proporcionales para que acaben a la vez."""
+    mundo = mundo_actual()
+    mundo.consumir()
+    puertos = mundo.pares[par]
+    rapida = max(abs(izquierda), abs(derecha))
+    comandos = []
+    # El motor izquierdo está montado en espejo: avanzar es girar en negativo.
+    for puerto, velocidad in ((puertos[0], -izquierda), (puertos[1], derecha)):
+        motor = mundo.motor(puerto)
+        proporcion = abs(velocidad) / rapida if rapida else 0
+        if proporcion == 0:
+            comando = motor.ordenar(0, aceleracion, deceleracion)
+        else:
+            destino = None
+            if grados is not None:
+                destino = motor.posicion + (1 if velocidad > 0 else -1) * abs(grados) * proporcion
+            comando = motor.ordenar(velocidad, aceleracion * proporcion, deceleracion * proporcion, destino)
+        comandos.append((motor, comando))
+    return EsperarMotores(comandos, READY)
+
+
+def move(par: int, direccion: int, *, velocity: int = 360, acceleration: int = ACELERACION_DEFECTO) -> None:
+    izquierda, derecha = velocidades_direccion(direccion, velocity)
+    _ordenar(par, izquierda, derecha, acceleration, acceleration)
+
+
+def move_for_degrees(par: int, grados: int, direccion: int, *, velocity: int = 360, stop: int = BRAKE,
+                     acceleration: int = ACELERACION_DEFECTO, deceleration: int = DECELERACION_DEFECTO):
+    sentido = -1 if (grados < 0) != (velocity < 0) else 1
+    izquierda, derecha = velocidades_direccion(direccion, sentido * abs(velocity))
+    return _ordenar(par, izquierda, derecha, acceleration, deceleration, grados)
+
+
+def move_for_time(par: int, duracion: int, direccion: int, *, velocity: int = 360, stop: int = BRAKE,
+                  acceleration: int = ACELERACION_DEFECTO, deceleration: int = DECELERACION_DEFECTO):
+    izquierda, derecha = velocidades_direccion(direccion, velocity)
+    return _temporizado(par, izquierda, derecha, duracion, acceleration, deceleration)
+
+
+def move_tank(par: int, velocidad_izquierda: int, velocidad_derecha: int, *,
+              acceleration: int = ACELERACION_DEFECTO) -> None:
+    _ordenar(par, velocidad_izquierda, velocidad_derecha, acceleration, acceleration)
+
+
+def move_tank_for_degrees(par: int, grados: int, velocidad_izquierda: int, velocidad_derecha: int, *,
+                          stop: int = BRAKE, acceleration: int = ACELERACION_DEFECTO,
+                          deceleration: int = DECELERACION_DEFECTO):
+    sentido = -1 if grados < 0 else 1
+    return _ordenar(par, sentido * velocidad_izquierda, sentido * velocidad_derecha,
+                    acceleration, deceleration, grados)
+
+
+def move_tank_for_time(par: int, velocidad_izquierda: int, velocidad_derecha: int, duracion: int, *,
+                       stop: int = BRAKE, acceleration: int = ACELERACION_DEFECTO,
+                       deceleration: int = DECELERACION_DEFECTO):
+    return _temporizado(par, velocidad_izquierda, velocidad_derecha, duracion, acceleration, deceleration)
+
+
+def stop(par: int, *, stop: int = BRAKE) -> None:
+    mundo = mundo_actual()
+    mundo.consumir()
+    for puerto in mundo.pares[par]:
+        mundo.motor(puerto).parar(deceleracion_parada(stop))
+
+
+def _temporizado(par, izquierda, derecha, duracion, aceleracion, deceleracion) -> Dormir:
+    mundo = mundo_actual()
+    espera = _ordenar(par, izquierda, derecha, aceleracion, deceleracion)
+    fin = mundo.tiempo + duracion / 1000
+    mundo.programar_parada(fin, mundo.pares[par], [comando for _, comando in espera.comandos])
+    return Dormir(fin)
@@ -0,0 +1,24 @@
+"""Emulación de runloop sobre el reloj virtual."""
+from ..mundo import mundo_actual
+from ..planificador import Dormir, dormir_ms, ejecutar
+
+# Periodo con el que until() vuelve a evaluar su condición.
+PERIODO_UNTIL_MS = 1
+
+
+def run(*funciones) -> None:
+    ejecutar(*funciones)
+
+
+def sleep_ms(duracion: int) -> Dormir:
+    return dormir_ms(duracion)
+
+
+async def until(funcion, timeout: int = 0) -> bool:
+    mundo = mundo_actual()
+    limite = mundo.tiempo + timeout / 1000 if timeout else None
+    while not funcion():
+        if limite is not None and mundo.tiempo >= limite:
+            return False
+        await dormir_ms(PERIODO_UNTIL_MS)
+    return True
@@ -0,0 +1,16 @@
+"""Altavoz del hub. Los sonidos solo ocupan tiempo virtual."""
+from ..mundo import mundo_actual
+from ..planificador import dormir_ms
+
+
+def beep(frecuencia: int = 440, duracion: int = 500, volumen: int = 100):
+    mundo_actual().consumir()
+    return dormir_ms(duracion)
+
+
+def stop() -> None:
+    mundo_actual().consumir()
+
+
+def volume(volumen: int) -> None:
+    mundo_actual().consumir()
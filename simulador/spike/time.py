@@ -0,0 +1,32 @@
+"""Módulo `time` de MicroPython emulado: los ticks salen del reloj virtual.
+
+Solo sustituye a las funciones ticks_*; el resto se toma del `time` del
+ordenador, así que lo que importe `time` durante la ejecución sigue funcionando.
+"""
+import time as _time
+
+from ..mundo import mundo_actual
+
+# Los ticks de MicroPython dan la vuelta en 2**30.
+_PERIODO_TICKS = 1 << 30
+_MASCARA_TICKS = _PERIODO_TICKS - 1
+
+
+def ticks_ms() -> int:
+    return round(mundo_actual().tiempo * 1000) & _MASCARA_TICKS
+
+
+def ticks_us() -> int:
+    return round(mundo_actual().tiempo * 1000000) & _MASCARA_TICKS
+
+
+def ticks_add(ticks: int, delta: int) -> int:
+    return (ticks + delta) & _MASCARA_TICKS
+
+
+def ticks_diff(final: int, inicio: int) -> int:
+    return ((final - inicio + _PERIODO_TICKS // 2) & _MASCARA_TICKS) - _PERIODO_TICKS // 2
+
+
+def __getattr__(nombre: str):
+    return getattr(_time, nombre)